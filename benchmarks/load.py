@@ -0,0 +1,280 @@
+"""
+Load harness for the game window, fed synthetic input.
+
+Runs the real `Game.run` loop headless under the dummy SDL video driver. The
+frame clock is replaced by one that never waits and that posts the next
+frame's input with `pygame.event.post`: a burst of mouse motion, and every
+few frames a click. Input comes from one of three scripts:
+
+    scripted  clicks go round every die and the Pass and Roll/Reroll buttons
+    random    motion anywhere in the window, clicks landing anywhere, seeded
+    play      clicks on the die or button of a random legal action, with a
+              right click now and then to cancel a White action, so turns
+              actually get played; a finished game is undone with Ctrl+Z
+
+Reports events handled per second, the latency from posting a click to the
+end of the frame that redrew for it, and memory over the session: allocated
+blocks and resident size sampled as it runs, with their growth per thousand
+frames after the warmup. History and the text cache are bounded, so past the
+warmup anything more than the game log's one byte per action is a leak, such
+as a surface kept for every `set_text` or `font.render`.
+
+    python -m benchmarks.load --frames 100000 --mode play
+"""
+
+
+import argparse
+import json
+import os
+import random
+import resource
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import numpy as np
+import pygame
+
+from src import engine
+from src.game import Game
+from src.text_cache import cache as text_cache
+
+
+MODES = ("scripted", "random", "play")
+
+
+def _rss() -> int:
+    """Returns the resident size in bytes, or the peak where that's all there is."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class LoadClock:
+    """
+    Stands in for pygame's Clock: uncapped, and posts each frame's input.
+
+    A tick marks the end of one frame and the start of the next, so a click
+    posted on one tick has been handled and drawn by the following one.
+    """
+
+    def __init__(
+        self,
+        game: Game,
+        mode: str,
+        frames: int,
+        motion: int,
+        click_every: int,
+        sample_every: int,
+        seed: int,
+    ) -> None:
+        self.game = game
+        self.mode = mode
+        self.frames = frames
+        self.motion = motion
+        self.click_every = click_every
+        self.sample_every = sample_every
+        self.rng = random.Random(seed)
+        self.frame = 0
+        self.events = 0
+        self.clicks = 0
+        self.redrawn = 0
+        # Seconds from posting a click to its frame's end, preallocated so the
+        # harness itself doesn't show up as memory growth
+        self.latencies = np.zeros(frames // click_every + 1)
+        self.samples = []  # (frame, allocated blocks, resident bytes)
+        self.click_posted = None
+        self.targets = [
+            die.rect.center for dice in game.dice.values() for die in dice
+        ] + [button.rect.center for button in game.buttons.values()]
+
+        # Counts dirty regions per frame, wrapping the instance like the profiler
+        draw = game._draw
+        self.dirty = 0
+
+        def counted_draw():
+            dirty = draw()
+            self.dirty = len(dirty)
+            return dirty
+
+        game._draw = counted_draw
+
+    def tick(self, framerate: int = 0) -> int:
+        now = time.perf_counter()
+        if self.click_posted is not None and self.dirty:
+            self.latencies[self.redrawn] = now - self.click_posted
+            self.redrawn += 1
+        self.click_posted = None
+        self.frame += 1
+        if self.frame % self.sample_every == 0:
+            self.samples.append((self.frame, sys.getallocatedblocks(), _rss()))
+        if self.frame > self.frames:
+            pygame.event.post(pygame.event.Event(pygame.QUIT))
+            return 0
+
+        target, button = self._next_click()
+        for i in range(self.motion):
+            # Sweep in towards where the click will land
+            pos = (target[0] - 2 * (self.motion - i), target[1])
+            self._post(pygame.MOUSEMOTION, pos=pos, rel=(2, 0), buttons=(0, 0, 0))
+        if button is not None:
+            self._post(pygame.MOUSEBUTTONDOWN, pos=target, button=button)
+            self.clicks += 1
+            self.click_posted = time.perf_counter()
+        return 0
+
+    def _post(self, kind: int, **attributes) -> None:
+        pygame.event.post(pygame.event.Event(kind, **attributes))
+        self.events += 1
+
+    def _next_click(self) -> tuple[tuple[int, int], int | None]:
+        """Returns where this frame's input ends up and the button clicked there."""
+        clicking = self.frame % self.click_every == 0
+        if self.mode == "scripted":
+            target = self.targets[self.frame // self.click_every % len(self.targets)]
+        elif self.mode == "random":
+            game = self.game
+            target = (
+                self.rng.randrange(game.window_width),
+                self.rng.randrange(game.window_height),
+            )
+        else:
+            return self._play(clicking)
+        return target, pygame.BUTTON_LEFT if clicking else None
+
+    def _play(self, clicking: bool) -> tuple[tuple[int, int], int | None]:
+        game = self.game
+        state = game.state
+        if state.game_over:
+            if clicking:
+                self._post(
+                    pygame.KEYDOWN, key=pygame.K_z, mod=pygame.KMOD_CTRL, unicode=""
+                )
+            return game.buttons["pass"].rect.center, None
+        if state.active_white is not None and self.rng.random() < 0.1:
+            center = game.dice[engine.WHITE][state.active_white].rect.center
+            return center, pygame.BUTTON_RIGHT if clicking else None
+        action = self.rng.choice(engine.legal_actions(state))
+        if action.kind == engine.Action.PICK:
+            target = game.dice[action.color][action.index].rect.center
+        elif action == engine.PASS:
+            target = game.buttons["pass"].rect.center
+        else:
+            target = game.buttons["roll"].rect.center
+        return target, pygame.BUTTON_LEFT if clicking else None
+
+
+def run_load(
+    mode: str = "play",
+    frames: int = 20_000,
+    players: int = 4,
+    motion: int = 8,
+    click_every: int = 4,
+    sample_every: int = 1000,
+    warmup: float = 0.1,
+    seed: int = 1,
+) -> dict:
+    """Runs one session and returns its measurements."""
+    game = Game(players, seed=seed)
+    clock = LoadClock(game, mode, frames, motion, click_every, sample_every, seed)
+    game.clock = clock
+    start = time.perf_counter()
+    game.run()
+    elapsed = time.perf_counter() - start
+
+    result = {
+        "mode": mode,
+        "frames": frames,
+        "seconds": elapsed,
+        "frames_per_second": frames / elapsed,
+        "events": clock.events,
+        "events_per_second": clock.events / elapsed,
+        "clicks": clock.clicks,
+        "clicks_redrawn": clock.redrawn,
+        "actions": len(game.log),
+        "text_cache": {
+            "size": len(text_cache),
+            "hits": text_cache.hits,
+            "misses": text_cache.misses,
+        },
+    }
+    latencies = clock.latencies[: clock.redrawn] * 1000
+    for q in (50, 95, 99):
+        result[f"click_latency_p{q}_ms"] = (
+            float(np.percentile(latencies, q)) if len(latencies) else 0.0
+        )
+    samples = np.array(clock.samples, np.float64)
+    samples = samples[samples[:, 0] >= warmup * frames] if len(samples) else samples
+    if len(samples) >= 2:
+        # Least-squares slope per frame, so one noisy sample doesn't decide it
+        blocks = np.polyfit(samples[:, 0], samples[:, 1], 1)[0]
+        rss = np.polyfit(samples[:, 0], samples[:, 2], 1)[0]
+        result["blocks_per_1000_frames"] = float(blocks * 1000)
+        result["rss_kb_per_1000_frames"] = float(rss * 1000 / 1024)
+        result["rss_mb"] = float(samples[-1, 2] / 2**20)
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--mode", choices=MODES, default="play")
+    parser.add_argument("--frames", type=int, default=20_000)
+    parser.add_argument("--players", type=int, default=4)
+    parser.add_argument("--motion", type=int, default=8, help="motion events per frame")
+    parser.add_argument("--click-every", type=int, default=4, help="frames per click")
+    parser.add_argument("--sample-every", type=int, default=1000, help="frames")
+    parser.add_argument(
+        "--warmup", type=float, default=0.1, help="share of frames left out of growth"
+    )
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="also write the results to this JSON file")
+    args = parser.parse_args()
+
+    result = run_load(
+        args.mode,
+        args.frames,
+        args.players,
+        args.motion,
+        args.click_every,
+        args.sample_every,
+        args.warmup,
+        args.seed,
+    )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+    print(
+        f"{result['mode']}: {result['frames']:,} frames in {result['seconds']:.1f}s "
+        f"({result['frames_per_second']:,.0f} frames/s), "
+        f"{result['events_per_second']:,.0f} events/s"
+    )
+    print(
+        f"{result['clicks']:,} clicks, {result['clicks_redrawn']:,} redrawn, "
+        f"{result['actions']:,} actions logged"
+    )
+    print(
+        "click to redraw "
+        + "  ".join(
+            f"p{q} {result[f'click_latency_p{q}_ms']:.3f} ms" for q in (50, 95, 99)
+        )
+    )
+    if "blocks_per_1000_frames" in result:
+        print(
+            f"memory {result['rss_mb']:.1f} MB resident, growth per 1000 frames: "
+            f"{result['blocks_per_1000_frames']:+.1f} blocks, "
+            f"{result['rss_kb_per_1000_frames']:+.1f} KB"
+        )
+    cache = result["text_cache"]
+    print(
+        f"text cache {cache['size']} surfaces, "
+        f"{cache['hits']:,} hits, {cache['misses']:,} misses"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,329 @@
+"""
+Benchmarks for the render loop and rule handling.
+
+Runs headless under the dummy SDL video driver. Every benchmark reports the
+median time per operation over several rounds. An extra round runs under
+tracemalloc, too slow to time, for memory: the bytes each operation allocates
+(its peak above where it started, so a surface or text render made and freed
+on every call still shows), the blocks it leaves allocated (to spot leaks) and
+the round's peak. Results are written as JSON and compared with a stored
+baseline; any benchmark slower than the baseline by more than the threshold
+is flagged and makes the run exit with status 1.
+
+    python -m benchmarks.run                    # run, compare with baseline
+    python -m benchmarks.run --save-baseline    # run, store as the new baseline
+    python -m benchmarks.run -k hover draw      # only matching benchmarks
+"""
+
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+from src import engine
+from src.game import Game
+from src.objects.die import Die
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BASELINE = os.path.join(HERE, "baseline.json")
+RESULTS = os.path.join(HERE, "results.json")
+
+BENCHMARKS = {}
+
+
+def benchmark(name: str, ops: int = 2000, warmup: int = 10):
+    """
+    Registers a benchmark.
+
+    The decorated function gets a fresh Game and returns the operation to time,
+    optionally paired with a reset callable that runs untimed before each call.
+    """
+
+    def register(setup):
+        BENCHMARKS[name] = (setup, ops, warmup)
+        return setup
+
+    return register
+
+
+@benchmark("game.draw")
+def bench_draw(game: Game):
+    game._apply(engine.ROLL)
+    dice = [die for dice in game.dice.values() for die in dice]
+
+    def op():
+        # Change one die per frame, as a click or hover would
+        die = dice[op.frame % len(dice)]
+        die.set_hover(not die.hover)
+        op.frame += 1
+        game._draw()
+
+    op.frame = 0
+    return op
+
+
+@benchmark("game.draw_idle", ops=5000)
+def bench_draw_idle(game: Game):
+    game._apply(engine.ROLL)
+    game._draw()
+    return game._draw
+
+
+@benchmark("game.detect_hover", ops=5000)
+def bench_detect_hover(game: Game):
+    game._apply(engine.ROLL)
+    points = [
+        (x, y) for x in range(0, game.window_width, 37) for y in range(0, 600, 41)
+    ]
+
+    def op():
+        game._detect_hover(points[op.i % len(points)])
+        op.i += 1
+
+    op.i = 0
+    return op
+
+
+def _bench_click_white(value: int):
+    def setup(game: Game):
+        game._apply(engine.ROLL)
+        state = game.state
+        # A White die showing `value`, with Red dice that don't block it
+        state.dice[engine.WHITE][0] = value
+        state.dice[engine.RED][0] = 1 if value != 1 else 2
+        game._sync()
+        snapshot = game.snapshot()
+        pos = game.dice[Die.WHITE][0].rect.center
+
+        def reset():
+            game.restore(snapshot)
+
+        return (lambda: game._on_left_click(pos)), reset
+
+    return setup
+
+
+for _value in range(1, 7):
+    benchmark(f"game.on_left_click.white_{_value}")(_bench_click_white(_value))
+
+
+@benchmark("die.draw_to_surf", ops=20000)
+def bench_die_draw(game: Game):
+    die = game.dice[Die.GREEN][0]
+
+    def op():
+        die.value = op.i % 6 + 1
+        die.hover = op.i % 2 == 0
+        die._draw_to_surf()
+        die.surf
+        op.i += 1
+
+    op.i = 0
+    return op
+
+
+@benchmark("button.set_text", ops=5000)
+def bench_button_set_text(game: Game):
+    button = game.buttons["roll"]
+    texts = ("Roll", "Reroll")
+
+    def op():
+        button.set_text(texts[op.i % 2])
+        button.surf
+        op.i += 1
+
+    op.i = 0
+    return op
+
+
+@benchmark("game.startup", ops=50, warmup=1)
+def bench_startup(game: Game):
+    # Construction up to the first frame, with the font path already cached
+    def op():
+        Game(4, seed=1)._draw()
+
+    return op
+
+
+class _ScriptedClock:
+    """Stands in for pygame's Clock: uncapped, posts synthetic input each frame."""
+
+    def __init__(self, game: Game, frames: int) -> None:
+        self.game = game
+        self.frames = frames
+        self.frame = 0
+        self.targets = [
+            die.rect.center for dice in game.dice.values() for die in dice
+        ] + [button.rect.center for button in game.buttons.values()]
+
+    def tick(self, framerate: int = 0) -> int:
+        self.frame += 1
+        if self.frame > self.frames:
+            pygame.event.post(pygame.event.Event(pygame.QUIT))
+            return 0
+        target = self.targets[self.frame % len(self.targets)]
+        for dx in (-3, -1, 0):
+            pygame.event.post(
+                pygame.event.Event(
+                    pygame.MOUSEMOTION,
+                    pos=(target[0] + dx, target[1]),
+                    rel=(1, 0),
+                    buttons=(0, 0, 0),
+                )
+            )
+        if self.frame % 7 == 0:
+            pygame.event.post(
+                pygame.event.Event(
+                    pygame.MOUSEBUTTONDOWN, pos=target, button=pygame.BUTTON_LEFT
+                )
+            )
+        return 0
+
+
+# Game.run shuts pygame down when it returns, so each round runs it once
+@benchmark("game.run_frame", ops=1, warmup=0)
+def bench_run(game: Game):
+    frames = 1000
+
+    def op():
+        game.clock = _ScriptedClock(game, frames)
+        game.run()
+
+    op.per_call = frames
+    return op
+
+
+def run_benchmark(name: str, rounds: int) -> dict:
+    setup, ops, warmup = BENCHMARKS[name]
+    times = []
+    allocated = blocks = peak = 0
+    # One extra round runs under tracemalloc, which is too slow to time
+    for traced in [False] * rounds + [True]:
+        game = Game(4, seed=1)
+        prepared = setup(game)
+        op, reset = prepared if isinstance(prepared, tuple) else (prepared, None)
+        per_call = getattr(op, "per_call", 1)
+
+        # Warm caches so the first-call cost doesn't skew the round
+        for _ in range(warmup):
+            if reset:
+                reset()
+            op()
+
+        if traced:
+            tracemalloc.start()
+            before = tracemalloc.take_snapshot()
+        elapsed = 0
+        for _ in range(ops):
+            if reset:
+                reset()
+            if traced:
+                tracemalloc.reset_peak()
+                current = tracemalloc.get_traced_memory()[0]
+            start = time.perf_counter_ns()
+            op()
+            elapsed += time.perf_counter_ns() - start
+            if traced:
+                op_peak = tracemalloc.get_traced_memory()[1]
+                allocated += op_peak - current
+                peak = max(peak, op_peak)
+        if traced:
+            after = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+            blocks = _blocks_left(before, after)
+        else:
+            times.append(elapsed / 1000 / (ops * per_call))
+        if pygame.get_init():
+            game._exit()
+    return {
+        "us_per_op": statistics.median(times),
+        "min_us_per_op": min(times),
+        "alloc_bytes_per_op": allocated / (ops * per_call),
+        "blocks_per_op": blocks / (ops * per_call),
+        "peak_bytes": peak,
+        "ops": ops * per_call,
+    }
+
+
+def _blocks_left(before, after) -> int:
+    """Returns the net blocks allocated between two snapshots, ignoring ours."""
+    ignored = [
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+    ]
+    stats = after.filter_traces(ignored).compare_to(
+        before.filter_traces(ignored), "filename"
+    )
+    return sum(stat.count_diff for stat in stats)
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """Prints a comparison table and returns the names of regressed benchmarks."""
+    regressed = []
+    print(
+        f"{'benchmark':<34}{'us/op':>10}{'baseline':>10}{'ratio':>8}"
+        f"{'B/op':>8}{'blocks':>8}"
+    )
+    for name, result in results.items():
+        base = baseline.get(name)
+        line = f"{name:<34}{result['us_per_op']:>10.2f}"
+        slower = False
+        if base:
+            ratio = result["us_per_op"] / base["us_per_op"]
+            line += f"{base['us_per_op']:>10.2f}{ratio:>8.2f}"
+            slower = ratio > threshold
+        else:
+            line += f"{'-':>10}{'-':>8}"
+        line += f"{result['alloc_bytes_per_op']:>8.0f}{result['blocks_per_op']:>8.2f}"
+        if slower:
+            regressed.append(name)
+            line += "  SLOWER"
+        print(line)
+    return regressed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("-k", nargs="+", help="only run benchmarks containing these")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--threshold", type=float, default=1.25)
+    parser.add_argument("--output", default=RESULTS)
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args()
+
+    names = [
+        name
+        for name in BENCHMARKS
+        if not args.k or any(pattern in name for pattern in args.k)
+    ]
+    results = {name: run_benchmark(name, args.rounds) for name in names}
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    regressed = compare(results, baseline, args.threshold)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump({**baseline, **results}, f, indent=2)
+        print(f"Saved baseline to {args.baseline}")
+    elif regressed:
+        print(f"{len(regressed)} benchmark(s) slower than baseline")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,8 +6,53 @@ roll-and-reface dice game.
 """
 
 
+import argparse
+
 from src import config, game
+from src.profiler import FrameProfiler
 
 
 if __name__ == "__main__":
-    game.Game(config.NUM_PLAYERS).run()
+    parser = argparse.ArgumentParser(description="Make It Six")
+    parser.add_argument("--players", type=int, default=config.NUM_PLAYERS)
+    parser.add_argument("--seed", type=int, help="seed for reproducible dice rolls")
+    parser.add_argument("--record", help="save the game log here on exit")
+    parser.add_argument(
+        "--computer", type=int, nargs="+", default=(), help="players the computer plays"
+    )
+    parser.add_argument(
+        "--think", type=float, default=1.0, help="computer's seconds per move"
+    )
+    parser.add_argument(
+        "--connect", help="play on a table server (host:port or unix:path)"
+    )
+    parser.add_argument("--table", type=int, default=0, help="table to join")
+    parser.add_argument(
+        "--startup", action="store_true", help="print startup timings on exit"
+    )
+    parser.add_argument(
+        "--profile", help="time frames (F3 shows the overlay) and save JSON here"
+    )
+    args = parser.parse_args()
+
+    if args.connect:
+        from src.net.client import RemoteGame
+
+        table = RemoteGame(args.connect, args.table, args.players)
+    else:
+        table = game.Game(
+            args.players, seed=args.seed, computer=args.computer, think_time=args.think
+        )
+    if args.profile:
+        FrameProfiler().attach(table)
+    try:
+        table.run()
+    finally:
+        if args.record and not args.connect:
+            table.log.save(args.record)
+        if args.profile:
+            table.profiler.dump(args.profile)
+        if table.bot_worker is not None:
+            print(f"{table.bot_worker.playouts_per_second:,.0f} playouts/s")
+        if args.startup:
+            print(table.startup_report())
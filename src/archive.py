@@ -0,0 +1,287 @@
+"""
+Compact archive of finished games, with a memory-mapped index.
+
+An archive is two files. `<name>.mi6a` holds one record per game: a
+fixed-width header (player count, winner, turns, action count, seed) and the
+game's action bytes as in a `GameLog`. `<name>.mi6x` is the index, one
+fixed-width row per game with the record's offset, the same header fields,
+the final Blue dice and flags for notable events, found by replaying each game
+as it is added.
+
+Queries filter the memory-mapped index with NumPy and then seek only to the
+matching records, so the action data of other games is never read:
+
+    python -m src.archive build games --games 100000 --players 4
+    python -m src.archive query games --event blue-5-to-4 --players 4
+"""
+
+
+import argparse
+import random
+import struct
+import time
+
+import numpy as np
+
+from src import bots, engine
+from src.history import History
+from src.replay import REDO, UNDO, GameLog
+
+
+MAGIC = b"MI6A"
+INDEX_MAGIC = b"MI6X"
+VERSION = 1
+FILE_HEADER = struct.Struct("<4sBxxx")  # magic, version
+RECORD = struct.Struct("<BBxxIIQ")  # players, winner, turns, actions, seed
+
+# Event flags, set in the index when a game contains the event
+BLUE_5_TO_4 = 1  # A Red 6 cost a player on Blue 5 a point and the turn
+BLUE_4_TO_3 = 2  # A Red 6 cost a player on Blue 4 a point
+RED_SIX_HOLD = 4  # A Red 6 made a player on Blue 2 or 3 give up a die
+UNDONE = 8  # The log contains an undo or redo
+EVENTS = {
+    "blue-5-to-4": BLUE_5_TO_4,
+    "blue-4-to-3": BLUE_4_TO_3,
+    "red-six-hold": RED_SIX_HOLD,
+    "undone": UNDONE,
+}
+
+INDEX_DTYPE = np.dtype(
+    [
+        ("offset", "<u8"),
+        ("seed", "<u8"),
+        ("turns", "<u4"),
+        ("actions", "<u4"),
+        ("players", "u1"),
+        ("winner", "u1"),
+        ("flags", "<u2"),
+        ("blue", "u1", (6,)),
+    ]
+)
+INDEX_CHUNK = 1 << 16  # Index rows buffered before they are written
+
+
+def _replay(log: GameLog):
+    """
+    Replays a log, yielding (action number, player, event flags, state) after
+    each action, with the player whose turn it was.
+    """
+    state, rng = log.new_state()
+    history = History()
+    for i, action in enumerate(log):
+        player = state.player_turn
+        if action == UNDO:
+            state = history.undo(state)
+            yield i, player, UNDONE, state
+            continue
+        if action == REDO:
+            state = history.redo(state)
+            yield i, player, UNDONE, state
+            continue
+        blue = state.dice[engine.BLUE][player - 1]
+        holding = state.resolving_red_six
+        history.record(state)
+        engine.apply_action(state, action, rng)
+        flags = 0
+        after = state.dice[engine.BLUE][player - 1]
+        if (blue, after) == (5, 4):
+            flags |= BLUE_5_TO_4
+        elif (blue, after) == (4, 3):
+            flags |= BLUE_4_TO_3
+        if state.resolving_red_six and not holding:
+            flags |= RED_SIX_HOLD
+        yield i, player, flags, state
+
+
+def events(log: GameLog):
+    """Yields (action number, player, event flag) for each event in a log."""
+    for i, player, flags, _ in _replay(log):
+        for flag in EVENTS.values():
+            if flags & flag:
+                yield i, player, flag
+
+
+def summarize(log: GameLog) -> tuple[engine.State, int, int]:
+    """Replays a log and returns its final State, turns and event flags."""
+    state = log.new_state()[0]
+    turns = 0
+    seen = 0
+    for _, player, flags, state in _replay(log):
+        seen |= flags
+        if not flags & UNDONE and (state.player_turn != player or state.game_over):
+            turns += 1
+    return state, turns, seen
+
+
+class ArchiveWriter:
+    """Appends games to a new archive."""
+
+    def __init__(self, path: str) -> None:
+        self.data = open(path + ".mi6a", "wb")
+        self.data.write(FILE_HEADER.pack(MAGIC, VERSION))
+        self.index = open(path + ".mi6x", "wb")
+        self.index.write(FILE_HEADER.pack(INDEX_MAGIC, VERSION))
+        self.rows = np.zeros(INDEX_CHUNK, INDEX_DTYPE)
+        self.buffered = 0
+        self.count = 0
+
+    def add(self, log: GameLog) -> None:
+        state, turns, flags = summarize(log)
+        row = self.rows[self.buffered]
+        row["offset"] = self.data.tell()
+        row["seed"] = log.seed
+        row["turns"] = turns
+        row["actions"] = len(log)
+        row["players"] = log.players
+        row["winner"] = state.winner
+        row["flags"] = flags
+        row["blue"][: log.players] = state.dice[engine.BLUE]
+        self.data.write(
+            RECORD.pack(log.players, state.winner, turns, len(log), log.seed)
+        )
+        self.data.write(log.actions)
+        self.buffered += 1
+        self.count += 1
+        if self.buffered == INDEX_CHUNK:
+            self.flush()
+
+    def flush(self) -> None:
+        self.index.write(self.rows[: self.buffered].tobytes())
+        self.rows[:] = 0
+        self.buffered = 0
+
+    def close(self) -> None:
+        self.flush()
+        self.data.close()
+        self.index.close()
+
+    def __enter__(self) -> "ArchiveWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class Archive:
+    """Read access to an archive through its memory-mapped index."""
+
+    def __init__(self, path: str) -> None:
+        with open(path + ".mi6x", "rb") as f:
+            header = f.read(FILE_HEADER.size)
+            empty = not f.read(1)
+        if FILE_HEADER.unpack(header) != (INDEX_MAGIC, VERSION):
+            raise ValueError("Not a Make It Six archive index.")
+        if empty:
+            # NumPy can't map an empty file
+            self.index = np.zeros(0, INDEX_DTYPE)
+        else:
+            self.index = np.memmap(
+                path + ".mi6x", INDEX_DTYPE, "r", offset=FILE_HEADER.size
+            )
+        self.data = open(path + ".mi6a", "rb")
+        if FILE_HEADER.unpack(self.data.read(FILE_HEADER.size)) != (MAGIC, VERSION):
+            raise ValueError("Not a Make It Six archive.")
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def where(
+        self,
+        flags: int = 0,
+        players: int | None = None,
+        winner: int | None = None,
+        min_turns: int = 0,
+    ) -> np.ndarray:
+        """Returns the numbers of the games with all the given event flags."""
+        index = self.index
+        mask = (index["flags"] & flags) == flags
+        if players is not None:
+            mask &= index["players"] == players
+        if winner is not None:
+            mask &= index["winner"] == winner
+        if min_turns:
+            mask &= index["turns"] >= min_turns
+        return np.flatnonzero(mask)
+
+    def log(self, game: int) -> GameLog:
+        """Reads one game's record."""
+        self.data.seek(int(self.index["offset"][game]))
+        players, _, _, actions, seed = RECORD.unpack(self.data.read(RECORD.size))
+        return GameLog(players, seed, self.data.read(actions))
+
+    def logs(self, games: np.ndarray):
+        """Yields (game number, GameLog) for the given games, in file order."""
+        for game in games[np.argsort(self.index["offset"][games], kind="stable")]:
+            yield int(game), self.log(game)
+
+    def close(self) -> None:
+        self.data.close()
+        del self.index
+
+
+def build(
+    path: str, games: int, players: int, names: list[str], seed: int
+) -> ArchiveWriter:
+    """Archives bot games, seating `names` in turn around the table."""
+    rng = random.Random(seed)
+    with ArchiveWriter(path) as writer:
+        for game in range(games):
+            log = GameLog(players, rng.getrandbits(64))
+            state, game_rng = log.new_state()
+            seated = [
+                bots.BOTS[names[(game + i) % len(names)]]() for i in range(players)
+            ]
+            turns = 0
+            while not state.game_over and turns < 10_000:
+                player = state.player_turn
+                action = seated[player - 1].choose(state, game_rng)
+                engine.apply_action(state, action, game_rng)
+                log.record(action)
+                if state.player_turn != player:
+                    turns += 1
+            writer.add(log)
+    return writer
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    commands = parser.add_subparsers(dest="command", required=True)
+    build_parser = commands.add_parser("build", help="archive bot games")
+    build_parser.add_argument("path")
+    build_parser.add_argument("--games", type=int, default=10_000)
+    build_parser.add_argument("--players", type=int, default=4)
+    build_parser.add_argument("--bots", nargs="+", default=["greedy", "cautious"])
+    build_parser.add_argument("--seed", type=int, default=0)
+    query_parser = commands.add_parser("query", help="find games by event")
+    query_parser.add_argument("path")
+    query_parser.add_argument("--event", nargs="+", choices=EVENTS, default=[])
+    query_parser.add_argument("--players", type=int)
+    query_parser.add_argument("--winner", type=int)
+    query_parser.add_argument("--min-turns", type=int, default=0)
+    query_parser.add_argument("--show", type=int, default=10, help="games to list")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.command == "build":
+        writer = build(args.path, args.games, args.players, args.bots, args.seed)
+        elapsed = time.perf_counter() - start
+        print(f"Archived {writer.count:,} games in {elapsed:.1f}s")
+        return
+
+    archive = Archive(args.path)
+    flags = 0
+    for name in args.event:
+        flags |= EVENTS[name]
+    games = archive.where(flags, args.players, args.winner, args.min_turns)
+    elapsed = time.perf_counter() - start
+    print(f"{len(games):,} of {len(archive):,} games match ({elapsed * 1000:.1f} ms)")
+    for game, log in archive.logs(games[: args.show]):
+        found = [
+            (i, player) for i, player, flag in events(log) if flag & flags or not flags
+        ]
+        where = ", ".join(f"player {player} at action {i}" for i, player in found[:3])
+        print(f"  game {game} (seed {log.seed}): {where}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Computer players for the headless engine.
+
+A bot looks at an `engine.State` on its own turn and returns one of
+`engine.legal_actions(state)`. Bots never keep a random generator of their
+own: they draw from the one they are handed, so seeded games replay exactly.
+"""
+
+
+import random
+
+from src import engine
+
+
+class Bot:
+    name = "bot"
+
+    def choose(self, state: engine.State, rng) -> engine.Action:
+        raise NotImplementedError
+
+
+class RandomBot(Bot):
+    """Picks uniformly among legal actions, passing only when nothing else is left."""
+
+    name = "random"
+
+    def __init__(self, max_rerolls: int = 2) -> None:
+        self.max_rerolls = max_rerolls
+
+    def choose(self, state: engine.State, rng) -> engine.Action:
+        actions = [
+            action
+            for action in engine.legal_actions(state)
+            if action.kind != engine.Action.PASS
+            and not (
+                action.kind == engine.Action.REROLL
+                and state.turn_roll_count > self.max_rerolls
+            )
+        ]
+        if not actions:
+            return engine.PASS
+        return rng.choice(actions)
+
+
+class GreedyBot(Bot):
+    """
+    Uses whichever White die gets a Green 6 soonest, then rerolls, then passes.
+
+    This is the policy `src.sim.batch` plays in bulk, in the same order: White 1
+    on a Green 5, White 4 on a Green 1, White 2 copying a White 6, White 3,
+    White 6, then up to `max_rerolls` rerolls a turn.
+    """
+
+    name = "greedy"
+
+    def __init__(self, max_rerolls: int = 2) -> None:
+        self.max_rerolls = max_rerolls
+
+    def rerolls_allowed(self, state: engine.State) -> int:
+        return self.max_rerolls
+
+    def choose(self, state: engine.State, rng) -> engine.Action:
+        if state.game_over:
+            raise ValueError("Game is over.")
+        if state.turn_pre_roll:
+            return engine.ROLL
+        actions = engine.legal_actions(state)
+        if state.active_white is None:
+            return self._choose_white(state, actions)
+        return self._choose_target(state, actions)
+
+    def _choose_white(
+        self, state: engine.State, actions: tuple[engine.Action, ...]
+    ) -> engine.Action:
+        white, green = state.dice[engine.WHITE], state.dice[engine.GREEN]
+        usable = {}
+        for action in actions:
+            if action.kind == engine.Action.PICK:
+                usable.setdefault(white[action.index], action)
+        white_six = any(
+            value == 6 and playing for value, playing in zip(white, state.white_in_game)
+        )
+        if 1 in usable and 5 in green:
+            return usable[1]
+        if 4 in usable and 1 in green:
+            return usable[4]
+        if 2 in usable and white_six and green.count(6) < len(green):
+            return usable[2]
+        for value in (3, 6):
+            if value in usable:
+                return usable[value]
+        if state.turn_roll_count - 1 < self.rerolls_allowed(state):
+            return engine.REROLL
+        return engine.PASS
+
+    def _choose_target(
+        self, state: engine.State, actions: tuple[engine.Action, ...]
+    ) -> engine.Action:
+        white, green = state.dice[engine.WHITE], state.dice[engine.GREEN]
+        match state.active_white_value:
+            case 1:
+                wanted = lambda a: a.color == engine.GREEN and green[a.index] == 5
+            case 2 if not state.turn_mid_action:
+                wanted = lambda a: a.color == engine.GREEN and green[a.index] != 6
+            case 2:
+                wanted = lambda a: white[a.index] == 6
+            case 3:
+                wanted = lambda a: green[a.index] != 6
+            case 4:
+                wanted = lambda a: a.color == engine.GREEN and green[a.index] == 1
+            case _:
+                wanted = lambda a: False
+        for action in actions:
+            if action.kind == engine.Action.PICK and wanted(action):
+                return action
+        return engine.PASS
+
+
+class CautiousBot(GreedyBot):
+    """Greedy, but rerolls less once a Red 6 would cost a Blue level."""
+
+    name = "cautious"
+
+    # Rerolls allowed per turn, by the player's Blue value
+    REROLLS = {1: 4, 2: 3, 3: 3, 4: 0, 5: 1}
+
+    def rerolls_allowed(self, state: engine.State) -> int:
+        return self.REROLLS[state.dice[engine.BLUE][state.player_turn - 1]]
+
+
+BOTS = {bot.name: bot for bot in (RandomBot, GreedyBot, CautiousBot)}
+
+
+def play_game(bots: list[Bot], rng=random, max_turns: int = 10_000) -> tuple[int, int]:
+    """
+    Plays one game with bots[i] in seat i + 1.
+
+    Returns the winning player (0 if max_turns ran out) and the turns played.
+    """
+    state = engine.State(len(bots))
+    turns = 0
+    while not state.game_over and turns < max_turns:
+        player = state.player_turn
+        engine.apply_action(state, bots[player - 1].choose(state, rng), rng)
+        if state.player_turn != player or state.game_over:
+            turns += 1
+    return state.winner, turns
@@ -6,6 +6,7 @@ DIE_PIP_RADIUS = int(DIE_SIZE / 10)
 DIE_MARGIN = DIE_PIP_RADIUS
 TEXT_COLOR = (255, 255, 255, 255)
 TEXT_SIZE = 20
+FONT_NAME = "Consolas"
 BUTTON_SIZE = (BUTTON_WIDTH, BUTTON_HEIGHT) = (
     int(WINDOW_WIDTH / 6),
     int(WINDOW_HEIGHT / 12),
@@ -14,3 +15,8 @@ BUTTON_COLOR = (192, 191, 145, 255)
 BUTTON_HOVER_COLOR = (255, 253, 208, 255)
 BUTTON_TEXT_COLOR = (0, 0, 0, 255)
 BUTTON_MARGIN = int(WINDOW_WIDTH / 80)
+TEXT_CACHE_SIZE = 128  # Rendered text surfaces kept by the LRU cache
+PROFILE_FRAMES = 600  # Frames kept by the frame-time profiler
+FRAME_RATE = 60  # Frame cap while anything on screen is changing
+IDLE_FRAME_RATE = 20  # Event polling rate once nothing on screen is changing
+UNDO_LIMIT = 256  # Actions that can be undone
@@ -0,0 +1,495 @@
+"""
+Headless rules engine for Make It Six.
+
+Everything in here is plain Python: no pygame, no surfaces, no display. A
+game is a `State` that is advanced by `apply_action`, and `legal_actions`
+lists every move the current player may make. `Game` wraps a `State` and
+mirrors it onto its `Die` and `Button` objects for drawing.
+"""
+
+
+import random
+from typing import NamedTuple
+
+
+RED = "r"
+GREEN = "g"
+BLUE = "b"
+WHITE = "w"
+
+# Number of dice of each colour on the table (Blue is one per player)
+NUM_RED = 2
+NUM_GREEN = 4
+NUM_WHITE = 4
+
+# Blue value a player has to reach to win
+WINNING_VALUE = 6
+
+
+class Action(NamedTuple):
+    kind: str
+    color: str = ""
+    index: int = 0
+
+    ROLL = "roll"
+    REROLL = "reroll"
+    PASS = "pass"
+    PICK = "pick"  # Click on the die at dice[color][index]
+    CANCEL = "cancel"
+
+
+ROLL = Action(Action.ROLL)
+REROLL = Action(Action.REROLL)
+PASS = Action(Action.PASS)
+CANCEL = Action(Action.CANCEL)
+
+# Dice that can be picked, in the bit order of the masks below
+PICK_DICE = (
+    tuple((RED, i) for i in range(NUM_RED))
+    + tuple((GREEN, i) for i in range(NUM_GREEN))
+    + tuple((WHITE, i) for i in range(NUM_WHITE))
+)
+PICK_SLOTS = {die: slot for slot, die in enumerate(PICK_DICE)}
+_PICKS = tuple(Action(Action.PICK, color, i) for color, i in PICK_DICE)
+_GREEN_BASE = NUM_RED
+_WHITE_BASE = NUM_RED + NUM_GREEN
+_RED_SLOTS = (1 << NUM_RED) - 1
+_GREEN_SLOTS = ((1 << NUM_GREEN) - 1) << _GREEN_BASE
+_WHITE_SLOTS = ((1 << NUM_WHITE) - 1) << _WHITE_BASE
+_NON_BLUE_SLOTS = _RED_SLOTS | _GREEN_SLOTS | _WHITE_SLOTS
+
+# Dice each White value may target, by (value, second step)
+_TARGET_SLOTS = {
+    (1, False): _NON_BLUE_SLOTS,
+    (2, False): _NON_BLUE_SLOTS,
+    (2, True): _WHITE_SLOTS,
+    (3, False): _GREEN_SLOTS,
+    (3, True): _GREEN_SLOTS,
+    (4, False): _NON_BLUE_SLOTS,
+    (5, False): _NON_BLUE_SLOTS,
+    (5, True): _NON_BLUE_SLOTS,
+}
+
+
+def _faces(*values: int) -> int:
+    return sum(1 << value for value in values)
+
+
+# Faces blocked while a White die is active, per slot, by (value, second step):
+# White 1 can't raise a 6, White 5 can't push a die past 6 (a Green past 5,
+# which would make it six) nor take one below 1
+_BLOCKED_FACES = {
+    (1, False): (_faces(6),) * len(PICK_DICE),
+    (5, False): tuple(
+        _faces(4, 5, 6) if color == GREEN else _faces(5, 6) for color, _ in PICK_DICE
+    ),
+    (5, True): (_faces(1, 2),) * len(PICK_DICE),
+}
+
+# Every legal action list there can be, by mask of pickable dice
+_PRE_ROLL_ACTIONS = (ROLL, PASS)
+_CHOOSE_WHITE_ACTIONS = tuple(
+    (PASS, REROLL)
+    + tuple(_PICKS[_WHITE_BASE + i] for i in range(NUM_WHITE) if mask >> i & 1)
+    for mask in range(1 << NUM_WHITE)
+)
+_CHOOSE_TARGET_ACTIONS = tuple(
+    (PASS,) + tuple(pick for slot, pick in enumerate(_PICKS) if mask >> slot & 1)
+    for mask in range(1 << len(PICK_DICE))
+)
+
+
+class State:
+    """Complete rule state of one game of Make It Six."""
+
+    __slots__ = (
+        "players",
+        "player_turn",
+        "winner",
+        "dice",
+        "red_in_game",
+        "white_in_game",
+        "active_white",
+        "active_target",
+        "turn_pre_roll",
+        "turn_roll_count",
+        "turn_mid_action",
+        "resolving_red_six",
+        "pre_tiebreak",
+        "action_start",
+    )
+
+    def __init__(self, players: int) -> None:
+        if players not in range(2, 7):
+            raise NotImplementedError("Game must have 2-6 players.")
+        self.players = players
+        self.player_turn = 1
+        self.winner = 0
+        self.dice = {
+            RED: [1] * NUM_RED,
+            GREEN: [1] * NUM_GREEN,
+            WHITE: [1] * NUM_WHITE,
+            BLUE: [1] * players,
+        }
+        self.red_in_game = [True] + [False] * (NUM_RED - 1)
+        self.white_in_game = [True] * NUM_WHITE
+        self.active_white = None  # Index of the activated White die
+        self.active_target = None  # (color, index) of the die a White 2/5 acts on
+        self.turn_pre_roll = True
+        self.turn_roll_count = 0
+        self.turn_mid_action = False
+        self.resolving_red_six = False
+        self.pre_tiebreak = False
+        self.action_start = None  # Copy from before the White action in progress
+
+    def copy(self) -> "State":
+        new = State.__new__(State)
+        new.players = self.players
+        new.player_turn = self.player_turn
+        new.winner = self.winner
+        new.dice = {key: values[:] for key, values in self.dice.items()}
+        new.red_in_game = self.red_in_game[:]
+        new.white_in_game = self.white_in_game[:]
+        new.active_white = self.active_white
+        new.active_target = self.active_target
+        new.turn_pre_roll = self.turn_pre_roll
+        new.turn_roll_count = self.turn_roll_count
+        new.turn_mid_action = self.turn_mid_action
+        new.resolving_red_six = self.resolving_red_six
+        new.pre_tiebreak = self.pre_tiebreak
+        new.action_start = self.action_start  # Never mutated, so safe to share
+        return new
+
+    @property
+    def game_over(self) -> bool:
+        return self.winner != 0
+
+    @property
+    def active_white_value(self) -> int:
+        """Value of the activated White die, or 0 if none is activated."""
+        if self.active_white is None:
+            return 0
+        return self.dice[WHITE][self.active_white]
+
+
+def in_game(state: State, color: str, index: int) -> bool:
+    """Returns whether a die is currently on the table."""
+    if color == RED:
+        return state.red_in_game[index]
+    if color == WHITE:
+        return state.white_in_game[index]
+    return True
+
+
+def is_activated(state: State, color: str, index: int) -> bool:
+    if color == WHITE and index == state.active_white:
+        return True
+    return state.active_target == (color, index) and state.active_white_value == 2
+
+
+def is_blocked(state: State, color: str, index: int) -> bool:
+    """
+    Returns whether a die is blocked, i.e. cannot currently be chosen.
+
+    White dice showing the value of a Red die in play can't be activated. While
+    a White die is active, dice its effect can't legally apply to are blocked.
+    """
+    if color == BLUE:
+        return False
+    return bool(blocked_mask(state) >> PICK_SLOTS[color, index] & 1)
+
+
+def blocked_mask(state: State) -> int:
+    """Returns the blocked dice as a mask with one bit per `PICK_DICE` slot."""
+    dice = state.dice
+    active = state.active_white
+    if active is None:
+        red_faces = 0
+        for value, playing in zip(dice[RED], state.red_in_game):
+            if playing:
+                red_faces |= 1 << value
+        mask = 0
+        bit = 1 << _WHITE_BASE
+        for value in dice[WHITE]:
+            if red_faces >> value & 1:
+                mask |= bit
+            bit <<= 1
+        return mask
+
+    white_value = dice[WHITE][active]
+    mid = state.turn_mid_action
+    mask = 0
+    faces = _BLOCKED_FACES.get((white_value, mid))
+    if faces is not None:
+        slot = 0
+        for key in (RED, GREEN, WHITE):
+            for value in dice[key]:
+                if faces[slot] >> value & 1:
+                    mask |= 1 << slot
+                slot += 1
+    if mid and white_value != 2:
+        # The die a White 3 or 5 changed first can't be picked again
+        mask |= 1 << PICK_SLOTS[state.active_target]
+    return mask
+
+
+def instruction(state: State) -> str:
+    """Returns the instruction for the player whose turn it is."""
+    if state.game_over:
+        return f"Player {state.winner} wins!"
+    if state.turn_pre_roll:
+        return "Click Roll to begin turn"
+    match state.active_white_value:
+        case 1:
+            return "Choose a non-Blue die to increment by 1"
+        case 2:
+            if state.turn_mid_action:
+                return "Choose a White die to copy"
+            return "Choose a non-Blue die to reface"
+        case 3:
+            if state.turn_mid_action:
+                return "Choose second Green die to reroll"
+            return "Choose first Green die to reroll"
+        case 4:
+            return "Choose a non-Blue die to flip"
+        case 5:
+            if state.turn_mid_action:
+                return "Choose a non-Blue die to decrement by 2"
+            return "Choose a non-Blue die to increment by 2"
+    return "Choose a White die to activate, or click Reroll"
+
+
+def legal_actions(state: State) -> tuple[Action, ...]:
+    """
+    Returns every action the current player may take.
+
+    `CANCEL` is not listed: it only undoes a half-finished White die action and
+    is accepted by `apply_action` whenever a White die is active. The returned
+    tuples are precomputed and shared, so this allocates no actions.
+    """
+    if state.game_over:
+        return ()
+    if state.turn_pre_roll:
+        return _PRE_ROLL_ACTIONS
+    blocked = blocked_mask(state)
+    active = state.active_white
+    white_in_game = state.white_in_game
+    playing = 0
+    for i in range(NUM_WHITE):
+        if white_in_game[i]:
+            playing |= 1 << i
+    if active is None:
+        return _CHOOSE_WHITE_ACTIONS[playing & ~(blocked >> _WHITE_BASE)]
+
+    white_value = state.dice[WHITE][active]
+    mid = state.turn_mid_action
+    red_in_game = state.red_in_game
+    in_play = _GREEN_SLOTS | playing << _WHITE_BASE | red_in_game[0]
+    if red_in_game[1]:
+        in_play |= 2
+    mask = _TARGET_SLOTS[white_value, mid] & in_play & ~(1 << _WHITE_BASE + active)
+    if white_value == 2 and mid:
+        mask &= ~(1 << PICK_SLOTS[state.active_target])
+    if white_value != 4:
+        # White 4 may flip blocked dice; every other action skips them
+        mask &= ~blocked
+    return _CHOOSE_TARGET_ACTIONS[mask]
+
+
+def apply_action(state: State, action: Action, rng=random) -> str | None:
+    """
+    Applies a legal action to the state in place.
+
+    `rng` is anything with a `randint` method. Returns a notice for the players
+    when the action ended the turn unexpectedly or ended the game, else None.
+    """
+    red_before = state.dice[RED][:]
+    match action.kind:
+        case Action.PASS:
+            _next_player_turn(state)
+            return None
+        case Action.ROLL:
+            _roll_all(state, rng)
+        case Action.REROLL:
+            _reroll_white_and_red(state, rng)
+        case Action.CANCEL:
+            _cancel_action(state)
+            return None
+        case Action.PICK:
+            if state.active_white is None:
+                _activate_white(state, action.index, rng)
+            else:
+                _apply_white(state, action.color, action.index, rng)
+    _resolve_green(state)
+    notice = _resolve_blue(state)
+    if notice is None and not state.turn_pre_roll:
+        # Only a Red die that was just rolled or changed to 6 costs the player
+        if action.kind in (Action.ROLL, Action.REROLL):
+            red_six = 6 in _red_values(state)
+        else:
+            red_six = any(
+                value == 6 and value != before
+                for value, before in zip(state.dice[RED], red_before)
+            )
+        if red_six:
+            notice = _resolve_red(state, rng)
+    return notice
+
+
+def _red_values(state: State) -> tuple[int, ...]:
+    return tuple(
+        value for value, playing in zip(state.dice[RED], state.red_in_game) if playing
+    )
+
+
+def _roll(state: State, color: str, index: int, rng) -> None:
+    state.dice[color][index] = rng.randint(1, 6)
+
+
+def _roll_all(state: State, rng) -> None:
+    """Performs initial roll of all non-blue dice."""
+    for key in (RED, GREEN, WHITE):
+        for i in range(len(state.dice[key])):
+            if in_game(state, key, i):
+                _roll(state, key, i, rng)
+    state.turn_pre_roll = False
+    state.turn_roll_count += 1
+
+
+def _reroll_white_and_red(state: State, rng) -> None:
+    """Rerolls all White and Red dice and adds the second Red die to the game."""
+    state.red_in_game[1] = True
+    for key in (RED, WHITE):
+        for i in range(len(state.dice[key])):
+            if in_game(state, key, i):
+                _roll(state, key, i, rng)
+    state.turn_roll_count += 1
+
+
+def _activate_white(state: State, index: int, rng) -> None:
+    if state.dice[WHITE][index] == 6:
+        # White 6 rerolls every White die still in play
+        for i in range(NUM_WHITE):
+            if state.white_in_game[i]:
+                _roll(state, WHITE, i, rng)
+    else:
+        state.action_start = state.copy()
+        state.active_white = index
+
+
+def _apply_white(state: State, color: str, index: int, rng) -> None:
+    values = state.dice[color]
+    match state.active_white_value:
+        case 1:
+            values[index] += 1
+            _finish_white(state)
+        case 2:
+            # First click picks the die to reface, second picks the White to copy
+            if not state.turn_mid_action:
+                state.active_target = (color, index)
+                state.turn_mid_action = True
+            else:
+                target_color, target_index = state.active_target
+                state.dice[target_color][target_index] = values[index]
+                _finish_white(state)
+        case 3:
+            _roll(state, color, index, rng)
+            if not state.turn_mid_action:
+                state.active_target = (color, index)
+                state.turn_mid_action = True
+            else:
+                _finish_white(state)
+        case 4:
+            values[index] = 7 - values[index]
+            _finish_white(state)
+        case 5:
+            # First click increments by 2, second click decrements another by 2
+            if not state.turn_mid_action:
+                values[index] += 2
+                state.active_target = (color, index)
+                state.turn_mid_action = True
+            else:
+                values[index] -= 2
+                _finish_white(state)
+
+
+def _finish_white(state: State) -> None:
+    """Removes the used White die from play and clears the action."""
+    state.white_in_game[state.active_white] = False
+    state.active_white = None
+    state.active_target = None
+    state.turn_mid_action = False
+    state.action_start = None
+
+
+def _reset_action(state: State) -> None:
+    state.active_white = None
+    state.active_target = None
+    state.turn_mid_action = False
+    state.action_start = None
+
+
+def _cancel_action(state: State) -> None:
+    """Puts the state back as it was before the White action in progress."""
+    if state.action_start is None:
+        _reset_action(state)
+        return
+    # Undoes the first step of a White 2/3/5, such as a Green rerolled by White 3
+    saved = state.action_start.copy()
+    for name in State.__slots__:
+        setattr(state, name, getattr(saved, name))
+
+
+def _next_player_turn(state: State) -> None:
+    """Passes the turn to the next player."""
+    if state.player_turn == state.players:
+        state.player_turn = 1
+    else:
+        state.player_turn += 1
+    _reset_action(state)
+    state.turn_pre_roll = True
+    state.turn_roll_count = 0
+    state.resolving_red_six = False
+    state.red_in_game = [True] + [False] * (NUM_RED - 1)
+    state.white_in_game = [True] * NUM_WHITE
+
+
+def _resolve_green(state: State) -> None:
+    if state.dice[GREEN].count(6) >= 3:
+        state.dice[BLUE][state.player_turn - 1] += 1
+        if state.dice[BLUE][state.player_turn - 1] < WINNING_VALUE:
+            _next_player_turn(state)
+
+
+def _resolve_blue(state: State) -> str | None:
+    """Detects win condition."""
+    for player, value in enumerate(state.dice[BLUE], 1):
+        if value >= WINNING_VALUE:
+            state.winner = player
+            _reset_action(state)
+            return f"Player {player} wins!"
+    return None
+
+
+def _resolve_red(state: State, rng) -> str | None:
+    """Applies the Red 6 penalty, which depends on the player's Blue value."""
+    blue = state.dice[BLUE]
+    match blue[state.player_turn - 1]:
+        case 1:
+            greens = state.dice[GREEN]
+            if 6 in greens:
+                _roll(state, GREEN, greens.index(6), rng)
+        case 2:
+            state.resolving_red_six = True
+        case 3:
+            state.resolving_red_six = True
+        case 4:
+            blue[state.player_turn - 1] = 3
+        case 5:
+            blue[state.player_turn - 1] = 4
+            notice = f"Player {state.player_turn} rolled Red 6, turn passed"
+            _next_player_turn(state)
+            return notice
+        case 6:
+            pass  # TODO: implement tiebreaker stuff
+    return None
@@ -0,0 +1,527 @@
+"""
+Breadth-first explorer of every reachable position within a turn.
+
+Nothing in a turn depends on the other players' Blue dice, the player count
+or which seat is moving, so the turn space is the same for 2-6 players: the
+mover's Blue value, the dice and the action in progress. Dice of one colour
+are interchangeable, so positions are canonicalized to sorted values, and
+each packs into a dense integer key (see `encode`). The visited set and the
+frontiers are bitsets over every possible key, about 80 MB each however many
+states there are, and a level is expanded chunk by chunk on a process pool
+with a bounded number of chunks in flight.
+
+Chance is expanded exhaustively: every roll is enumerated as one sorted
+outcome per group of dice rolled together, and an extra roll (a Green 6
+rerolled by a Red 6 on Blue 1) branches six ways. Reroll and White 6 outcomes
+don't depend on the dice being rerolled, so they go through chance nodes that
+are keys of their own, expanded once however many positions lead to them.
+
+The report gives states per second, how turns end, positions where a White
+die is active but nothing can be picked, and which arms of the engine's
+`match` statements were ever reached.
+
+    python -m src.explorer --workers 8
+    python -m src.explorer --blue 1 --max-levels 6
+"""
+
+
+import argparse
+import ast
+import inspect
+import itertools
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+from src import engine
+from src.engine import BLUE, GREEN, RED, WHITE, Action
+
+
+def _multisets(k: int) -> list[tuple[int, ...]]:
+    return list(itertools.combinations_with_replacement(range(1, 7), k))
+
+
+GREENS = _multisets(engine.NUM_GREEN)
+WHITES = [w for k in range(engine.NUM_WHITE + 1) for w in _multisets(k)]
+REDS = _multisets(1) + _multisets(engine.NUM_RED)  # Second Red out, then in
+GREEN_RANK = {values: i for i, values in enumerate(GREENS)}
+WHITE_RANK = {values: i for i, values in enumerate(WHITES)}
+RED_RANK = {values: i for i, values in enumerate(REDS)}
+ROLLS = {k: _multisets(k) for k in range(engine.NUM_GREEN + 1)}
+
+# What is in progress, as a tuple starting with its kind. A White 3 halfway
+# through keeps the first Green's old value, for CANCEL to put back.
+PHASES = (
+    [("pre_roll",), ("choose",)]
+    + [("active", value) for value in range(1, 6)]
+    + [("w2", color, value) for color in (RED, GREEN, WHITE) for value in range(1, 7)]
+    + [("w3", value, old) for value in range(1, 7) for old in range(1, 7)]
+    + [
+        ("w5", color, value)
+        for color in (RED, GREEN, WHITE)
+        for value in range(3, 7)
+        if (color, value) != (RED, 6)
+    ]
+    # A White 5 that raised a Red die to 6 has also applied the penalty, which
+    # CANCEL takes back: Blue and Red 6 hold from before, and the value a Green
+    # 6 was rerolled to (0: none was)
+    + [
+        ("w5_red_six", blue, resolving, rerolled)
+        for blue in range(1, 5)
+        for resolving in (False, True)
+        for rerolled in (range(6) if blue == 1 else (0,))
+    ]
+    # Chance nodes: dice about to be rerolled, keyed by what the outcome needs
+    + [("reroll",), ("white_6",)]
+)
+PHASE_RANK = {phase: i for i, phase in enumerate(PHASES)}
+RADICES = (len(GREENS), len(WHITES), len(REDS), 2, 5, len(PHASES))
+SPACE = int(np.prod(RADICES, dtype=np.uint64))
+
+CHUNK = 20_000  # Keys per task
+SCAN_BYTES = 1 << 20  # Bitset bytes scanned for frontier keys at a time
+
+# How a turn can end
+ENDINGS = ("pass", "three_sixes", "red_six", "win")
+
+
+def encode(green, white, red, resolving: bool, blue: int, phase: tuple) -> int:
+    """Packs a position into its key; dice values must be sorted."""
+    key = PHASE_RANK[phase]
+    key = key * 5 + blue - 1
+    key = key * 2 + resolving
+    key = key * len(REDS) + RED_RANK[red]
+    key = key * len(WHITES) + WHITE_RANK[white]
+    return key * len(GREENS) + GREEN_RANK[green]
+
+
+def decode(key: int) -> tuple:
+    """Returns (green, white, red, resolving, blue, phase) of a key."""
+    key, green = divmod(key, len(GREENS))
+    key, white = divmod(key, len(WHITES))
+    key, red = divmod(key, len(REDS))
+    key, resolving = divmod(key, 2)
+    phase, blue = divmod(key, 5)
+    return (
+        GREENS[green],
+        WHITES[white],
+        REDS[red],
+        bool(resolving),
+        blue + 1,
+        PHASES[phase],
+    )
+
+
+def _first(values: list[int], value: int, skip: int | None = None) -> int:
+    return next(i for i, v in enumerate(values) if v == value and i != skip)
+
+
+def to_state(key: int) -> engine.State:
+    """Builds an engine State for a position, player 1 being the mover."""
+    green, white, red, resolving, blue, phase = decode(key)
+    state = engine.State(2)
+    state.dice[BLUE][0] = blue
+    state.resolving_red_six = resolving
+    kind = phase[0]
+    if kind == "pre_roll":
+        return state
+    state.turn_pre_roll = False
+    state.turn_roll_count = 1
+    state.dice[GREEN] = list(green)
+    # Dice out of play keep stale values, which no rule reads
+    state.dice[WHITE] = list(white) + [1] * (engine.NUM_WHITE - len(white))
+    state.white_in_game = [i < len(white) for i in range(engine.NUM_WHITE)]
+    state.dice[RED] = list(red) + [1] * (engine.NUM_RED - len(red))
+    state.red_in_game = [i < len(red) for i in range(engine.NUM_RED)]
+    if kind in ("choose", "reroll", "white_6"):
+        return state
+
+    value = phase[1] if kind == "active" else int(kind[1])
+    active = _first(state.dice[WHITE], value)
+    start = state.copy()
+    state.active_white = active
+    state.action_start = start
+    if kind == "active":
+        return state
+    state.turn_mid_action = True
+    if kind == "w3":
+        color, value = GREEN, phase[1]
+    elif kind == "w5_red_six":
+        color, value = RED, 6
+    else:
+        color, value = phase[1], phase[2]
+    index = _first(state.dice[color], value, active if color == WHITE else None)
+    state.active_target = (color, index)
+    if kind == "w3":
+        start.dice[GREEN][index] = phase[2]
+    elif kind == "w5":
+        start.dice[color][index] = value - 2
+    elif kind == "w5_red_six":
+        _, start.dice[BLUE][0], start.resolving_red_six, rerolled = phase
+        start.dice[RED][index] = 4
+        if rerolled:
+            start.dice[GREEN][_first(start.dice[GREEN], rerolled)] = 6
+    return state
+
+
+def key_of(state: engine.State) -> int:
+    """Returns the key of a State in which player 1 is still to move."""
+    dice = state.dice
+    blue = dice[BLUE][0]
+    resolving = state.resolving_red_six
+    if state.turn_pre_roll:
+        return encode(GREENS[0], (), REDS[0], resolving, blue, PHASES[0])
+    green = tuple(sorted(dice[GREEN]))
+    white = tuple(sorted(v for v, i in zip(dice[WHITE], state.white_in_game) if i))
+    red = tuple(sorted(v for v, i in zip(dice[RED], state.red_in_game) if i))
+    if state.active_white is None:
+        phase = ("choose",)
+    else:
+        value = dice[WHITE][state.active_white]
+        if not state.turn_mid_action:
+            phase = ("active", value)
+        else:
+            color, index = state.active_target
+            start = state.action_start
+            if value == 3:
+                phase = ("w3", dice[GREEN][index], start.dice[GREEN][index])
+            elif value == 5 and color == RED and dice[RED][index] == 6:
+                rerolled = Counter(dice[GREEN]) - Counter(start.dice[GREEN])
+                phase = (
+                    "w5_red_six",
+                    start.dice[BLUE][0],
+                    start.resolving_red_six,
+                    next(iter(rerolled), 0),
+                )
+            else:
+                phase = (f"w{value}", color, dice[color][index])
+    return encode(green, white, red, resolving, blue, phase)
+
+
+class _NeedRoll(Exception):
+    pass
+
+
+class _Script:
+    """An rng returning scripted rolls, which raises _NeedRoll past the end."""
+
+    def __init__(self, rolls: list[int]) -> None:
+        self.rolls = rolls
+        self.i = 0
+
+    def randint(self, low: int, high: int) -> int:
+        if self.i == len(self.rolls):
+            raise _NeedRoll
+        self.i += 1
+        return self.rolls[self.i - 1]
+
+
+def _outcomes(state: engine.State, action: Action, rolls: list[int]):
+    """Yields the State after an action for every way its extra rolls go."""
+    after = state.copy()
+    try:
+        engine.apply_action(after, action, _Script(rolls))
+    except _NeedRoll:
+        for value in range(1, 7):
+            yield from _outcomes(state, action, rolls + [value])
+        return
+    yield after
+
+
+def _rolled(state: engine.State, action: Action, groups: tuple[int, ...]):
+    """_outcomes for every sorted outcome of each group of dice rolled."""
+    for parts in itertools.product(*(ROLLS[k] for k in groups)):
+        yield from _outcomes(state, action, [v for part in parts for v in part])
+
+
+class _Expansion:
+    """What a worker found expanding a chunk of keys."""
+
+    def __init__(self) -> None:
+        self.keys = []
+        self.endings = dict.fromkeys(ENDINGS, 0)
+        self.stuck = 0
+        self.stuck_example = None
+        self.expanded = 0
+
+    def add(self, state: engine.State, blue: int) -> None:
+        if state.game_over:
+            self.endings["win"] += 1
+        elif state.player_turn != 1:
+            # Blue went up for three Green 6s, down for a Red 6 on Blue 5
+            after = state.dice[BLUE][0]
+            if after > blue:
+                self.endings["three_sixes"] += 1
+            elif after < blue:
+                self.endings["red_six"] += 1
+            else:
+                self.endings["pass"] += 1
+        else:
+            self.keys.append(key_of(state))
+
+
+def expand(keys: np.ndarray) -> tuple:
+    """Expands a chunk of keys. Runs inside a worker process."""
+    if not _watched:
+        _watch_arms()
+    result = _Expansion()
+    for key in keys.tolist():
+        _expand_key(key, result)
+    return (
+        np.unique(np.array(result.keys, np.uint64)),
+        result.endings,
+        result.stuck,
+        result.stuck_example,
+        result.expanded,
+        set(_reached),
+    )
+
+
+def _expand_key(key: int, result: _Expansion) -> None:
+    green, white, red, resolving, blue, phase = decode(key)
+    state = to_state(key)
+    result.expanded += 1
+    kind = phase[0]
+    if kind == "pre_roll":
+        groups = (1, engine.NUM_GREEN, engine.NUM_WHITE)
+        for after in _rolled(state, engine.ROLL, groups):
+            result.add(after, blue)
+        result.add(next(_outcomes(state, engine.PASS, [])), blue)
+        return
+    if kind == "reroll":
+        for after in _rolled(state, engine.REROLL, (engine.NUM_RED, len(white))):
+            result.add(after, blue)
+        return
+    if kind == "white_6":
+        pick = Action(Action.PICK, WHITE, 0)
+        for after in _rolled(state, pick, (len(white),)):
+            result.add(after, blue)
+        return
+
+    # Only called so the arms of its `match` count as reached
+    engine.instruction(state)
+    actions = engine.legal_actions(state)
+    if state.active_white is not None:
+        if actions == (engine.PASS,):
+            result.stuck += 1
+            if result.stuck_example is None:
+                result.stuck_example = key
+        actions += (engine.CANCEL,)
+    for action in actions:
+        if action == engine.REROLL:
+            # Only the number of White dice rerolled matters, not their values
+            placeholder = (1,) * len(white)
+            result.keys.append(
+                encode(green, placeholder, REDS[0], resolving, blue, ("reroll",))
+            )
+        elif (
+            action.kind == Action.PICK
+            and state.active_white is None
+            and state.dice[WHITE][action.index] == 6
+        ):
+            sixes = (6,) * len(white)
+            result.keys.append(encode(green, sixes, red, resolving, blue, ("white_6",)))
+        else:
+            for after in _outcomes(state, action, []):
+                result.add(after, blue)
+
+
+def match_arms() -> dict[int, str]:
+    """Returns each `case` in the engine, by the line its body starts on."""
+    source = inspect.getsource(engine)
+    arms = {}
+    for function in ast.parse(source).body:
+        if not isinstance(function, ast.FunctionDef):
+            continue
+        for node in ast.walk(function):
+            if isinstance(node, ast.Match):
+                for case in node.cases:
+                    pattern = ast.get_source_segment(source, case.pattern)
+                    arms[case.body[0].lineno] = f"{function.name}: case {pattern}"
+    return arms
+
+
+ARMS = match_arms()
+_reached = set()  # Body lines of the arms reached in this process
+_watched = []  # Names of the engine functions wrapped by _watch_arms
+
+
+def _watch_arms() -> None:
+    """
+    Wraps each engine function with arms in one that traces its lines, until
+    every arm in it has been reached and the original is put back. Calls
+    through `engine.` pick the wrapper up, the engine's own calls included.
+    """
+    for name in {name.split(":")[0] for name in ARMS.values()}:
+        function = getattr(engine, name)
+        lines = {line for line, arm in ARMS.items() if arm.startswith(name + ":")}
+        setattr(engine, name, _watch(name, function, lines))
+        _watched.append(name)
+
+
+def _watch(name: str, function, lines: set[int]):
+    code = function.__code__
+
+    def trace_calls(frame, event, arg):
+        return trace_lines if frame.f_code is code else None
+
+    def trace_lines(frame, event, arg):
+        if event == "line" and frame.f_lineno in lines:
+            lines.discard(frame.f_lineno)
+            _reached.add(frame.f_lineno)
+        return trace_lines
+
+    def watched(*args):
+        previous = sys.gettrace()
+        sys.settrace(trace_calls)
+        try:
+            return function(*args)
+        finally:
+            sys.settrace(previous)
+            if not lines:
+                setattr(engine, name, function)
+
+    return watched
+
+
+class Bitset:
+    """A bitset over keys 0 to size - 1, as a NumPy byte array."""
+
+    def __init__(self, size: int) -> None:
+        self.bits = np.zeros((size + 7) // 8, np.uint8)
+
+    def test(self, keys: np.ndarray) -> np.ndarray:
+        shifts = (keys & np.uint64(7)).astype(np.uint8)
+        return (self.bits[keys >> np.uint64(3)] >> shifts & 1).astype(bool)
+
+    def set(self, keys: np.ndarray) -> None:
+        bits = np.left_shift(1, keys & np.uint64(7)).astype(np.uint8)
+        np.bitwise_or.at(self.bits, keys >> np.uint64(3), bits)
+
+    def keys(self):
+        """Yields the keys that are set, in order, a block at a time."""
+        for start in range(0, len(self.bits), SCAN_BYTES):
+            block = self.bits[start : start + SCAN_BYTES]
+            if block.any():
+                found = np.flatnonzero(np.unpackbits(block, bitorder="little"))
+                yield found.astype(np.uint64) + np.uint64(start * 8)
+
+    def clear(self) -> None:
+        self.bits[:] = 0
+
+
+def _chunks(frontier: Bitset):
+    for block in frontier.keys():
+        for i in range(0, len(block), CHUNK):
+            yield block[i : i + CHUNK]
+
+
+def _expanded(pool: ProcessPoolExecutor, frontier: Bitset, in_flight: int):
+    """Yields expand() results for a frontier, with few chunks queued at once."""
+    chunks = _chunks(frontier)
+    pending = set()
+    while True:
+        for chunk in itertools.islice(chunks, in_flight - len(pending)):
+            pending.add(pool.submit(expand, chunk))
+        if not pending:
+            return
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            yield future.result()
+
+
+def explore(
+    blues=range(1, 6), workers: int | None = None, max_levels: int = 0, progress=None
+) -> dict:
+    """
+    Explores every position reachable from the start of a turn on the given
+    Blue values and returns the report. `progress`, if given, is called with
+    (level, new states, states so far) after every level.
+    """
+    start = time.perf_counter()
+    visited = Bitset(SPACE)
+    frontier = Bitset(SPACE)
+    following = Bitset(SPACE)
+    roots = np.array(
+        [encode(GREENS[0], (), REDS[0], False, blue, PHASES[0]) for blue in blues],
+        np.uint64,
+    )
+    visited.set(roots)
+    frontier.set(roots)
+    states = size = len(roots)
+    endings = dict.fromkeys(ENDINGS, 0)
+    stuck = expanded = level = 0
+    stuck_example = None
+    reached = set()
+    workers = workers or os.cpu_count() or 1
+    in_flight = 2 * workers
+    with ProcessPoolExecutor(workers) as pool:
+        while size and (not max_levels or level < max_levels):
+            size = 0
+            for successors, ends, stuck_here, example, count, arms in _expanded(
+                pool, frontier, in_flight
+            ):
+                fresh = successors[~visited.test(successors)]
+                visited.set(fresh)
+                following.set(fresh)
+                size += len(fresh)
+                for ending, n in ends.items():
+                    endings[ending] += n
+                stuck += stuck_here
+                if stuck_example is None:
+                    stuck_example = example
+                expanded += count
+                reached |= arms
+            states += size
+            level += 1
+            frontier, following = following, frontier
+            following.clear()
+            if progress is not None:
+                progress(level, size, states)
+    elapsed = time.perf_counter() - start
+    return {
+        "states": states,
+        "expanded": expanded,
+        "levels": level,
+        "complete": size == 0,
+        "elapsed": elapsed,
+        "states_per_second": expanded / elapsed,
+        "endings": endings,
+        "stuck": stuck,
+        "stuck_example": None if stuck_example is None else decode(stuck_example),
+        "arms": {name: line in reached for line, name in sorted(ARMS.items())},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--blue", nargs="+", type=int, default=[1, 2, 3, 4, 5])
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--max-levels", type=int, default=0, help="0: until done")
+    args = parser.parse_args()
+
+    def progress(level: int, size: int, states: int) -> None:
+        print(f"Level {level}: {size:,} new, {states:,} states", flush=True)
+
+    report = explore(args.blue, args.workers, args.max_levels, progress)
+    print(
+        f"{report['states']:,} states in {report['elapsed']:.1f}s "
+        f"({report['states_per_second']:,.0f} expanded/s)"
+        + ("" if report["complete"] else ", stopped early")
+    )
+    endings = report["endings"]
+    print("Turn endings:", ", ".join(f"{k} {v:,}" for k, v in endings.items()))
+    print(f"White die active with nothing to pick: {report['stuck']:,} positions")
+    if report["stuck_example"] is not None:
+        print(f"  e.g. {report['stuck_example']}")
+    print("Match arms:")
+    for name, reached in report["arms"].items():
+        print(f"  {'reached' if reached else 'NEVER  '}  {name}")
+
+
+if __name__ == "__main__":
+    main()
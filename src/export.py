@@ -0,0 +1,339 @@
+"""
+Offscreen export of recorded games to a PNG sequence or an animated GIF.
+
+The game is replayed through the usual `Game` layout under SDL's dummy video
+driver, so no window opens. The display surface is the only frame buffer:
+each action redraws just the regions the renderer finds changed, with one
+`Surface.blits` call, and an action that changes nothing adds no frame, only
+lengthens the previous one.
+
+A GIF stores each frame as the box of pixels that changed, with its own
+palette, on top of the frames before it. PNG sequences get a `frames.txt`
+listing each frame's duration in ffmpeg's concat format, for making a video:
+
+    python -m src.export game.mi6 game.gif --speed 4
+    python -m src.export game.mi6 frames/
+    ffmpeg -f concat -i frames/frames.txt -vf fps=30 -pix_fmt yuv420p game.mp4
+"""
+
+
+import argparse
+import os
+import struct
+import time
+import zlib
+
+import numpy as np
+
+from src.renderer import Renderer
+from src.replay import REDO, UNDO, GameLog
+
+
+# Where the replay's pointer rests: over nothing, so the hover line shows the
+# instruction a player had at each point
+POINTER = (-1, -1)
+
+
+class OffscreenRenderer(Renderer):
+    """A Renderer that only draws into its surface."""
+
+    def present(self, rects=None) -> None:
+        pass
+
+
+def frames(log: GameLog):
+    """
+    Replays a log offscreen, yielding the display surface and the changed
+    rect after every action that changes the picture, starting with the
+    first frame. The same surface is redrawn in place between yields.
+    """
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    from src.game import Game
+
+    game = Game(log.players, seed=log.seed)
+    game.renderer = OffscreenRenderer(game.display_surf, game.background_color)
+    try:
+        surface = game.display_surf
+        game._detect_hover(POINTER)
+        yield surface, game._draw()[0]
+        for action in log:
+            if action == UNDO:
+                game.undo()
+            elif action == REDO:
+                game.redo()
+            else:
+                game._apply(action)
+            game._detect_hover(POINTER)
+            dirty = game._draw()
+            if dirty:
+                yield surface, dirty[0].unionall(dirty[1:])
+            else:
+                yield surface, None
+    finally:
+        game._exit()
+
+
+class PNGWriter:
+    """
+    Saves every distinct frame as a numbered PNG in a directory.
+
+    Frames are written here rather than by `pygame.image.save`, with faster
+    zlib settings, which takes well under half the time for files about twice
+    the size.
+    """
+
+    def __init__(self, path: str, size: tuple[int, int]) -> None:
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.size = size
+        width, height = size
+        # One scanline per row, each after its filter byte (0: none)
+        self.rows = np.zeros((height, 1 + 3 * width), np.uint8)
+        self.durations = []  # Seconds shown, per saved frame
+
+    def add(self, surface, rect, duration: float) -> None:
+        if rect is None and self.durations:
+            self.durations[-1] += duration
+            return
+        import pygame
+
+        width, height = self.size
+        pixels = pygame.surfarray.pixels3d(surface)
+        self.rows[:, 1:].reshape(height, width, 3)[:] = pixels.transpose(1, 0, 2)
+        del pixels
+        name = os.path.join(self.path, f"frame_{len(self.durations):05}.png")
+        with open(name, "wb") as f:
+            f.write(
+                b"\x89PNG\r\n\x1a\n"
+                + _png_chunk(
+                    b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+                )
+                + _png_chunk(b"IDAT", zlib.compress(self.rows.tobytes(), 1))
+                + _png_chunk(b"IEND", b"")
+            )
+        self.durations.append(duration)
+
+    def close(self) -> None:
+        with open(os.path.join(self.path, "frames.txt"), "w") as f:
+            for i, duration in enumerate(self.durations):
+                f.write(f"file 'frame_{i:05}.png'\nduration {duration:.3f}\n")
+            if self.durations:
+                # ffmpeg ignores the last duration unless the file repeats
+                f.write(f"file 'frame_{len(self.durations) - 1:05}.png'\n")
+
+    @property
+    def frame_count(self) -> int:
+        return len(self.durations)
+
+
+def _png_chunk(kind: bytes, data: bytes) -> bytes:
+    return (
+        struct.pack(">I", len(data))
+        + kind
+        + data
+        + struct.pack(">I", zlib.crc32(kind + data))
+    )
+
+
+class GIFWriter:
+    """
+    Writes an animated GIF, one frame per distinct picture.
+
+    Each frame covers the box around the pixels that differ from the previous
+    frame, with unchanged pixels inside it transparent and a palette of its
+    own. The LZW encoder only looks for runs of one color, which is where
+    nearly all of this game's compression is (flat backgrounds and die
+    faces), and keeps the export to one Python step per run.
+    """
+
+    def __init__(self, path: str, size: tuple[int, int]) -> None:
+        self.file = open(path, "wb")
+        width, height = size
+        self.file.write(b"GIF89a" + struct.pack("<HHBBB", width, height, 0x70, 0, 0))
+        # Loop forever
+        self.file.write(b"!\xff\x0bNETSCAPE2.0\x03\x01\x00\x00\x00")
+        # What the viewer shows so far, as 0xRRGGBB; nothing matches at first
+        self.shown = np.full((height, width), 1 << 24, np.uint32)
+        self.pending = None  # The last frame, held until its duration is known
+        self.delay = 0.0
+        self.frame_count = 0
+
+    def add(self, surface, rect, duration: float) -> None:
+        if rect is None and self.pending is not None:
+            self.delay += duration
+            return
+        import pygame
+
+        if rect is None:
+            rect = surface.get_rect()
+        pixels = pygame.surfarray.pixels3d(surface)
+        region = pixels[rect.left : rect.right, rect.top : rect.bottom]
+        rgb = region.transpose(1, 0, 2).astype(np.uint32)
+        del pixels, region  # Unlocks the surface for the next frame's blits
+        colors = rgb[..., 0] << 16 | rgb[..., 1] << 8 | rgb[..., 2]
+        shown = self.shown[rect.top : rect.bottom, rect.left : rect.right]
+        changed = colors != shown
+        rows = np.flatnonzero(changed.any(1))
+        if not len(rows):
+            # Redrawn, but identical to what is already showing
+            if self.pending is not None:
+                self.delay += duration
+            return
+        shown[changed] = colors[changed]
+        columns = np.flatnonzero(changed.any(0))
+        box = (slice(rows[0], rows[-1] + 1), slice(columns[0], columns[-1] + 1))
+        self._write_pending()
+        self.pending = (
+            rect.left + columns[0],
+            rect.top + rows[0],
+            colors[box],
+            changed[box],
+        )
+        self.delay = duration
+        self.frame_count += 1
+
+    def _write_pending(self) -> None:
+        if self.pending is None:
+            return
+        x, y, colors, changed = self.pending
+        height, width = colors.shape
+        palette, indices = _palette(colors[changed])
+        pixels = np.zeros(colors.shape, np.uint8)  # 0 is transparent
+        pixels[changed] = indices + 1
+        size_bits = max(1, len(palette).bit_length())
+        table = np.zeros((1 << size_bits, 3), np.uint8)
+        table[1 : len(palette) + 1, 0] = palette >> 16
+        table[1 : len(palette) + 1, 1] = palette >> 8
+        table[1 : len(palette) + 1, 2] = palette
+        delay = max(1, round(self.delay * 100))  # Hundredths of a second
+        self.file.write(
+            # Graphic control: keep this frame under the next, index 0 clear
+            b"!\xf9\x04"
+            + struct.pack("<BHBB", 0x05, delay, 0, 0)
+            + b","
+            + struct.pack("<HHHHB", x, y, width, height, 0x80 | size_bits - 1)
+            + table.tobytes()
+            + b"\x08"
+            + _sub_blocks(_lzw(pixels.ravel()))
+        )
+        self.pending = None
+
+    def close(self) -> None:
+        self._write_pending()
+        self.file.write(b";")
+        self.file.close()
+
+
+def _palette(colors: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Returns at most 255 colors and each pixel's index into them.
+
+    Past 255, the most common colors are kept exactly and the rarest (text
+    antialiasing, mostly) take the nearest kept color.
+    """
+    palette, indices, counts = np.unique(
+        colors, return_inverse=True, return_counts=True
+    )
+    if len(palette) <= 255:
+        return palette, indices
+    order = np.argsort(-counts, kind="stable")
+    kept = palette[order[:255]]
+    rgb = np.stack([palette >> 16 & 255, palette >> 8 & 255, palette & 255], 1)
+    distance = ((rgb[:, None, :].astype(np.int32) - rgb[order[:255]]) ** 2).sum(2)
+    nearest = distance.argmin(1)
+    return kept, nearest[indices]
+
+
+def _lzw(indices: np.ndarray) -> bytes:
+    """
+    LZW-encodes 8-bit indices, matching only strings of one repeated index.
+
+    A decoder adds the previous string plus the next one's first index to its
+    table after every code. Sending a run of k as k, kk, kkk... therefore
+    teaches it ever longer runs of k, which `runs` tracks for the encoder;
+    every other string the decoder learns is never used, only counted.
+    """
+    clear, end = 256, 257
+    starts = np.flatnonzero(np.diff(indices)) + 1
+    lengths = np.diff(starts, prepend=0, append=len(indices))
+    colors = indices[np.concatenate(([0], starts))]
+
+    codes = [clear]
+    widths = [9]
+    width, next_code = 9, 258
+    runs = {}  # Index -> codes of its runs, by length - 1
+    previous = None  # (index, length) of the run just sent, None after a clear
+    for color, length in zip(colors.tolist(), lengths.tolist()):
+        while length:
+            known = runs.setdefault(color, [color])
+            if previous == (color, len(known)):
+                # The code this one adds is the next longer run of color
+                known.append(next_code)
+            taken = min(length, len(known))
+            codes.append(known[taken - 1])
+            widths.append(width)
+            if previous is not None:
+                next_code += 1
+                if next_code == 1 << width and width < 12:
+                    width += 1
+            previous = (color, taken)
+            length -= taken
+            if next_code >= 4093:
+                codes.append(clear)
+                widths.append(width)
+                width, next_code = 9, 258
+                runs = {}
+                previous = None
+    codes.append(end)
+    widths.append(width)
+
+    codes = np.array(codes, np.uint16)
+    bits = (codes[:, None] >> np.arange(12, dtype=np.uint16)) & 1
+    used = np.arange(12) < np.array(widths)[:, None]
+    return np.packbits(bits[used].astype(np.uint8), bitorder="little").tobytes()
+
+
+def _sub_blocks(data: bytes) -> bytes:
+    return (
+        b"".join(
+            bytes((len(data[i : i + 255]),)) + data[i : i + 255]
+            for i in range(0, len(data), 255)
+        )
+        + b"\0"
+    )
+
+
+def export(log: GameLog, path: str, actions_per_second: float = 4.0):
+    """Renders a log to `path`: a .gif file, or else a directory of PNGs."""
+    duration = 1 / actions_per_second
+    writer = None
+    for surface, rect in frames(log):
+        if writer is None:
+            if path.lower().endswith(".gif"):
+                writer = GIFWriter(path, surface.get_size())
+            else:
+                writer = PNGWriter(path, surface.get_size())
+        writer.add(surface, rect, duration)
+    writer.close()
+    return writer
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("log", help="game log written by main.py --record")
+    parser.add_argument("output", help="a .gif file, or a directory for PNG frames")
+    parser.add_argument("--speed", type=float, default=4, help="actions per second")
+    args = parser.parse_args()
+
+    log = GameLog.load(args.log)
+    start = time.perf_counter()
+    writer = export(log, args.output, args.speed)
+    elapsed = time.perf_counter() - start
+    print(
+        f"{len(log)} actions, {writer.frame_count} frames in {elapsed:.2f}s "
+        f"({len(log) / elapsed:,.0f} actions/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
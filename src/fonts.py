@@ -0,0 +1,55 @@
+"""
+Font lookup with an on-disk cache.
+
+`pygame.font.SysFont` scans every installed font (running `fc-list` on Linux)
+each time a game starts. `load_font` resolves a font name to a file once and
+remembers the path in FONT_CACHE_PATH, so later launches open the file
+directly. Names that don't resolve fall back to pygame's bundled font; delete
+the cache file to look them up again after installing a font.
+"""
+
+
+import json
+import os
+
+import pygame
+
+
+FONT_CACHE_PATH = os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")),
+    "mi6",
+    "fonts.json",
+)
+
+
+def _load_cache(path: str) -> dict:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache(path: str, paths: dict) -> None:
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + ".tmp", "w") as f:
+            json.dump(paths, f, indent=2)
+        os.replace(path + ".tmp", path)
+    except OSError:
+        pass  # Not being able to cache only costs the next launch a scan
+
+
+def find_font(name: str, cache_path: str = FONT_CACHE_PATH) -> str | None:
+    """Returns the file of a system font, or None for the bundled fallback."""
+    paths = _load_cache(cache_path)
+    key = name.lower()
+    if key in paths and (paths[key] is None or os.path.exists(paths[key])):
+        return paths[key]
+    paths[key] = pygame.font.match_font(name)
+    _save_cache(cache_path, paths)
+    return paths[key]
+
+
+def load_font(name: str, size: int) -> pygame.font.Font:
+    return pygame.font.Font(find_font(name), size)
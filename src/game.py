@@ -1,16 +1,35 @@
+import random
+import time
+
 import pygame
 import pygame.locals
 
+from src import engine, history, layout, packing
 from src.config import *
+from src.fonts import load_font
 from src.objects.die import Die
+from src.hover_index import HoverIndex
+from src.mcts import MCTSWorker
 from src.objects.button import Button
+from src.renderer import Renderer
+from src.replay import REDO, UNDO, GameLog, new_seed
+from src.text_cache import cache as text_cache
 
 
 class Game:
-    def __init__(self, players: int) -> None:
-        # Initialize pygame
-        pygame.init()
+    def __init__(
+        self,
+        players: int,
+        seed: int | None = None,
+        computer: tuple[int, ...] = (),
+        think_time: float = 1.0,
+    ) -> None:
+        # Initialize only the pygame modules the game uses
+        self.created = time.perf_counter()
+        self.startup = {}  # Stage -> seconds after construction began
+        pygame.display.init()
         pygame.font.init()
+        self._mark_startup("pygame")
 
         # Initialize window and clock
         self.window_size = (self.window_width, self.window_height) = WINDOW_SIZE
@@ -18,436 +37,377 @@ class Game:
         self.display_surf = pygame.display.set_mode(self.window_size, pygame.DOUBLEBUF)
         self.clock = pygame.time.Clock()
         pygame.display.set_caption("Make It Six")
+        self.renderer = Renderer(self.display_surf, self.background_color)
+        self.profiler = None  # See src.profiler
+        self._mark_startup("display")
+
+        # Initialize rule state (raises if the player count is unsupported)
+        self.state = engine.State(players)
 
-        # Ensure correct player count
-        if players not in range(2, 7):
-            raise NotImplementedError("Game must have 2-6 players.")
+        # Seeded RNG and action log, so every game can be replayed
+        self.seed = seed if seed is not None else new_seed()
+        self.rng = random.Random(self.seed)
+        self.log = GameLog(players, self.seed)
+        self.history = history.History()
 
-        # Initialize state variables
-        self.player_turn = 1
-        self.active_white = None
-        self.active_green = None
-        self.resolving_red_six = False
-        self.turn_pre_roll = True
-        self.turn_roll_count = 0
-        self.turn_mid_action = False
-        self.pre_tiebreak = False
+        # Computer players think in a background process (see src.mcts)
+        self.computer_players = set(computer)
+        self.bot_worker = MCTSWorker(think_time, self.seed) if computer else None
 
         # Initialize text objects
-        self.font = pygame.font.SysFont("Consolas", TEXT_SIZE)
+        self.font = load_font(FONT_NAME, TEXT_SIZE)
+        self._mark_startup("font")
         self.hover_text = ""
-        self.hover_text_surf = self.font.render(self.hover_text, True, TEXT_COLOR)
-        self.status_text = f"Player {self.player_turn}'s turn"
-        self.status_text_surf = self.font.render(self.status_text, True, TEXT_COLOR)
-        self.instruction_text = "Click Roll to begin turn"
+        self.hover_text_surf = self._render_text(self.hover_text)
+        self.status_text = f"Player {self.state.player_turn}'s turn"
+        self.status_text_surf = self._render_text(self.status_text)
+        self.instruction_text = engine.instruction(self.state)
 
         # Initialize buttons
         self.buttons = {
-            "pass": Button(
-                (
-                    WINDOW_WIDTH - BUTTON_WIDTH - BUTTON_MARGIN,
-                    BUTTON_MARGIN,
-                ),
-                "Pass",
-                self.font,
-            ),
-            "roll": Button(
-                (
-                    WINDOW_WIDTH - BUTTON_WIDTH - BUTTON_MARGIN,
-                    2 * BUTTON_MARGIN + BUTTON_HEIGHT,
-                ),
-                "Roll",
-                self.font,
-            ),
+            "pass": Button(layout.BUTTON_POSITIONS["pass"], "Pass", self.font),
+            "roll": Button(layout.BUTTON_POSITIONS["roll"], "Roll", self.font),
         }
 
-        # Initialize dice
+        # Initialize dice (only the first Red die starts in the game)
         self.dice = {
-            Die.RED: [
-                Die(
-                    Die.RED,
-                    (
-                        DIE_MARGIN,
-                        DIE_MARGIN + 2 * (DIE_SIZE + DIE_MARGIN),
-                    ),
-                ),
-                Die(
-                    Die.RED,
-                    (
-                        DIE_SIZE + 2 * DIE_MARGIN,
-                        DIE_MARGIN + 2 * (DIE_SIZE + DIE_MARGIN),
-                    ),
-                    in_game=False,
-                ),
-            ],
-            Die.GREEN: [
-                Die(
-                    Die.GREEN,
-                    (
-                        DIE_MARGIN + i * (DIE_SIZE + DIE_MARGIN),
-                        DIE_MARGIN,
-                    ),
-                )
-                for i in range(4)
-            ],
-            Die.WHITE: [
+            color: [
                 Die(
-                    Die.WHITE,
-                    (
-                        DIE_MARGIN + i * (DIE_SIZE + DIE_MARGIN),
-                        DIE_SIZE + 2 * DIE_MARGIN,
-                    ),
+                    color,
+                    layout.die_position(color, i),
+                    player=i + 1 if color == Die.BLUE else 0,
+                    in_game=color != Die.RED or i == 0,
+                    index=i,
                 )
-                for i in range(4)
-            ],
-            Die.BLUE: [
-                Die(
-                    Die.BLUE,
-                    (
-                        DIE_MARGIN + i * (DIE_SIZE + DIE_MARGIN),
-                        DIE_MARGIN + 3 * (DIE_SIZE + DIE_MARGIN),
-                    ),
-                    player=i + 1,
-                )
-                for i in range(players)
-            ],
+                for i in range(count)
+            ]
+            for color, count in (
+                (Die.RED, engine.NUM_RED),
+                (Die.GREEN, engine.NUM_GREEN),
+                (Die.WHITE, engine.NUM_WHITE),
+                (Die.BLUE, players),
+            )
         }
-        for die in self.dice[Die.BLUE]:
-            die.face(1)
+        self._sync()
+
+        # Index the fixed layout for hover hit-testing
+        self.hover_object = None
+        self.hover_index = HoverIndex(DIE_SIZE + DIE_MARGIN)
+        for dice in self.dice.values():
+            for die in dice:
+                self.hover_index.add(die)
+        for _, button in self.buttons.items():
+            self.hover_index.add(button)
+        self._mark_startup("objects")
+
+    def _mark_startup(self, stage: str) -> None:
+        self.startup[stage] = time.perf_counter() - self.created
+
+    def startup_report(self) -> str:
+        """Returns how long each startup stage took, up to the first frame."""
+        lines = []
+        previous = 0.0
+        for stage, elapsed in self.startup.items():
+            lines.append(
+                f"{stage:<12}{1000 * (elapsed - previous):>8.1f} ms"
+                f"{1000 * elapsed:>10.1f} ms"
+            )
+            previous = elapsed
+        return "\n".join(lines)
 
     def _exit(self) -> None:
+        if self.bot_worker is not None:
+            self.bot_worker.close()
         pygame.font.quit()
         pygame.quit()
 
     def _draw_interface(self) -> None:
         """Draws buttons and text."""
         for _, button in self.buttons.items():
-            button.blit_to_surf(self.display_surf)
-        self.display_surf.blit(
+            self.renderer.draw(
+                button, button.surf, button.pos, (button.text, button.hover)
+            )
+        self.renderer.draw(
+            "hover_text",
             self.hover_text_surf,
-            (
-                WINDOW_WIDTH / 48,
-                WINDOW_HEIGHT - 2 * TEXT_SIZE - 2 * WINDOW_HEIGHT / 48,
-            ),
+            layout.HOVER_TEXT_POSITION,
+            self.hover_text,
         )
-        self.display_surf.blit(
+        self.renderer.draw(
+            "status_text",
             self.status_text_surf,
-            (
-                WINDOW_WIDTH / 48,
-                WINDOW_HEIGHT - TEXT_SIZE - WINDOW_HEIGHT / 48,
-            ),
+            layout.STATUS_TEXT_POSITION,
+            self.status_text,
         )
+        if self.profiler is not None and self.profiler.overlay:
+            overlay_surf = self.profiler.overlay_surface(self.font)
+            self.renderer.draw(
+                "profiler",
+                overlay_surf,
+                (
+                    WINDOW_WIDTH - overlay_surf.get_width() - WINDOW_WIDTH / 48,
+                    WINDOW_HEIGHT - TEXT_SIZE - WINDOW_HEIGHT / 48,
+                ),
+            )
 
     def _draw_dice(self) -> None:
-        if not self.turn_pre_roll:
-            # Handle cases where white die is already activated
-            if self.active_white:
-                match self.active_white.value:
-                    case 1:
-                        for key in (Die.GREEN, Die.RED, Die.WHITE):
-                            for die in self.dice[key]:
-                                die.set_blocked(die.value == 6)
-                    case 2:
-                        pass
-                    case 3:
-                        pass
-                    case 4:
-                        pass
-                    case 5:
-                        for die in self.dice[Die.GREEN]:
-                            die.set_blocked(die.value >= 4)
-                    case 6:
-                        pass
+        if not self.state.turn_pre_roll:
             # Draw non-blue dice
             for key in (Die.RED, Die.GREEN, Die.WHITE):
                 for die in self.dice[key]:
                     if die.in_game:
-                        die.blit_to_surf(self.display_surf)
+                        self.renderer.draw(die, die.surf, die.pos)
 
         # Draw blue dice
         for die in self.dice[Die.BLUE]:
-            die.blit_to_surf(self.display_surf)
+            self.renderer.draw(die, die.surf, die.pos)
 
-    def _draw(self) -> None:
-        self.display_surf.fill(self.background_color)
+    def _draw(self) -> list[pygame.Rect]:
+        """Draws the frame, updating only the regions that changed."""
         self._draw_interface()
         self._draw_dice()
-
-    def _roll_all(self) -> None:
-        """Performs initial roll of all non-blue dice."""
-        for key in (Die.RED, Die.GREEN, Die.WHITE):
-            for die in self.dice[key]:
-                die.roll()
-        self.turn_pre_roll = False
-        self.turn_roll_count += 1
-        self.buttons["roll"].set_text("Reroll")
-        self.instruction_text = "Choose a White die to activate, or click Reroll"
-
-    def _reroll_white_and_red(self) -> None:
-        """Rerolls all White and Red Dice and adds the second Red Die to the game."""
-        self.dice[Die.RED][1].in_game = True
-        for key in (Die.RED, Die.WHITE):
-            for die in self.dice[key]:
-                die.roll()
-
-    def _detect_hover(self) -> Button | Die | None:
+        return self.renderer.flush()
+
+    def _sync(self) -> None:
+        """Mirrors the engine state onto the dice, buttons and status text."""
+        state = self.state
+        blocked_mask = engine.blocked_mask(state)
+        for key, dice in self.dice.items():
+            values = state.dice[key]
+            for die in dice:
+                i = die.index
+                die.in_game = engine.in_game(state, key, i)
+                if die.value != values[i]:
+                    die.face(values[i])
+                slot = engine.PICK_SLOTS.get((key, i))
+                blocked = slot is not None and bool(blocked_mask >> slot & 1)
+                if die.blocked != blocked:
+                    die.set_blocked(blocked)
+                activated = engine.is_activated(state, key, i)
+                if die.activated != activated:
+                    die.set_activated(activated)
+        roll_text = "Roll" if state.turn_pre_roll else "Reroll"
+        if self.buttons["roll"].text != roll_text:
+            self.buttons["roll"].set_text(roll_text)
+        if state.game_over:
+            status = f"Player {state.winner} wins!"
+        else:
+            status = f"Player {state.player_turn}'s turn"
+            if state.player_turn in self.computer_players:
+                status += " (computer)"
+        if self.status_text != status:
+            self._set_status(status)
+
+    def _hoverable(self, obj: Button | Die) -> bool:
+        if isinstance(obj, Die):
+            return obj.in_game and not self.state.turn_pre_roll
+        return True
+
+    def _detect_hover(self, pos: tuple[int, int] | None = None) -> Button | Die | None:
         """
         Sets and renders the hover text.
 
-        Returns the object the cursor is currently hovering over, if any.
+        Returns the object the cursor (or pos, if given) is hovering over, if any.
         """
-        hover_object = None
-        self.hover_text = self.instruction_text
-
-        # Check for hover over dice if they are on the board
-        if not self.turn_pre_roll:
-            for key in self.dice:
-                for die in self.dice[key]:
-                    if die.rect.collidepoint(*pygame.mouse.get_pos()) and die.in_game:
-                        hover_object = die
-                        die.set_hover(True)
-                        self.hover_text = str(die)
-                    else:
-                        die.set_hover(False)
-
-        # Check for hover over button if not hovering over dice
-        if not hover_object:
-            for _, button in self.buttons.items():
-                if button.rect.collidepoint(*pygame.mouse.get_pos()):
-                    hover_object = button
-                    button.set_hover(True)
-                    self.hover_text = str(button)
-                else:
-                    button.set_hover(False)
+        if pos is None:
+            pos = pygame.mouse.get_pos()
+        hover_object = self.hover_index.at(pos, self._hoverable)
+
+        # Only objects entering or leaving the hover state need redrawing
+        if hover_object is not self.hover_object:
+            if self.hover_object is not None:
+                self.hover_object.set_hover(False)
+            if hover_object is not None:
+                hover_object.set_hover(True)
+            self.hover_object = hover_object
 
         # Set hover text and return object under cursor
-        self.hover_text_surf = self.font.render(self.hover_text, True, TEXT_COLOR)
+        if hover_object is None:
+            hover_text = self.instruction_text
+        else:
+            hover_text = str(hover_object)
+        if hover_text != self.hover_text:
+            self.hover_text = hover_text
+            self.hover_text_surf = self._render_text(self.hover_text)
         return hover_object
 
+    def _render_text(self, text: str) -> pygame.Surface:
+        return text_cache.render(self.font, text, TEXT_COLOR)
+
     def _set_status(self, status: str) -> None:
         """Sets and re-render the status text."""
         self.status_text = status
-        self.status_text_surf = self.font.render(self.status_text, True, TEXT_COLOR)
+        self.status_text_surf = self._render_text(self.status_text)
 
-    def _next_player_turn(self) -> None:
-        """Passes the turn to the next player."""
-        if self.player_turn == NUM_PLAYERS:
-            self.player_turn = 1
-        else:
-            self.player_turn += 1
-        self._set_status(f"Player {self.player_turn}'s turn")
-        self.turn_pre_roll = True
-        self.buttons["roll"].set_text("Roll")
-        for _, dice in self.dice.items():
-            for die in dice:
-                die.set_blocked(False)
-                if die.color == die.WHITE:
-                    die.in_game = True
-                    die.set_activated(False)
-
-    def _resolve_green(self) -> None:
-        if len(list(filter(lambda x: x.value == 6, self.dice[Die.GREEN]))) >= 3:
-            player_die = self.dice[Die.BLUE][self.player_turn - 1]
-            player_die.face(player_die.value + 1)
-            self._next_player_turn()
-
-    def _resolve_blue(self) -> None:
-        """Detects win/tiebreak condition"""
-        pass
-
-    def _resolve_red(self) -> None:
-        # Handle red six
-        if self.dice[Die.RED][0].value == 6 or self.dice[Die.RED][1].value == 6:
-            player_die = self.dice[Die.BLUE][self.player_turn - 1]
-            match player_die.value:
-                case 1:
-                    for die in self.dice[Die.GREEN]:
-                        if die.value == 6:
-                            die.roll()
-                            break
-                case 2:
-                    self.resolving_red_six = True
-                case 3:
-                    self.resolving_red_six = True
-                case 4:
-                    player_die.face(3)
-                case 5:
-                    player_die.face(4)
-                    self.instruction_text = (
-                        f"Player {self.player_turn} rolled Red 6, turn passed"
-                    )
-                    self._next_player_turn()
-                case 6:
-                    pass  # TODO: implement tiebreaker stuff
-        # Block white dice with same value as red dice
-        for die in self.dice[Die.WHITE]:
-            if die.value in (d.value for d in self.dice[Die.RED] if d.in_game):
-                die.set_blocked(True)
-            else:
-                die.set_blocked(False)
-
-    def _on_left_click(self) -> None:
-        hover_object = self._detect_hover()
-
-        # Handle Button clicked
+    def snapshot(self) -> int:
+        """Returns the rule state packed into an int (see src.packing)."""
+        return packing.encode(self.state)
+
+    def restore(self, code: int) -> None:
+        """Replaces the rule state with a packed snapshot."""
+        self._set_state(packing.decode(code))
+
+    def _set_state(self, state: engine.State) -> None:
+        self.state = state
+        self._sync()
+        self.instruction_text = engine.instruction(self.state)
+
+    def _human_decision(self, state: engine.State) -> bool:
+        return state.game_over or state.player_turn not in self.computer_players
+
+    def undo(self) -> None:
+        """
+        Goes back to the state before the last action by a human player, if
+        any, also undoing the computer moves made since.
+
+        The RNG isn't rewound, so stopping on a computer's turn would only
+        have the computer play again with fresh dice.
+        """
+        if not self._computer_turn():
+            steps = self.history.undo_steps(self._human_decision)
+            state = self.state
+            for _ in range(steps):
+                self.log.record(UNDO)
+                state = self.history.undo(state)
+            if steps:
+                self._set_state(state)
+                self._detect_hover()
+
+    def redo(self) -> None:
+        """
+        Reapplies undone actions up to the next human decision, or all of them
+        if none is left.
+        """
+        if not self._computer_turn():
+            steps = self.history.redo_steps(self._human_decision)
+            state = self.state
+            for _ in range(steps):
+                self.log.record(REDO)
+                state = self.history.redo(state)
+            if steps:
+                self._set_state(state)
+                self._detect_hover()
+
+    def _action_for(self, hover_object: Button | Die | None) -> engine.Action | None:
+        """Returns the engine action for clicking on an object, if any."""
         if isinstance(hover_object, Button):
-            button = hover_object
-            if button.text == "Pass":
-                self._next_player_turn()
-            elif button.text == "Roll":
-                self._roll_all()
-            elif button.text == "Reroll":
-                self._reroll_white_and_red()
-
-        # Handle Die clicked
-        elif isinstance(hover_object, Die):
-            die = hover_object
-
-            # Handle cases where white die is already activated
-            if self.active_white:
-                match self.active_white.value:
-                    case 1:
-                        if (
-                            die.color != Die.BLUE
-                            and not die.blocked
-                            and not die.activated
-                        ):
-                            die.face(die.value + 1)
-                            self.instruction_text = ""
-                            for key in (Die.GREEN, Die.WHITE):
-                                for die in self.dice[key]:
-                                    die.set_blocked(False)
-                            self.active_white.in_game = False
-                            self.active_white = None
-                    case 2:
-                        if (
-                            die.color != Die.BLUE
-                            and not die.blocked
-                            and not die.activated
-                        ):
-                            # First non-blue Die has not yet been clicked
-                            if not self.turn_mid_action:
-                                die.set_activated(True)
-                                self.instruction_text = "Choose a White die to copy"
-                                self.active_green = die
-                                self.turn_mid_action = True
-                            else:
-                                if die.color == Die.WHITE:
-                                    self.active_green.face(die.value)
-                                self.instruction_text = ""
-                                for key in self.dice:
-                                    for die in self.dice[key]:
-                                        die.set_blocked(False)
-                                self.active_white.in_game = False
-                                self.active_white = None
-                                self.active_green.set_activated(False)
-                                self.active_green = None
-                                self.turn_mid_action = False
-                    case 3:
-                        if not self.turn_mid_action:
-                            if die.color == Die.GREEN:
-                                die.roll()
-                                die.set_blocked(True)
-                                self.instruction_text = (
-                                    "Choose second Green die to reroll"
-                                )
-                                self.turn_mid_action = True
-                        else:
-                            if die.color == Die.GREEN and not die.blocked:
-                                die.roll()
-                                for d in self.dice[Die.GREEN]:
-                                    d.set_blocked(False)
-                                self.active_white.in_game = False
-                                self.active_white = None
-                                self.turn_mid_action = False
-                                self.instruction_text = ""
-                    case 4:
-                        if die.color != Die.BLUE and not die.activated:
-                            die.face(7 - die.value)
-                            self.active_white.in_game = False
-                            self.active_white = None
-                            self.instruction_text = ""
-                    case 5:
-                        if (
-                            die.color != Die.BLUE
-                            and not die.blocked
-                            and not die.activated
-                            and not die == self.active_white
-                        ):
-                            # First non-blue Die has not yet been clicked
-                            if not self.turn_mid_action:
-                                die.face(die.value + 2)
-                                self.instruction_text = (
-                                    "Choose a non-blue die to decrement by 2"
-                                )
-                                for key in (Die.GREEN, Die.RED):
-                                    for die in self.dice[key]:
-                                        die.set_blocked(False)
-                                self.active_white = None
-                                self.turn_mid_action = True
-
-                            # First non-blue Die has already been clicked
-                            else:
-                                die.face(die.value - 2)
-                                self.turn_mid_action = False
-                                self.instruction_text = ""
-            else:  # White die not already activated
-                if die.color == Die.WHITE and not die.blocked:
-                    if die.value < 6:
-                        die.set_activated(True)
-                        self.active_white = die
-                    match die.value:
-                        case 1:
-                            self.instruction_text = (
-                                "Choose a non-Blue die to increment by 1"
-                            )
-                        case 2:
-                            self.instruction_text = "Choose a non-Blue die to reface"
-                        case 3:
-                            self.instruction_text = "Choose first Green die to reroll"
-                        case 4:
-                            self.instruction_text = "Choose a non-Blue die to flip"
-                        case 5:
-                            self.instruction_text = (
-                                "Choose a non-Blue die to increment by 2"
-                            )
-                        case 6:
-                            for die in self.dice[Die.WHITE]:
-                                die.roll()
-        self._resolve_green()
-        self._resolve_blue()
-        self._resolve_red()
-
-    def _on_right_click(self) -> None:
-        self._reset_action()
+            match hover_object.text:
+                case "Pass":
+                    return engine.PASS
+                case "Roll":
+                    return engine.ROLL
+                case "Reroll":
+                    return engine.REROLL
+        elif isinstance(hover_object, Die) and hover_object.color != Die.BLUE:
+            return engine.Action(
+                engine.Action.PICK, hover_object.color, hover_object.index
+            )
+        return None
+
+    def _apply(self, action: engine.Action) -> None:
+        """Applies an action to the rule state and refreshes the interface."""
+        self.history.record(self.state)
+        notice = engine.apply_action(self.state, action, self.rng)
+        self.log.record(action)
+        self._sync()
+        self.instruction_text = notice or engine.instruction(self.state)
+
+    def _computer_turn(self) -> bool:
+        state = self.state
+        return not state.game_over and state.player_turn in self.computer_players
+
+    def _play_computer_turn(self) -> bool:
+        """Asks the bot worker for a move, applying it once it's ready."""
+        code = self.snapshot()
+        action = self.bot_worker.result(code)
+        if action is None:
+            self.bot_worker.request(code)
+            return False
+        self._apply(action)
+        self._detect_hover()
+        return True
+
+    def _on_left_click(self, pos: tuple[int, int] | None = None) -> None:
+        action = self._action_for(self._detect_hover(pos))
+        if (
+            action is not None
+            and not self._computer_turn()
+            and action in engine.legal_actions(self.state)
+        ):
+            self._apply(action)
+            self._detect_hover(pos)
+
+    def _on_right_click(self, pos: tuple[int, int] | None = None) -> None:
+        if not self._computer_turn():
+            self._reset_action()
+        self._detect_hover(pos)
+
+    def _on_key(self, key: int, mod: int) -> None:
+        if key == pygame.K_F3 and self.profiler is not None:
+            self.profiler.overlay = not self.profiler.overlay
+        elif mod & pygame.KMOD_CTRL:
+            if key == pygame.K_y or key == pygame.K_z and mod & pygame.KMOD_SHIFT:
+                self.redo()
+            elif key == pygame.K_z:
+                self.undo()
 
     def _reset_action(self) -> None:
-        self.turn_mid_action = False
-        self.instruction_text = ""
-        if self.active_white is not None:
-            self.active_white.set_activated(False)
-        self.active_white = None
-        if self.active_green is not None:
-            self.active_green.set_activated(False)
-        # TODO: If one green rerolled by white 3 before reset, undo roll
-        self.active_green = None
-
-    def run(self) -> None:
-        """Runs main Game loop."""
+        if self.state.active_white is not None:
+            self._apply(engine.CANCEL)
+
+    def _poll_events(self) -> list[pygame.event.Event]:
+        events = pygame.event.get()
+        if self._computer_turn() and self._play_computer_turn():
+            # Wakes an idle loop so the computer's move gets drawn
+            events.append(pygame.event.Event(pygame.USEREVENT))
+        return events
+
+    def run(self, idle_wait: bool = True) -> None:
+        """
+        Runs main Game loop.
+
+        With idle_wait, once a frame neither handles events nor redraws
+        anything the loop stops drawing and polls at IDLE_FRAME_RATE until the
+        next event arrives. Nothing on screen changes without input, so idle
+        frames have no work to do. (pygame.event.wait can't replace the
+        polling: it is itself implemented as a 1 ms poll.)
+        """
         self.running = True
+        profiler = self.profiler
+        if "first_frame" not in self.startup:
+            self._draw()
+            self._mark_startup("first_frame")
+        idle = False
         while self.running:
-            self.clock.tick(60)
-            for event in pygame.event.get():
+            self.clock.tick(IDLE_FRAME_RATE if idle else FRAME_RATE)
+            events = self._poll_events()
+            if idle and not events:
+                if profiler is not None:
+                    profiler.skip_frame()
+                continue
+
+            # Motion events queued this frame collapse into one hover update
+            motion_pos = None
+            for event in events:
                 if event.type == pygame.QUIT:
                     self.running = False
+                elif event.type == pygame.KEYDOWN:
+                    self._on_key(event.key, event.mod)
+                elif event.type == pygame.WINDOWEXPOSED:
+                    self.renderer.invalidate()
                 elif event.type == pygame.MOUSEMOTION:
-                    self._detect_hover()
+                    motion_pos = event.pos
                 elif event.type == pygame.MOUSEBUTTONDOWN:
-                    pressed = pygame.mouse.get_pressed()
-                    if pressed[0]:
-                        self._on_left_click()
-                    elif pressed[2]:
-                        self._on_right_click()
-            self._draw()
-            pygame.display.flip()
+                    motion_pos = None
+                    if event.button == pygame.BUTTON_LEFT:
+                        self._on_left_click(event.pos)
+                    elif event.button == pygame.BUTTON_RIGHT:
+                        self._on_right_click(event.pos)
+            if motion_pos is not None:
+                self._detect_hover(motion_pos)
+            dirty = self._draw()
+            # A computer player thinking keeps the loop at the frame cap
+            idle = idle_wait and not events and not dirty and not self._computer_turn()
+            if profiler is not None:
+                profiler.end_frame()
         self._exit()
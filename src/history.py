@@ -0,0 +1,75 @@
+"""
+Bounded undo and redo of the rule state.
+
+Snapshots are packed ints (see `src.packing`), so taking one on every click
+costs a few microseconds and a few dozen bytes. A White action in progress
+also has the state from before it began (`engine.State.action_start`), which
+is packed alongside so that cancelling still restores it after an undo.
+"""
+
+
+from collections import deque
+
+from src import engine, packing
+from src.config import UNDO_LIMIT
+
+
+Snapshot = tuple[int, int | None]
+
+
+def take(state: engine.State) -> Snapshot:
+    start = state.action_start
+    return packing.encode(state), None if start is None else packing.encode(start)
+
+
+def restore(snapshot: Snapshot) -> engine.State:
+    code, start = snapshot
+    state = packing.decode(code)
+    if start is not None:
+        state.action_start = packing.decode(start)
+    return state
+
+
+class History:
+    def __init__(self, limit: int = UNDO_LIMIT) -> None:
+        self.undo_stack = deque(maxlen=limit)
+        self.redo_stack = deque(maxlen=limit)
+
+    def record(self, state: engine.State) -> None:
+        """Saves the state before an action, which makes anything undone final."""
+        self.undo_stack.append(take(state))
+        self.redo_stack.clear()
+
+    def undo(self, state: engine.State) -> engine.State | None:
+        """Returns the state before the last action, or None if there is none."""
+        if not self.undo_stack:
+            return None
+        self.redo_stack.append(take(state))
+        return restore(self.undo_stack.pop())
+
+    def redo(self, state: engine.State) -> engine.State | None:
+        """Returns the state the last undo left, or None if there is none."""
+        if not self.redo_stack:
+            return None
+        self.undo_stack.append(take(state))
+        return restore(self.redo_stack.pop())
+
+    def undo_steps(self, stop) -> int:
+        """
+        Returns how many undos reach the latest earlier state for which `stop`
+        is true, or 0 if there is none.
+        """
+        for steps, snapshot in enumerate(reversed(self.undo_stack), 1):
+            if stop(restore(snapshot)):
+                return steps
+        return 0
+
+    def redo_steps(self, stop) -> int:
+        """
+        Returns how many redos reach the next state for which `stop` is true,
+        or all of them if there is none.
+        """
+        for steps, snapshot in enumerate(reversed(self.redo_stack), 1):
+            if stop(restore(snapshot)):
+                return steps
+        return len(self.redo_stack)
@@ -0,0 +1,30 @@
+class HoverIndex:
+    """
+    Uniform grid over the fixed layout for finding the object under a point.
+
+    Every object is registered in each grid cell its rect overlaps, so a lookup
+    only tests the one or two objects sharing the point's cell.
+    """
+
+    def __init__(self, cell_size: int) -> None:
+        self.cell_size = cell_size
+        self.cells = {}
+
+    def add(self, obj) -> None:
+        """Registers an object with a `rect` attribute."""
+        rect, size = obj.rect, self.cell_size
+        for cx in range(rect.left // size, (rect.right - 1) // size + 1):
+            for cy in range(rect.top // size, (rect.bottom - 1) // size + 1):
+                self.cells.setdefault((cx, cy), []).append(obj)
+
+    def at(self, pos: tuple[int, int], accept=None):
+        """
+        Returns the first registered object containing pos, if any.
+
+        `accept` optionally filters out objects that are currently hidden.
+        """
+        x, y = pos
+        for obj in self.cells.get((x // self.cell_size, y // self.cell_size), ()):
+            if obj.rect.collidepoint(x, y) and (accept is None or accept(obj)):
+                return obj
+        return None
@@ -0,0 +1,37 @@
+"""
+Where the game window places its dice, buttons and text, from the sizes in
+config.py. Positions are in window pixels at the configured window size.
+"""
+
+
+from src import engine
+from src.config import *
+
+
+# Row of each die colour, top to bottom
+DIE_ROWS = {engine.GREEN: 0, engine.WHITE: 1, engine.RED: 2, engine.BLUE: 3}
+
+BUTTON_POSITIONS = {
+    "pass": (WINDOW_WIDTH - BUTTON_WIDTH - BUTTON_MARGIN, BUTTON_MARGIN),
+    "roll": (
+        WINDOW_WIDTH - BUTTON_WIDTH - BUTTON_MARGIN,
+        2 * BUTTON_MARGIN + BUTTON_HEIGHT,
+    ),
+}
+
+HOVER_TEXT_POSITION = (
+    WINDOW_WIDTH / 48,
+    WINDOW_HEIGHT - 2 * TEXT_SIZE - 2 * WINDOW_HEIGHT / 48,
+)
+STATUS_TEXT_POSITION = (
+    WINDOW_WIDTH / 48,
+    WINDOW_HEIGHT - TEXT_SIZE - WINDOW_HEIGHT / 48,
+)
+
+
+def die_position(color: str, index: int) -> tuple[int, int]:
+    """Returns the top left corner of a die."""
+    return (
+        DIE_MARGIN + index * (DIE_SIZE + DIE_MARGIN),
+        DIE_MARGIN + DIE_ROWS[color] * (DIE_SIZE + DIE_MARGIN),
+    )
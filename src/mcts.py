@@ -0,0 +1,206 @@
+"""
+Monte Carlo tree search bot.
+
+`MCTSBot` searches for as long as its time budget allows. Nodes are keyed by
+packed state (`src.packing`), so dice outcomes lead to whichever node matches
+the rolled state, and the tree found while choosing one move is still there
+for the next: after the bot's action and the dice, the new position usually
+has statistics already. Each node picks actions by UCB1 for the player whose
+turn it is. Playouts continue with greedy bots for every seat for a few
+rounds; a game still running then counts as won by whoever has the highest
+Blue die, shared on a tie.
+
+`MCTSWorker` runs a bot in its own process, so a game window keeps drawing
+while the bot thinks.
+
+Run `python -m src.mcts --budget 1` to time a few searches.
+"""
+
+
+import argparse
+import math
+import multiprocessing
+import random
+import time
+
+from src import bots, engine, packing
+
+
+class Node:
+    __slots__ = ("actions", "visits", "wins", "total")
+
+    def __init__(self, actions: list[engine.Action]) -> None:
+        self.actions = actions
+        self.visits = [0] * len(actions)
+        self.wins = [0.0] * len(actions)
+        self.total = 0
+
+    def select(self, exploration: float) -> int:
+        """Returns the index of the action to try next, by UCB1."""
+        visits, wins = self.visits, self.wins
+        if 0 in visits:
+            return visits.index(0)
+        log_total = math.log(self.total)
+        best, best_score = 0, -1.0
+        for i, n in enumerate(visits):
+            score = wins[i] / n + exploration * math.sqrt(log_total / n)
+            if score > best_score:
+                best, best_score = i, score
+        return best
+
+
+class MCTSBot(bots.Bot):
+    name = "mcts"
+
+    def __init__(
+        self,
+        budget: float = 0.5,
+        exploration: float = 0.7,
+        max_nodes: int = 500_000,
+        rollout_rounds: int = 3,
+    ) -> None:
+        self.budget = budget
+        self.exploration = exploration
+        self.max_nodes = max_nodes
+        self.rollout_rounds = rollout_rounds
+        self.rollout_bot = bots.GreedyBot()
+        self.nodes = {}  # Packed state -> Node
+        self.playouts = 0
+        self.elapsed = 0.0
+
+    @property
+    def playouts_per_second(self) -> float:
+        return self.playouts / self.elapsed if self.elapsed else 0.0
+
+    def choose(self, state: engine.State, rng) -> engine.Action:
+        if state.game_over:
+            raise ValueError("Game is over.")
+        if len(self.nodes) > self.max_nodes:
+            self.nodes.clear()  # Keeping the tree bounded beats reusing it
+        start = time.perf_counter()
+        deadline = start + self.budget
+        playouts = 0
+        while True:
+            self._playout(state, rng)
+            playouts += 1
+            if time.perf_counter() >= deadline:
+                break
+        self.playouts += playouts
+        self.elapsed += time.perf_counter() - start
+
+        node = self.nodes[packing.encode(state)]
+        return node.actions[node.visits.index(max(node.visits))]
+
+    def _playout(self, root: engine.State, rng) -> None:
+        state = root.copy()
+        nodes = self.nodes
+        path = []
+        seen = set()
+        while not state.game_over:
+            key = packing.encode(state)
+            if key in seen:
+                break  # Everyone passed back to a position already on the path
+            seen.add(key)
+            node = nodes.get(key)
+            expanding = node is None
+            if expanding:
+                node = nodes[key] = Node(engine.legal_actions(state))
+            i = node.select(self.exploration)
+            path.append((node, i, state.player_turn))
+            engine.apply_action(state, node.actions[i], rng)
+            if expanding:
+                break
+        rewards = self._rollout(state, rng)
+        for node, i, player in path:
+            node.total += 1
+            node.visits[i] += 1
+            node.wins[i] += rewards[player - 1]
+
+    def _rollout(self, state: engine.State, rng) -> list[float]:
+        """Plays on greedily and returns each player's share of the win."""
+        choose = self.rollout_bot.choose
+        turns = 0
+        max_turns = self.rollout_rounds * state.players
+        while not state.game_over and turns < max_turns:
+            player = state.player_turn
+            engine.apply_action(state, choose(state, rng), rng)
+            if state.player_turn != player:
+                turns += 1
+        blue = state.dice[engine.BLUE][: state.players]
+        if state.game_over:
+            leaders = [state.winner]
+        else:
+            best = max(blue)
+            leaders = [p + 1 for p, value in enumerate(blue) if value == best]
+        rewards = [0.0] * state.players
+        for player in leaders:
+            rewards[player - 1] = 1 / len(leaders)
+        return rewards
+
+
+def _serve(connection, budget: float, seed: int | None) -> None:
+    bot = MCTSBot(budget)
+    rng = random.Random(seed)
+    while True:
+        code = connection.recv()
+        if code is None:
+            return
+        action = bot.choose(packing.decode(code), rng)
+        connection.send((code, action, bot.playouts_per_second))
+
+
+class MCTSWorker:
+    """An MCTSBot in a background process, asked for one move at a time."""
+
+    def __init__(self, budget: float = 0.5, seed: int | None = None) -> None:
+        self.connection, child = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(
+            target=_serve, args=(child, budget, seed), daemon=True
+        )
+        self.process.start()
+        self.pending = None
+        self.playouts_per_second = 0.0
+
+    def request(self, code: int) -> None:
+        """Starts a search from a packed state, unless one is running for it."""
+        if self.pending != code:
+            self.connection.send(code)
+            self.pending = code
+
+    def result(self, code: int) -> engine.Action | None:
+        """Returns the move for a packed state once the search has finished."""
+        while self.pending is not None and self.connection.poll():
+            searched, action, self.playouts_per_second = self.connection.recv()
+            if searched == self.pending:
+                self.pending = None
+                if searched == code:
+                    return action
+        return None
+
+    def close(self) -> None:
+        self.connection.send(None)
+        self.process.join(timeout=1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--players", type=int, default=4)
+    parser.add_argument("--budget", type=float, default=1.0, help="seconds per move")
+    parser.add_argument("--moves", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    bot = MCTSBot(args.budget)
+    state = engine.State(args.players)
+    for _ in range(args.moves):
+        if state.game_over:
+            break
+        action = bot.choose(state, rng)
+        print(f"Player {state.player_turn}: {action}  ({len(bot.nodes)} nodes)")
+        engine.apply_action(state, action, rng)
+    print(f"{bot.playouts:,} playouts, {bot.playouts_per_second:,.0f} playouts/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Thin pygame client for the table server.
+
+`RemoteGame` is the usual game window, except that clicks are sent to the
+server as actions instead of being applied locally, and the window shows
+whatever state the server pushes back.
+"""
+
+
+import select
+import socket
+
+import pygame
+
+from src import packing, replay
+from src.game import Game
+from src.net import protocol
+
+
+def connect(address: str) -> socket.socket:
+    where = protocol.parse_address(address)
+    if isinstance(where, str):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    else:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.connect(where)
+    return sock
+
+
+class RemoteGame(Game):
+    def __init__(self, address: str, table: int = 0, players: int = 4) -> None:
+        self.sock = connect(address)
+        self.frames = protocol.FrameBuffer()
+        self.sock.sendall(protocol.frame(protocol.JOIN, table, players, 0))
+        message = self._receive(block=True)[0]
+        if message[0] != protocol.STATE:
+            raise ConnectionError(f"Server refused to join table {table}.")
+        _, self.table, _, code, _ = message
+        self.seq = 0
+        super().__init__(packing.decode(code).players)
+        self.restore(code)
+        pygame.display.set_caption(f"Make It Six - table {self.table}")
+
+    def _receive(self, block: bool = False) -> list[tuple]:
+        """Returns the messages that have arrived, waiting for one if block."""
+        messages = []
+        while not messages:
+            if not block and not select.select([self.sock], [], [], 0)[0]:
+                break
+            data = self.sock.recv(1 << 16)
+            if not data:
+                raise ConnectionError("Server closed the connection.")
+            messages = [protocol.parse(body) for body in self.frames.feed(data)]
+        return messages
+
+    def _apply(self, action) -> None:
+        self.seq += 1
+        self.sock.sendall(
+            protocol.frame(
+                protocol.ACTION, self.table, self.seq, replay.encode_action(action)
+            )
+        )
+
+    def _poll_events(self) -> list[pygame.event.Event]:
+        try:
+            messages = self._receive()
+        except ConnectionError:
+            return [pygame.event.Event(pygame.QUIT)]
+        changed = False
+        for message in messages:
+            if message[0] == protocol.STATE and message[1] == self.table:
+                _, _, _, code, notice = message
+                self.restore(code)
+                if notice:
+                    self.instruction_text = notice
+                changed = True
+        events = pygame.event.get()
+        if changed:
+            self._detect_hover()
+            # Wakes an idle loop so the new state gets drawn
+            events.append(pygame.event.Event(pygame.USEREVENT))
+        return events
+
+    def _exit(self) -> None:
+        self.sock.close()
+        super()._exit()
@@ -0,0 +1,157 @@
+"""
+Load generator for the table server.
+
+Opens a number of connections, each playing a number of tables with greedy
+bots as fast as the server answers: every table has one action in flight at
+a time, and a finished game is left for a fresh one. Reports actions per
+second and the latency from sending an action to receiving the state that
+acknowledges it. Run the server with `--stats` alongside to see how much of a
+core it needs for that many tables.
+
+    python -m src.net.loadgen --connect 127.0.0.1:7766 --clients 8 --tables 500
+"""
+
+
+import argparse
+import asyncio
+import random
+import time
+
+import numpy as np
+
+from src import bots, packing, replay
+from src.net import protocol
+
+
+class LoadClient(asyncio.Protocol):
+    def __init__(self, tables: int, players: int, seed: int, stats: dict) -> None:
+        self.tables = tables
+        self.players = players
+        self.rng = random.Random(seed)
+        self.bot = bots.GreedyBot()
+        self.stats = stats
+        self.frames = protocol.FrameBuffer()
+        self.transport = None
+        self.seq = 0
+        self.in_flight = {}  # Table id -> (sequence number, send time)
+
+    def connection_made(self, transport) -> None:
+        self.transport = transport
+        transport.write(
+            b"".join(
+                protocol.frame(protocol.JOIN, 0, self.players, self.rng.getrandbits(63))
+                for _ in range(self.tables)
+            )
+        )
+
+    def data_received(self, data: bytes) -> None:
+        out = []
+        now = time.perf_counter()
+        for body in self.frames.feed(data):
+            message = protocol.parse(body)
+            if message[0] == protocol.REJECT:
+                # Bots only pick legal actions, so this is a server bug
+                self.stats["rejects"] += 1
+                continue
+            table_id, seq = message[1], message[2]
+            pending = self.in_flight.get(table_id)
+            if pending is not None:
+                if seq != pending[0]:
+                    continue  # Pushed before our action was handled
+                self.stats["latencies"].append(now - pending[1])
+                self.stats["actions"] += 1
+            state = packing.decode(message[3])
+            if state.game_over:
+                self.stats["games"] += 1
+                self.in_flight.pop(table_id, None)
+                out.append(protocol.frame(protocol.LEAVE, table_id))
+                out.append(
+                    protocol.frame(
+                        protocol.JOIN, 0, self.players, self.rng.getrandbits(63)
+                    )
+                )
+                continue
+            action = self.bot.choose(state, self.rng)
+            self.seq += 1
+            self.in_flight[table_id] = (self.seq, now)
+            out.append(
+                protocol.frame(
+                    protocol.ACTION, table_id, self.seq, replay.encode_action(action)
+                )
+            )
+        if out:
+            self.transport.write(b"".join(out))
+
+
+async def run_load(
+    address: str, clients: int, tables: int, players: int, duration: float, seed: int
+) -> dict:
+    loop = asyncio.get_running_loop()
+    where = protocol.parse_address(address)
+    stats = {"actions": 0, "games": 0, "rejects": 0, "latencies": []}
+    rng = random.Random(seed)
+    connections = []
+    for _ in range(clients):
+        client_seed = rng.getrandbits(63)
+
+        def factory():
+            return LoadClient(tables, players, client_seed, stats)
+
+        if isinstance(where, str):
+            _, client = await loop.create_unix_connection(factory, where)
+        else:
+            _, client = await loop.create_connection(factory, *where)
+        connections.append(client)
+
+    # Discard the ramp-up while tables are being created
+    await asyncio.sleep(min(1.0, duration / 4))
+    stats.update(actions=0, games=0, latencies=[])
+    start = time.perf_counter()
+    await asyncio.sleep(duration)
+    elapsed = time.perf_counter() - start
+    result = {
+        "tables": clients * tables,
+        "actions": stats["actions"],
+        "games": stats["games"],
+        "actions_per_second": stats["actions"] / elapsed,
+        "rejects": stats["rejects"],
+    }
+    latencies = np.array(stats["latencies"]) * 1000
+    for q in (50, 95, 99):
+        result[f"latency_p{q}_ms"] = (
+            float(np.percentile(latencies, q)) if len(latencies) else 0.0
+        )
+    for client in connections:
+        client.transport.close()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--connect", default="127.0.0.1:7766")
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--tables", type=int, default=250, help="per client")
+    parser.add_argument("--players", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    result = asyncio.run(
+        run_load(
+            args.connect,
+            args.clients,
+            args.tables,
+            args.players,
+            args.duration,
+            args.seed,
+        )
+    )
+    print(f"{result['tables']} tables, {result['games']} games finished")
+    print(f"{result['actions_per_second']:,.0f} actions/s")
+    print(
+        "latency "
+        + "  ".join(f"p{q} {result[f'latency_p{q}_ms']:.2f} ms" for q in (50, 95, 99))
+    )
+
+
+if __name__ == "__main__":
+    main()
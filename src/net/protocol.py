@@ -0,0 +1,114 @@
+"""
+Wire format shared by the table server and its clients.
+
+Every message is a frame: a 4-byte little-endian length, then a one-byte
+message type and a fixed layout per type. States travel as the 12-byte codes
+of `src.packing` and actions as the one-byte codes of `src.replay`.
+
+    client -> server
+        JOIN    table (0 for a new table), players, seed (0 for a random one)
+        ACTION  table, sequence number, action code
+        LEAVE   table
+
+    server -> client
+        STATE   table, last sequence number handled, state code, notice
+        REJECT  table, sequence number of an illegal action
+
+STATE messages are snapshots, so the server may skip any that a slow client
+hasn't been sent yet and only send the newest.
+"""
+
+
+import struct
+
+from src import packing
+
+
+LENGTH = struct.Struct("<I")
+MAX_FRAME = 1 << 16
+
+JOIN = 1
+ACTION = 2
+LEAVE = 3
+STATE = 4
+REJECT = 5
+
+JOIN_BODY = struct.Struct("<IBQ")
+ACTION_BODY = struct.Struct("<IIB")
+LEAVE_BODY = struct.Struct("<I")
+STATE_BODY = struct.Struct(f"<II{packing.CODE_BYTES}s")
+REJECT_BODY = struct.Struct("<II")
+
+BODIES = {
+    JOIN: JOIN_BODY,
+    ACTION: ACTION_BODY,
+    LEAVE: LEAVE_BODY,
+    STATE: STATE_BODY,
+    REJECT: REJECT_BODY,
+}
+
+
+def frame(kind: int, *fields, tail: bytes = b"") -> bytes:
+    """Returns a complete frame: length, type, packed fields and any tail."""
+    body = bytes((kind,)) + BODIES[kind].pack(*fields) + tail
+    return LENGTH.pack(len(body)) + body
+
+
+def state_frame(table: int, seq: int, code: int, notice: str | None) -> bytes:
+    return frame(
+        STATE,
+        table,
+        seq,
+        packing.to_bytes(code),
+        tail=notice.encode() if notice else b"",
+    )
+
+
+def parse(body: bytes) -> tuple:
+    """Returns (type, *fields) for a frame body; STATE gets its notice last."""
+    if not body:
+        raise ValueError("Empty message.")
+    kind = body[0]
+    layout = BODIES.get(kind)
+    if layout is None:
+        raise ValueError(f"Unknown message type {kind}.")
+    try:
+        fields = layout.unpack_from(body, 1)
+    except struct.error as e:
+        raise ValueError(f"Truncated message of type {kind}.") from e
+    if kind == STATE:
+        table, seq, code = fields
+        notice = body[1 + layout.size :].decode() or None
+        return kind, table, seq, packing.from_bytes(code), notice
+    return (kind, *fields)
+
+
+class FrameBuffer:
+    """Splits a byte stream into frame bodies."""
+
+    def __init__(self) -> None:
+        self.data = bytearray()
+
+    def feed(self, data: bytes) -> list[bytes]:
+        self.data += data
+        bodies = []
+        start = 0
+        while len(self.data) - start >= LENGTH.size:
+            (length,) = LENGTH.unpack_from(self.data, start)
+            if length > MAX_FRAME:
+                raise ValueError("Frame too large.")
+            end = start + LENGTH.size + length
+            if end > len(self.data):
+                break
+            bodies.append(bytes(self.data[start + LENGTH.size : end]))
+            start = end
+        del self.data[:start]
+        return bodies
+
+
+def parse_address(address: str) -> tuple[str, int] | str:
+    """Returns (host, port) for "host:port", or the socket path for "unix:path"."""
+    if address.startswith("unix:"):
+        return address[len("unix:") :]
+    host, _, port = address.rpartition(":")
+    return host or "127.0.0.1", int(port)
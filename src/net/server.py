@@ -0,0 +1,235 @@
+"""
+Asyncio server hosting many Make It Six tables in one process.
+
+Tables run on the headless engine; clients join them, send actions and get
+the new state pushed back (see `src.net.protocol`). Every client on a table
+may act for the player whose turn it is, as around a real table.
+
+Pushes are batched: updates for a connection are collected while the event
+loop works through incoming data, then sent with one write per loop pass,
+keeping only the newest state of each table. When a client reads too slowly
+for its socket buffer to drain, the server stops reading its actions until it
+catches up, so a slow client can't make the server queue unbounded output.
+
+    python -m src.net.server --listen 127.0.0.1:7766
+    python -m src.net.server --listen unix:/tmp/mi6.sock
+"""
+
+
+import argparse
+import asyncio
+import random
+import time
+
+from src import engine, packing, replay
+from src.net import protocol
+
+
+class Table:
+    __slots__ = ("id", "state", "rng", "log", "clients")
+
+    def __init__(self, table_id: int, players: int, seed: int) -> None:
+        self.id = table_id
+        self.state = engine.State(players)
+        self.rng = random.Random(seed)
+        self.log = replay.GameLog(players, seed)
+        self.clients = set()
+
+
+class Connection(asyncio.Protocol):
+    """One client socket, possibly joined to many tables."""
+
+    def __init__(self, server: "TableServer") -> None:
+        self.server = server
+        self.frames = protocol.FrameBuffer()
+        self.transport = None
+        self.tables = {}  # Table id -> Table
+        self.seqs = {}  # Table id -> last action sequence number handled
+        self.pending = {}  # Table id -> (Table, notice), newest only
+        self.rejects = []
+        self.flush_scheduled = False
+        self.writing_paused = False
+
+    def connection_made(self, transport) -> None:
+        self.transport = transport
+        self.server.connections.add(self)
+
+    def connection_lost(self, exc) -> None:
+        self.server.connections.discard(self)
+        for table in list(self.tables.values()):
+            self.server.leave(self, table)
+
+    def data_received(self, data: bytes) -> None:
+        try:
+            for body in self.frames.feed(data):
+                self.server.handle(self, protocol.parse(body))
+        except ValueError:
+            self.transport.close()
+
+    def pause_writing(self) -> None:
+        # The client isn't keeping up: stop taking its actions
+        self.writing_paused = True
+        self.transport.pause_reading()
+
+    def resume_writing(self) -> None:
+        self.writing_paused = False
+        self.transport.resume_reading()
+        self._schedule_flush()
+
+    def push(self, table: Table, notice: str | None = None) -> None:
+        self.pending[table.id] = (table, notice)
+        self._schedule_flush()
+
+    def reject(self, table_id: int, seq: int) -> None:
+        self.rejects.append(protocol.frame(protocol.REJECT, table_id, seq))
+        self._schedule_flush()
+
+    def _schedule_flush(self) -> None:
+        if not self.flush_scheduled and not self.writing_paused:
+            self.flush_scheduled = True
+            asyncio.get_running_loop().call_soon(self.flush)
+
+    def flush(self) -> None:
+        self.flush_scheduled = False
+        if self.transport.is_closing() or self.writing_paused:
+            return
+        frames, pending = self.rejects, self.pending
+        self.rejects = []
+        self.pending = {}
+        for table_id, (table, notice) in pending.items():
+            frames.append(
+                protocol.state_frame(
+                    table_id,
+                    self.seqs.get(table_id, 0),
+                    packing.encode(table.state),
+                    notice,
+                )
+            )
+        if frames:
+            self.server.pushes += len(frames)
+            self.transport.write(b"".join(frames))
+
+
+class TableServer:
+    def __init__(self, max_tables: int = 100_000) -> None:
+        self.max_tables = max_tables
+        self.tables = {}
+        self.connections = set()
+        self.next_id = 1
+        self.actions = 0
+        self.pushes = 0
+
+    def handle(self, conn: Connection, message: tuple) -> None:
+        match message:
+            case (protocol.JOIN, table_id, players, seed):
+                self.join(conn, table_id, players, seed)
+            case (protocol.ACTION, table_id, seq, code):
+                self.act(conn, table_id, seq, code)
+            case (protocol.LEAVE, table_id):
+                table = conn.tables.get(table_id)
+                if table is not None:
+                    self.leave(conn, table)
+            case _:
+                raise ValueError("Unexpected message from a client.")
+
+    def join(self, conn: Connection, table_id: int, players: int, seed: int) -> None:
+        table = self.tables.get(table_id)
+        if table is None:
+            if (
+                table_id
+                or len(self.tables) >= self.max_tables
+                or not 2 <= players <= packing.MAX_PLAYERS
+            ):
+                conn.reject(table_id, 0)
+                return
+            table = Table(self.next_id, players, seed or replay.new_seed())
+            self.tables[table.id] = table
+            self.next_id += 1
+        table.clients.add(conn)
+        conn.tables[table.id] = table
+        conn.seqs[table.id] = 0
+        conn.push(table)
+
+    def act(self, conn: Connection, table_id: int, seq: int, code: int) -> None:
+        table = conn.tables.get(table_id)
+        if table is None:
+            conn.reject(table_id, seq)
+            return
+        try:
+            action = replay.decode_action(code)
+        except (KeyError, IndexError):
+            action = None
+        state = table.state
+        if action == engine.CANCEL:
+            legal = state.active_white is not None
+        else:
+            legal = action in engine.legal_actions(state)
+        if not legal:
+            conn.reject(table_id, seq)
+            return
+        if action == engine.REROLL and state.turn_roll_count >= packing.MAX_ROLL_COUNT:
+            # Past this the state code can't carry the roll count
+            conn.reject(table_id, seq)
+            return
+        notice = engine.apply_action(state, action, table.rng)
+        table.log.record(action)
+        self.actions += 1
+        conn.seqs[table_id] = seq
+        for client in table.clients:
+            client.push(table, notice)
+
+    def leave(self, conn: Connection, table: Table) -> None:
+        table.clients.discard(conn)
+        del conn.tables[table.id]
+        conn.seqs.pop(table.id, None)
+        conn.pending.pop(table.id, None)
+        if not table.clients:
+            del self.tables[table.id]
+
+    async def serve(self, address: str, stats_interval: float = 0) -> None:
+        loop = asyncio.get_running_loop()
+        where = protocol.parse_address(address)
+        if isinstance(where, str):
+            server = await loop.create_unix_server(lambda: Connection(self), where)
+        else:
+            server = await loop.create_server(lambda: Connection(self), *where)
+        async with server:
+            if stats_interval:
+                loop.create_task(self.report(stats_interval))
+            await server.serve_forever()
+
+    async def report(self, interval: float) -> None:
+        """Prints throughput and the share of a core the server is using."""
+        actions, pushes = self.actions, self.pushes
+        wall, cpu = time.perf_counter(), time.process_time()
+        while True:
+            await asyncio.sleep(interval)
+            now_wall, now_cpu = time.perf_counter(), time.process_time()
+            elapsed = now_wall - wall
+            print(
+                f"{len(self.tables)} tables, {len(self.connections)} clients, "
+                f"{(self.actions - actions) / elapsed:,.0f} actions/s, "
+                f"{(self.pushes - pushes) / elapsed:,.0f} pushes/s, "
+                f"{100 * (now_cpu - cpu) / elapsed:.0f}% CPU",
+                flush=True,
+            )
+            actions, pushes = self.actions, self.pushes
+            wall, cpu = now_wall, now_cpu
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--listen", default="127.0.0.1:7766")
+    parser.add_argument("--max-tables", type=int, default=100_000)
+    parser.add_argument(
+        "--stats", type=float, default=5, help="seconds between reports (0: none)"
+    )
+    args = parser.parse_args()
+    try:
+        asyncio.run(TableServer(args.max_tables).serve(args.listen, args.stats))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -2,14 +2,15 @@ import pygame
 import pygame.locals
 
 from src.config import *
+from src.text_cache import cache as text_cache
 
 
 class Button:
     def __init__(self, pos: tuple[int, int], text: str, font: pygame.font.Font) -> None:
         self.text = text
         self.font = font
-        self.surf = pygame.Surface(BUTTON_SIZE, pygame.DOUBLEBUF)
-        self.text_surf = font.render(text, True, BUTTON_TEXT_COLOR)
+        self._surf = None  # Created on first draw
+        self.dirty = True
         self.pos = pos
         self.rect = pygame.Rect(pos[0], pos[1], BUTTON_WIDTH, BUTTON_HEIGHT)
         self.hover = False
@@ -21,20 +22,32 @@ class Button:
     def blit_to_surf(self, surf: pygame.Surface) -> None:
         surf.blit(self.surf, self.pos)
 
+    @property
+    def surf(self) -> pygame.Surface:
+        if self.dirty:
+            self._render()
+        return self._surf
+
     def _draw_to_surf(self) -> None:
+        self.dirty = True
+
+    def _render(self) -> None:
+        if self._surf is None:
+            self._surf = pygame.Surface(BUTTON_SIZE, pygame.DOUBLEBUF)
+        self.dirty = False
         if self.hover:
             draw_color = BUTTON_HOVER_COLOR
         else:
             draw_color = BUTTON_COLOR
-        self.surf.fill(BACKGROUND_COLOR)
+        self._surf.fill(BACKGROUND_COLOR)
         pygame.draw.rect(
-            self.surf,
+            self._surf,
             draw_color,
             (0, 0, BUTTON_WIDTH, BUTTON_HEIGHT),
             0,
             DIE_PIP_RADIUS,
         )
-        self.surf.blit(
+        self._surf.blit(
             self.text_surf,
             self.text_surf.get_rect(center=(BUTTON_WIDTH / 2, BUTTON_HEIGHT / 2)),
         )
@@ -45,5 +58,5 @@ class Button:
 
     def set_text(self, text: str) -> None:
         self.text = text
-        self.text_surf = self.font.render(text, True, BUTTON_TEXT_COLOR)
+        self.text_surf = text_cache.render(self.font, text, BUTTON_TEXT_COLOR)
         self._draw_to_surf()
@@ -3,19 +3,25 @@ import random
 import pygame
 import pygame.locals
 
+from src import engine
 from src.config import *
+from src.objects.die_atlas import DieAtlas
 
 
 class Die:
-    RED = "r"
-    GREEN = "g"
-    BLUE = "b"
-    WHITE = "w"
+    RED = engine.RED
+    GREEN = engine.GREEN
+    BLUE = engine.BLUE
+    WHITE = engine.WHITE
+
+    # Sprites are rendered once and shared by every die
+    atlas = DieAtlas()
 
     def __init__(
-        self, color: str, pos: tuple[int, int], player=0, in_game=True
+        self, color: str, pos: tuple[int, int], player=0, in_game=True, index=0
     ) -> None:
         self.color = color
+        self.index = index  # Position in the engine's list of dice of this color
         match color:
             case self.RED:
                 self.active_draw_color = (128, 0, 0, 255)
@@ -50,12 +56,12 @@ class Die:
         self.value = 1
         self.pos = pos
         self.rect = pygame.Rect(pos[0], pos[1], DIE_SIZE, DIE_SIZE)
-        self.surf = pygame.Surface((DIE_SIZE, DIE_SIZE), pygame.DOUBLEBUF)
         self.in_game = in_game
         self.hover = False
         self.player = player
         self.blocked = False
         self.activated = False
+        self._draw_to_surf()
 
     def __str__(self) -> str:
         player_addendum = ""
@@ -63,8 +69,8 @@ class Die:
             player_addendum = f" (Player {self.player})"
         return f"{self.color_word} {self.value}{player_addendum}"
 
-    def roll(self) -> None:
-        self.value = random.randint(1, 6)
+    def roll(self, rng=random) -> None:
+        self.value = rng.randint(1, 6)
         self._draw_to_surf()
 
     def face(self, value: int) -> None:
@@ -80,55 +86,18 @@ class Die:
 
     def set_blocked(self, value: bool) -> None:
         self.blocked = value
-        self._draw_to_surf
+        self._draw_to_surf()
 
     def set_activated(self, value: bool) -> None:
         self.activated = value
         self._draw_to_surf()
 
-    def _draw_pip(self, x, y) -> None:
-        pygame.draw.circle(self.surf, self.pip_color, (x, y), DIE_PIP_RADIUS)
+    @property
+    def surf(self) -> pygame.Surface:
+        # Looked up on first use, so dice that aren't shown yet cost nothing
+        if self._surf is None:
+            self._surf = self.atlas.get(self)
+        return self._surf
 
     def _draw_to_surf(self) -> None:
-        if self.activated:
-            draw_color = (255, 140, 0)
-        else:
-            if self.hover:
-                draw_color = self.hover_active_draw_color
-                if self.blocked:
-                    draw_color = self.hover_inactive_draw_color
-            else:
-                draw_color = self.active_draw_color
-                if self.blocked:
-                    draw_color = self.inactive_draw_color
-
-        self.surf.fill(BACKGROUND_COLOR)
-        pygame.draw.rect(
-            self.surf, draw_color, (0, 0, DIE_SIZE, DIE_SIZE), 0, DIE_PIP_RADIUS
-        )
-        if self.value % 2 != 0:
-            self._draw_pip(DIE_SIZE / 2, DIE_SIZE / 2)
-        if self.value >= 2:
-            self._draw_pip(2 * DIE_PIP_RADIUS, 2 * DIE_PIP_RADIUS)
-            self._draw_pip(
-                DIE_SIZE - 2 * DIE_PIP_RADIUS,
-                DIE_SIZE - 2 * DIE_PIP_RADIUS,
-            )
-        if self.value >= 4:
-            self._draw_pip(
-                DIE_SIZE - 2 * DIE_PIP_RADIUS,
-                2 * DIE_PIP_RADIUS,
-            )
-            self._draw_pip(
-                2 * DIE_PIP_RADIUS,
-                DIE_SIZE - 2 * DIE_PIP_RADIUS,
-            )
-        if self.value == 6:
-            self._draw_pip(
-                DIE_SIZE - 2 * DIE_PIP_RADIUS,
-                DIE_SIZE / 2,
-            )
-            self._draw_pip(
-                2 * DIE_PIP_RADIUS,
-                DIE_SIZE / 2,
-            )
+        self._surf = None
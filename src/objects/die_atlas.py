@@ -0,0 +1,83 @@
+import pygame
+import pygame.locals
+
+from src.config import *
+
+
+class DieAtlas:
+    """
+    Cache of pre-rendered die sprites shared by every Die.
+
+    Each (color, value, look) combination is drawn once, the first time a die
+    needs it, and every later request just returns the cached surface.
+    """
+
+    NORMAL = 0
+    HOVER = 1
+    BLOCKED = 2
+    HOVER_BLOCKED = 3
+    ACTIVATED = 4
+
+    ACTIVATED_COLOR = (255, 140, 0)
+
+    def __init__(self, size: int = DIE_SIZE) -> None:
+        self.size = size
+        self.pip_radius = int(size / 10)
+        self.sprites = {}
+
+    def __len__(self) -> int:
+        return len(self.sprites)
+
+    @staticmethod
+    def look(hover: bool, blocked: bool, activated: bool) -> int:
+        if activated:
+            return DieAtlas.ACTIVATED
+        return DieAtlas.HOVER * hover + DieAtlas.BLOCKED * blocked
+
+    def get(self, die) -> pygame.Surface:
+        """Returns the sprite for a die's current color, value and look."""
+        key = (
+            die.color,
+            die.value,
+            self.look(die.hover, die.blocked, die.activated),
+        )
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            sprite = self.sprites[key] = self._render(die, key[2])
+        return sprite
+
+    def _render(self, die, look: int) -> pygame.Surface:
+        match look:
+            case self.NORMAL:
+                draw_color = die.active_draw_color
+            case self.HOVER:
+                draw_color = die.hover_active_draw_color
+            case self.BLOCKED:
+                draw_color = die.inactive_draw_color
+            case self.HOVER_BLOCKED:
+                draw_color = die.hover_inactive_draw_color
+            case self.ACTIVATED:
+                draw_color = self.ACTIVATED_COLOR
+
+        size, radius = self.size, self.pip_radius
+        surf = pygame.Surface((size, size))
+        if pygame.display.get_surface() is not None:
+            surf = surf.convert()
+        surf.fill(BACKGROUND_COLOR)
+        pygame.draw.rect(surf, draw_color, (0, 0, size, size), 0, radius)
+
+        pips = []
+        if die.value % 2 != 0:
+            pips.append((size / 2, size / 2))
+        if die.value >= 2:
+            pips.append((2 * radius, 2 * radius))
+            pips.append((size - 2 * radius, size - 2 * radius))
+        if die.value >= 4:
+            pips.append((size - 2 * radius, 2 * radius))
+            pips.append((2 * radius, size - 2 * radius))
+        if die.value == 6:
+            pips.append((size - 2 * radius, size / 2))
+            pips.append((2 * radius, size / 2))
+        for pip in pips:
+            pygame.draw.circle(surf, die.pip_color, pip, radius)
+        return surf
@@ -0,0 +1,143 @@
+"""
+Bit-packed encoding of a whole game state.
+
+A State packs into one 96-bit int, which works as a cheap hash key, as a
+snapshot, and, through `to_bytes`, as a 12-byte wire format. Fields from the
+least significant bit up:
+
+    bits  0-47  dice faces, 3 bits each: 2 Red, 4 Green, 4 White, 6 Blue
+                (Blue dice of absent players are 0)
+    bits 48-52  in play: second Red, then 4 White
+    bits 53-55  activated White die, index + 1 (0 for none)
+    bits 56-59  White 2/3/5 target, index into Red + Green + White + 1
+    bits 60-63  flags: pre-roll, mid-action, resolving Red 6, pre-tiebreak
+    bits 64-66  player whose turn it is
+    bits 67-69  number of players
+    bits 70-72  winner (0 while the game is on)
+    bits 73-95  rolls this turn, capped at MAX_ROLL_COUNT
+
+The rules don't limit rerolls, so a count past the cap (over eight million
+rolls in one turn) packs as the cap rather than failing; nothing in the rules
+reads the count beyond comparing it with small thresholds.
+
+`STATE_DTYPE` stores codes as 12-byte NumPy records, so tens of millions of
+states fit in memory at once.
+"""
+
+
+import numpy as np
+
+from src import engine
+
+
+CODE_BITS = 96
+CODE_BYTES = CODE_BITS // 8
+
+# Order of the dice in the face bits
+DICE = engine.PICK_DICE
+TARGETS = {die: slot + 1 for slot, die in enumerate(DICE)}
+MAX_PLAYERS = 6
+
+IN_PLAY_SHIFT = 48
+ACTIVE_SHIFT = 53
+TARGET_SHIFT = 56
+FLAGS_SHIFT = 60
+PLAYER_SHIFT = 64
+PLAYERS_SHIFT = 67
+WINNER_SHIFT = 70
+ROLLS_SHIFT = 73
+MAX_ROLL_COUNT = (1 << CODE_BITS - ROLLS_SHIFT) - 1
+
+PRE_ROLL = 1 << FLAGS_SHIFT
+MID_ACTION = 2 << FLAGS_SHIFT
+RESOLVING_RED_SIX = 4 << FLAGS_SHIFT
+PRE_TIEBREAK = 8 << FLAGS_SHIFT
+
+STATE_DTYPE = np.dtype([("low", "<u8"), ("high", "<u4")])
+
+
+def encode(state: engine.State) -> int:
+    """Packs a State into an int."""
+    dice = state.dice
+    code = 0
+    for value in reversed(dice[engine.BLUE]):
+        code = code << 3 | value
+    for key in (engine.WHITE, engine.GREEN, engine.RED):
+        for value in reversed(dice[key]):
+            code = code << 3 | value
+
+    in_play = state.red_in_game[1]
+    for i, playing in enumerate(state.white_in_game):
+        in_play |= playing << (i + 1)
+    code |= in_play << IN_PLAY_SHIFT
+    if state.active_white is not None:
+        code |= (state.active_white + 1) << ACTIVE_SHIFT
+    if state.active_target is not None:
+        code |= TARGETS[state.active_target] << TARGET_SHIFT
+    if state.turn_pre_roll:
+        code |= PRE_ROLL
+    if state.turn_mid_action:
+        code |= MID_ACTION
+    if state.resolving_red_six:
+        code |= RESOLVING_RED_SIX
+    if state.pre_tiebreak:
+        code |= PRE_TIEBREAK
+    return (
+        code
+        | state.player_turn << PLAYER_SHIFT
+        | state.players << PLAYERS_SHIFT
+        | state.winner << WINNER_SHIFT
+        | min(state.turn_roll_count, MAX_ROLL_COUNT) << ROLLS_SHIFT
+    )
+
+
+def decode(code: int) -> engine.State:
+    """Unpacks an int made by `encode` into a new State."""
+    players = code >> PLAYERS_SHIFT & 7
+    state = engine.State(players)
+    dice = state.dice
+    faces = code
+    for key in (engine.RED, engine.GREEN, engine.WHITE):
+        values = dice[key]
+        for i in range(len(values)):
+            values[i] = faces & 7
+            faces >>= 3
+    blue = dice[engine.BLUE]
+    for i in range(players):
+        blue[i] = faces & 7
+        faces >>= 3
+
+    in_play = code >> IN_PLAY_SHIFT
+    state.red_in_game[1] = bool(in_play & 1)
+    for i in range(engine.NUM_WHITE):
+        state.white_in_game[i] = bool(in_play >> (i + 1) & 1)
+    active = code >> ACTIVE_SHIFT & 7
+    state.active_white = active - 1 if active else None
+    target = code >> TARGET_SHIFT & 15
+    state.active_target = DICE[target - 1] if target else None
+    state.turn_pre_roll = bool(code & PRE_ROLL)
+    state.turn_mid_action = bool(code & MID_ACTION)
+    state.resolving_red_six = bool(code & RESOLVING_RED_SIX)
+    state.pre_tiebreak = bool(code & PRE_TIEBREAK)
+    state.player_turn = code >> PLAYER_SHIFT & 7
+    state.winner = code >> WINNER_SHIFT & 7
+    state.turn_roll_count = code >> ROLLS_SHIFT & MAX_ROLL_COUNT
+    return state
+
+
+def to_bytes(code: int) -> bytes:
+    return code.to_bytes(CODE_BYTES, "little")
+
+
+def from_bytes(data: bytes) -> int:
+    return int.from_bytes(data, "little")
+
+
+def to_array(codes) -> np.ndarray:
+    """Packs an iterable of codes into an array of 12-byte records."""
+    return np.frombuffer(b"".join(map(to_bytes, codes)), STATE_DTYPE)
+
+
+def from_array(array: np.ndarray) -> list[int]:
+    """Unpacks an array made by `to_array` back into codes."""
+    return [int(record["high"]) << 64 | int(record["low"]) for record in array]
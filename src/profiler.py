@@ -0,0 +1,148 @@
+"""
+Frame-time profiler for the game window.
+
+`FrameProfiler.attach` wraps a Game's hot methods on the instance, so a Game
+without a profiler runs exactly the code it always did. Stages are summed per
+frame and kept in fixed-size ring buffers:
+
+    events  polling the pygame event queue
+    hover   _detect_hover, from mouse motion and clicks
+    click   _on_left_click, including its hover and rules time
+    rules   applying actions to the engine and syncing the interface
+    draw    _draw, including its flip time
+    flip    pushing changed regions to the screen
+
+Frame time is measured between the ends of consecutive frames, so it includes
+the wait for the frame cap. Idle frames, which draw nothing, are left out.
+"""
+
+
+import json
+import time
+
+import numpy as np
+import pygame
+
+from src.config import PROFILE_FRAMES, TEXT_COLOR
+
+
+STAGES = ("events", "hover", "click", "rules", "draw", "flip")
+PERCENTILES = (50, 95, 99)
+OVERLAY_INTERVAL = 30  # Frames between overlay refreshes
+
+
+class RingBuffer:
+    """The last `size` samples of a series."""
+
+    def __init__(self, size: int) -> None:
+        self.samples = np.zeros(size)
+        self.count = 0
+
+    def add(self, value: float) -> None:
+        self.samples[self.count % len(self.samples)] = value
+        self.count += 1
+
+    def recent(self) -> np.ndarray:
+        """Returns the kept samples, in no particular order."""
+        return self.samples[: min(self.count, len(self.samples))]
+
+    def history(self) -> np.ndarray:
+        """Returns the kept samples, oldest first."""
+        if self.count <= len(self.samples):
+            return self.recent()
+        return np.roll(self.samples, -(self.count % len(self.samples)))
+
+    def percentiles(self) -> dict[str, float]:
+        samples = self.recent()
+        if not len(samples):
+            return {f"p{q}": 0.0 for q in PERCENTILES}
+        values = np.percentile(samples, PERCENTILES)
+        return {f"p{q}": float(value) for q, value in zip(PERCENTILES, values)}
+
+
+class FrameProfiler:
+    """Per-stage frame timings, with an optional on-screen overlay."""
+
+    def __init__(self, size: int = PROFILE_FRAMES) -> None:
+        self.frames = RingBuffer(size)
+        self.stages = {name: RingBuffer(size) for name in STAGES}
+        self.current = dict.fromkeys(STAGES, 0.0)
+        self.last_frame_end = None
+        self.overlay = False
+        self.overlay_text = ""
+        self.overlay_surf = None
+
+    def timed(self, name: str, func):
+        """Wraps func so its run time counts towards a stage."""
+        current = self.current
+        perf_counter = time.perf_counter
+
+        def wrapper(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                current[name] += perf_counter() - start
+
+        return wrapper
+
+    def attach(self, game) -> None:
+        """Instruments a Game. Its run loop then ends every frame here."""
+        game._poll_events = self.timed("events", game._poll_events)
+        game._detect_hover = self.timed("hover", game._detect_hover)
+        game._on_left_click = self.timed("click", game._on_left_click)
+        game._apply = self.timed("rules", game._apply)
+        game._draw = self.timed("draw", game._draw)
+        game.renderer.present = self.timed("flip", game.renderer.present)
+        game.profiler = self
+
+    def end_frame(self) -> None:
+        now = time.perf_counter()
+        if self.last_frame_end is not None:
+            self.frames.add((now - self.last_frame_end) * 1000)
+        self.last_frame_end = now
+        current = self.current
+        for name, buffer in self.stages.items():
+            buffer.add(current[name] * 1000)
+            current[name] = 0.0
+
+    def skip_frame(self) -> None:
+        """Leaves the frame that just ended out of the timings."""
+        self.last_frame_end = time.perf_counter()
+        for name in self.current:
+            self.current[name] = 0.0
+
+    def summary(self) -> dict:
+        """Returns frame and stage percentiles, in milliseconds."""
+        return {
+            "frames": self.frames.count,
+            "frame_ms": self.frames.percentiles(),
+            "stage_ms": {
+                name: {
+                    **buffer.percentiles(),
+                    "mean": float(buffer.recent().mean()) if buffer.count else 0.0,
+                }
+                for name, buffer in self.stages.items()
+            },
+        }
+
+    def overlay_surface(self, font: pygame.font.Font) -> pygame.Surface:
+        """Returns the overlay text, re-rendered every few frames."""
+        if self.overlay_surf is None or self.frames.count % OVERLAY_INTERVAL == 0:
+            frame = self.frames.percentiles()
+            text = "frame ms " + "  ".join(
+                f"{name} {value:.1f}" for name, value in frame.items()
+            )
+            if text != self.overlay_text or self.overlay_surf is None:
+                self.overlay_text = text
+                self.overlay_surf = font.render(text, True, TEXT_COLOR)
+        return self.overlay_surf
+
+    def dump(self, path: str) -> None:
+        """Writes the summary and the raw recent frame times as JSON."""
+        with open(path, "w") as f:
+            json.dump(
+                {**self.summary(), "recent_frame_ms": self.frames.history().tolist()},
+                f,
+                indent=2,
+            )
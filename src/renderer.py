@@ -0,0 +1,83 @@
+import pygame
+import pygame.locals
+
+
+class Renderer:
+    """
+    Redraws only the parts of the display that changed since the last frame.
+
+    Every frame the game queues what it wants on screen with `draw`, keyed by
+    the object being drawn. `flush` compares the queue with the previous frame,
+    repaints the regions whose content moved, appeared, disappeared or changed
+    token, and pushes just those regions to the screen.
+    """
+
+    def __init__(self, display_surf: pygame.Surface, background_color) -> None:
+        self.display_surf = display_surf
+        self.background_color = background_color
+        self.drawn = {}  # Key -> (token, surface, rect) currently on screen
+        self.queued = {}
+        self.full_redraw = True
+
+    def invalidate(self) -> None:
+        """Forces the next flush to repaint the whole display."""
+        self.full_redraw = True
+
+    def draw(self, key, surf: pygame.Surface, pos, token=None) -> None:
+        """
+        Queues a surface to be shown at pos this frame.
+
+        The region is repainted only when `token` differs from last frame's. It
+        defaults to the surface itself, which suits immutable cached sprites.
+        """
+        if token is None:
+            token = surf
+        self.queued[key] = (token, surf, surf.get_rect(topleft=pos))
+
+    def flush(self) -> list[pygame.Rect]:
+        """
+        Repaints changed regions and updates them on the display.
+
+        Returns the updated rects, which is empty when nothing changed.
+        """
+        queued, drawn = self.queued, self.drawn
+        self.queued = {}
+        self.drawn = queued
+
+        if self.full_redraw:
+            self.full_redraw = False
+            self.display_surf.fill(self.background_color)
+            self.display_surf.blits([(surf, rect) for _, surf, rect in queued.values()])
+            self.present()
+            return [self.display_surf.get_rect()]
+
+        dirty = []
+        for key, (token, _, rect) in queued.items():
+            previous = drawn.pop(key, None)
+            if previous is None:
+                dirty.append(rect)
+            elif previous[0] != token or previous[2] != rect:
+                dirty.append(rect.union(previous[2]))
+        # Whatever was drawn last frame but not queued now has to be erased
+        dirty.extend(rect for _, _, rect in drawn.values())
+        if not dirty:
+            return dirty
+
+        for rect in dirty:
+            self.display_surf.fill(self.background_color, rect)
+        self.display_surf.blits(
+            [
+                (surf, rect)
+                for _, surf, rect in queued.values()
+                if rect.collidelist(dirty) != -1
+            ]
+        )
+        self.present(dirty)
+        return dirty
+
+    def present(self, rects: list[pygame.Rect] | None = None) -> None:
+        """Pushes the given regions, or the whole display, to the screen."""
+        if rects is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update(rects)
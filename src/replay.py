@@ -0,0 +1,175 @@
+"""
+Game logs and replay.
+
+A game is fully determined by its player count, its RNG seed and the actions
+taken, so a `GameLog` stores just those: a 16-byte header and one byte per
+action. Replaying re-executes the actions against a State seeded the same way,
+either headless at full speed or in a window at a chosen speed.
+
+Run `python -m src.replay game.mi6` to time a headless replay, or add
+`--speed 4` to watch it at four actions per second.
+"""
+
+
+import argparse
+import random
+import struct
+import time
+
+from src import engine, packing
+from src.history import History
+
+
+MAGIC = b"MI6L"
+VERSION = 1
+HEADER = struct.Struct("<4sBBxxQ")  # magic, version, players, seed
+
+# Undo and redo in the game window, logged alongside the engine's actions
+UNDO = engine.Action("undo")
+REDO = engine.Action("redo")
+
+# Action bytes: the first few kinds, then PICK_BASE + die slot
+ACTION_CODES = {
+    engine.Action.ROLL: 0,
+    engine.Action.REROLL: 1,
+    engine.Action.PASS: 2,
+    engine.Action.CANCEL: 3,
+    UNDO.kind: 4,
+    REDO.kind: 5,
+}
+ACTION_KINDS = {code: kind for kind, code in ACTION_CODES.items()}
+PICK_BASE = 16
+PICK_DICE = packing.DICE
+PICK_SLOTS = {die: slot for slot, die in enumerate(PICK_DICE)}
+
+
+def new_seed() -> int:
+    """Returns a fresh seed, so that even unseeded games can be replayed."""
+    return random.SystemRandom().randrange(2**64)
+
+
+def encode_action(action: engine.Action) -> int:
+    if action.kind == engine.Action.PICK:
+        return PICK_BASE + PICK_SLOTS[action.color, action.index]
+    return ACTION_CODES[action.kind]
+
+
+def decode_action(code: int) -> engine.Action:
+    if code >= PICK_BASE:
+        color, index = PICK_DICE[code - PICK_BASE]
+        return engine.Action(engine.Action.PICK, color, index)
+    return engine.Action(ACTION_KINDS[code])
+
+
+class GameLog:
+    """Seed plus actions of one game."""
+
+    def __init__(self, players: int, seed: int, actions=b"") -> None:
+        self.players = players
+        self.seed = seed
+        self.actions = bytearray(actions)
+
+    def __len__(self) -> int:
+        return len(self.actions)
+
+    def __iter__(self):
+        return map(decode_action, self.actions)
+
+    def record(self, action: engine.Action) -> None:
+        self.actions.append(encode_action(action))
+
+    def new_state(self) -> tuple[engine.State, random.Random]:
+        """Returns the starting State and RNG of the logged game."""
+        return engine.State(self.players), random.Random(self.seed)
+
+    def to_bytes(self) -> bytes:
+        return HEADER.pack(MAGIC, VERSION, self.players, self.seed) + self.actions
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "GameLog":
+        magic, version, players, seed = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not a Make It Six game log.")
+        return cls(players, seed, data[HEADER.size :])
+
+    def save(self, path: str) -> None:
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path: str) -> "GameLog":
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+
+def replay(log: GameLog) -> engine.State:
+    """Re-executes a log without rendering and returns the final State."""
+    state, rng = log.new_state()
+    history = History()
+    for action in log:
+        if action == UNDO:
+            state = history.undo(state)
+        elif action == REDO:
+            state = history.redo(state)
+        else:
+            history.record(state)
+            engine.apply_action(state, action, rng)
+    return state
+
+
+def play_back(log: GameLog, actions_per_second: float) -> None:
+    """Replays a log in a Game window, stepping at the given speed."""
+    import pygame
+
+    from src.game import Game
+
+    game = Game(log.players, seed=log.seed)
+    interval = 1000 / actions_per_second
+    next_action = pygame.time.get_ticks() + interval
+    actions = iter(log)
+    game.running = True
+    while game.running:
+        game.clock.tick(60)
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                game.running = False
+        if pygame.time.get_ticks() >= next_action:
+            action = next(actions, None)
+            if action == UNDO:
+                game.undo()
+            elif action == REDO:
+                game.redo()
+            elif action is not None:
+                game._apply(action)
+                game._detect_hover()
+            next_action += interval
+        game._draw()
+    game._exit()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("log", help="game log written by main.py --record")
+    parser.add_argument(
+        "--speed", type=float, help="actions per second in a window (default: headless)"
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=1, help="headless replays to time"
+    )
+    args = parser.parse_args()
+
+    log = GameLog.load(args.log)
+    if args.speed:
+        play_back(log, args.speed)
+        return
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        state = replay(log)
+    elapsed = time.perf_counter() - start
+    print(f"{len(log)} actions x {args.repeat} in {elapsed:.3f}s")
+    print(f"{len(log) * args.repeat / elapsed:,.0f} actions/s")
+    print(engine.instruction(state))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,383 @@
+"""
+Vectorized batch simulator for Make It Six.
+
+Keeps N games as NumPy arrays and advances every unfinished game by one
+action per step, using masks instead of per-game Python loops. All players
+follow the same greedy policy, in priority order:
+
+1. White 1 on a Green 5, making it a 6
+2. White 4 on a Green 1, flipping it to a 6
+3. White 2 copying a White 6 onto a Green die that isn't 6
+4. White 3 rerolling the first two Green dice that aren't 6, if there are two
+5. White 6 rerolling the White dice
+6. Reroll, while the turn has used fewer than `max_rerolls` rerolls
+7. Pass
+
+Only usable White dice count: in play and not blocked by a Red die's value.
+Rules follow `src.engine`: three Green 6s raise the player's Blue die and end
+the turn, reaching Blue 6 wins, and a rolled Red 6 applies the Blue-dependent
+penalty.
+
+The number of Green and White dice and when the second Red die comes in
+(`red_entry`, the rerolls taken before it joins) can be varied from the
+engine's rules, for `src.sim.sweep`.
+
+Run `python -m src.sim.batch --games 1000000 --players 4` for a throughput
+report. Pass a `src.sim.stats.TurnStats` (`--stats DIR`) to record one row
+per turn played, and `--check` to compare the policy's White 3 picks with
+the engine's legal moves for each Green die count it can represent.
+"""
+
+
+import argparse
+import time
+from typing import NamedTuple
+
+import numpy as np
+
+from src import engine
+from src.sim.stats import TurnStats
+
+
+class BatchResult(NamedTuple):
+    winners: np.ndarray  # Winning player (1-based) per game, 0 if unfinished
+    turns: np.ndarray  # Turns played per game
+    steps: int  # Vectorized steps taken
+
+    @property
+    def finished(self) -> np.ndarray:
+        return self.winners != 0
+
+
+class BatchSimulator:
+    """Simulates many independent games of the same player count at once."""
+
+    def __init__(
+        self,
+        games: int,
+        players: int,
+        seed=None,
+        max_rerolls: int = 2,
+        max_turns: int = 10_000,
+        stats: TurnStats | None = None,
+        green: int = engine.NUM_GREEN,
+        white: int = engine.NUM_WHITE,
+        red_entry: int = 1,
+    ) -> None:
+        if players not in range(2, 7):
+            raise NotImplementedError("Game must have 2-6 players.")
+        if green < 3 or white < 1 or red_entry < 0:
+            raise ValueError("Need at least 3 Green and 1 White die.")
+        self.games = games
+        self.players = players
+        self.max_rerolls = max_rerolls
+        self.max_turns = max_turns
+        self.red_entry = red_entry
+        self.stats = stats
+        self.rng = np.random.default_rng(seed)
+
+        # Per-game state, kept compacted to the games that are still running
+        self.ids = np.arange(games)
+        self.green = np.ones((games, green), np.int8)
+        self.white = np.ones((games, white), np.int8)
+        self.white_in = np.ones((games, white), bool)
+        self.red = np.ones((games, engine.NUM_RED), np.int8)
+        self.red1_in = np.zeros(games, bool)
+        self.blue = np.ones((games, players), np.int8)
+        self.player = np.zeros(games, np.int64)
+        self.pre_roll = np.ones(games, bool)
+        self.rerolls = np.zeros(games, np.int32)
+        self.alive = np.ones(games, bool)
+        # This turn's White activations by face and Red 6 penalties by the
+        # Blue value they hit, for stats
+        self.white_uses = np.zeros((games, 6), np.uint8)
+        self.red_sixes = np.zeros((games, engine.WINNING_VALUE - 1), np.uint16)
+
+        # Outcomes, indexed by original game id
+        self.winners = np.zeros(games, np.int8)
+        self.turn_counts = np.zeros(games, np.int32)
+
+    def run(self) -> BatchResult:
+        """Plays every game until it is won or hits max_turns."""
+        steps = 0
+        while self.alive.any():
+            self.step()
+            steps += 1
+        return BatchResult(self.winners, self.turn_counts, steps)
+
+    def _roll(self, shape) -> np.ndarray:
+        return self.rng.integers(1, 7, size=shape, dtype=np.int8)
+
+    def step(self) -> None:
+        """Advances every running game by one action."""
+        n = len(self.ids)
+        rows = np.arange(n)
+        green, white, red = self.green, self.white, self.red
+
+        # Start of turn: roll the first Red, the Green and the White dice
+        starting = self.pre_roll & self.alive
+        k = np.count_nonzero(starting)
+        if k:
+            green[starting] = self._roll((k, green.shape[1]))
+            white[starting] = self._roll((k, white.shape[1]))
+            if self.red_entry == 0:
+                red[starting] = self._roll((k, engine.NUM_RED))
+            else:
+                red[starting, 0] = self._roll(k)
+            self.white_in[starting] = True
+            self.red1_in[starting] = self.red_entry == 0
+            self.rerolls[starting] = 0
+            self.pre_roll[starting] = False
+            if self.stats is not None:
+                self.white_uses[starting] = 0
+                self.red_sixes[starting] = 0
+
+        # Everyone else takes the first applicable action of the policy
+        blocked = (white == red[:, :1]) | (
+            self.red1_in[:, None] & (white == red[:, 1:2])
+        )
+        usable = self.white_in & ~blocked
+        not_six = green != 6
+        g5 = green == 5
+        g1 = green == 1
+        taken = starting | ~self.alive
+
+        use_w1 = ~taken & _any(usable & (white == 1)) & _any(g5)
+        taken |= use_w1
+        use_w4 = ~taken & _any(usable & (white == 4)) & _any(g1)
+        taken |= use_w4
+        use_w2 = (
+            ~taken
+            & _any(usable & (white == 2))
+            & _any(self.white_in & (white == 6))
+            & _any(not_six)
+        )
+        taken |= use_w2
+        use_w3 = ~taken & _any(usable & (white == 3)) & _has_white_3_picks(not_six)
+        taken |= use_w3
+        use_w6 = ~taken & _any(usable & (white == 6))
+        taken |= use_w6
+        use_reroll = ~taken & (self.rerolls < self.max_rerolls)
+        taken |= use_reroll
+        use_pass = ~taken
+        if self.stats is not None:
+            for mask, face in (
+                (use_w1, 1),
+                (use_w4, 4),
+                (use_w2, 2),
+                (use_w3, 3),
+                (use_w6, 6),
+            ):
+                self.white_uses[mask, face - 1] += 1
+
+        # White 1, 4 and 2 each turn one Green die into a 6
+        for mask, face, target in (
+            (use_w1, 1, g5),
+            (use_w4, 4, g1),
+            (use_w2, 2, not_six),
+        ):
+            r = rows[mask]
+            green[r, target[r].argmax(1)] = 6
+            self.white_in[r, (usable[r] & (white[r] == face)).argmax(1)] = False
+
+        # White 3 rerolls the first two Green dice that aren't 6
+        r = rows[use_w3]
+        first, second = _white_3_picks(not_six[r])
+        green[r, first] = self._roll(len(r))
+        green[r, second] = self._roll(len(r))
+        self.white_in[r, (usable[r] & (white[r] == 3)).argmax(1)] = False
+
+        # White 6 rerolls every White die still in play
+        r = rows[use_w6]
+        white[r] = np.where(
+            self.white_in[r], self._roll((len(r), white.shape[1])), white[r]
+        )
+
+        # Reroll rerolls Red and White dice, bringing in the second Red die
+        # once enough rerolls have been taken
+        r = rows[use_reroll]
+        self.rerolls[r] += 1
+        self.red1_in[r] = self.rerolls[r] >= self.red_entry
+        red[r] = self._roll((len(r), engine.NUM_RED))
+        white[r] = np.where(
+            self.white_in[r], self._roll((len(r), white.shape[1])), white[r]
+        )
+
+        turn_over = use_pass & self.alive
+
+        # Three Green 6s raise the player's Blue die and end the turn
+        completed = self.alive & ~use_pass & (_count(green == 6) >= 3)
+        r = rows[completed]
+        self.blue[r, self.player[r]] += 1
+        won = np.zeros(n, bool)
+        won[r] = self.blue[r, self.player[r]] >= engine.WINNING_VALUE
+        turn_over |= completed
+
+        # A freshly rolled Red 6 costs the player according to their Blue die
+        rolled = starting | use_reroll
+        red_six = (red[:, 0] == 6) | (self.red1_in & (red[:, 1] == 6))
+        penalized = rolled & ~completed & red_six
+        if penalized.any():
+            level = self.blue[rows, self.player]
+            if self.stats is not None:
+                r = rows[penalized]
+                self.red_sixes[r, level[r] - 1] += 1
+            r = rows[penalized & (level == 1)]
+            sixes = green[r] == 6
+            r = r[sixes.any(1)]
+            green[r, sixes[sixes.any(1)].argmax(1)] = self._roll(len(r))
+            for before, after in ((4, 3), (5, 4)):
+                r = rows[penalized & (level == before)]
+                self.blue[r, self.player[r]] = after
+            turn_over |= penalized & (level == 5)
+
+        # Pass the turn on
+        r = rows[turn_over]
+        ids = self.ids[r]
+        if self.stats is not None:
+            self._record(r, ids, completed)
+        self.turn_counts[ids] += 1
+        self.winners[self.ids[won]] = self.player[won] + 1
+        self.player[r] = (self.player[r] + 1) % self.players
+        self.pre_roll[r] = True
+
+        # Retire finished games, compacting once enough of them pile up
+        self.alive &= ~won & (self.turn_counts[self.ids] < self.max_turns)
+        if np.count_nonzero(self.alive) < n * 3 // 4:
+            self._keep(self.alive)
+
+    def _record(self, r: np.ndarray, ids: np.ndarray, completed: np.ndarray) -> None:
+        """Hands the turns ending now, in rows r, to the stats collector."""
+        uses = self.white_uses[r]
+        red_sixes = self.red_sixes[r]
+        self.stats.append(
+            game=ids,
+            turn=self.turn_counts[ids],
+            player=self.player[r],
+            rolls=np.minimum(self.rerolls[r] + 1, np.iinfo(np.uint16).max),
+            **{f"white_{face}": uses[:, face - 1] for face in range(1, 7)},
+            **{
+                f"red_six_{blue}": red_sixes[:, blue - 1]
+                for blue in range(1, engine.WINNING_VALUE)
+            },
+            completed=completed[r],
+        )
+
+    def _keep(self, mask: np.ndarray) -> None:
+        for name in (
+            "ids",
+            "alive",
+            "green",
+            "white",
+            "white_in",
+            "red",
+            "red1_in",
+            "blue",
+            "player",
+            "pre_roll",
+            "rerolls",
+            "white_uses",
+            "red_sixes",
+        ):
+            setattr(self, name, getattr(self, name)[mask])
+
+
+def _any(mask: np.ndarray) -> np.ndarray:
+    """Row-wise any() of an (n, 4) boolean array, read as one uint32 per row."""
+    if mask.shape[1] != 4:
+        return mask.any(1)
+    return mask.view(np.uint32).ravel() != 0
+
+
+def _count(mask: np.ndarray) -> np.ndarray:
+    """Row-wise count of True in an (n, 4) boolean array."""
+    if mask.shape[1] != 4:
+        return np.count_nonzero(mask, 1)
+    return (mask.view(np.uint32).ravel() * np.uint32(0x01010101)) >> 24
+
+
+def _has_white_3_picks(not_six: np.ndarray) -> np.ndarray:
+    """Returns the rows with two Green dice that aren't 6 for White 3 to reroll."""
+    return _count(not_six) >= 2
+
+
+def _white_3_picks(not_six: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Returns the first two Green dice that aren't 6, in rows with two."""
+    first = not_six.argmax(1)
+    rest = not_six.copy()
+    rest[np.arange(len(rest)), first] = False
+    return first, rest.argmax(1)
+
+
+def white_3_parity(green: int, positions: int = 10_000, seed=None) -> int:
+    """
+    Plays the policy's White 3 picks on random Green dice through `src.engine`
+    and returns how many positions it gets wrong: a pick the engine wouldn't
+    allow, or one on a Green 6. Engine dice beyond `green` show 6.
+    """
+    if not 3 <= green <= engine.NUM_GREEN:
+        raise ValueError(f"The engine has room for 3-{engine.NUM_GREEN} Green dice.")
+    dice = np.random.default_rng(seed).integers(1, 7, (positions, green), np.int8)
+    not_six = dice != 6
+    eligible = _has_white_3_picks(not_six)
+    first, second = _white_3_picks(not_six[eligible])
+    wrong = 0
+    for values, picks in zip(dice[eligible], zip(first, second)):
+        state = engine.State(2)
+        state.turn_pre_roll = False
+        state.dice[engine.GREEN] = [int(value) for value in values] + [6] * (
+            engine.NUM_GREEN - green
+        )
+        state.dice[engine.WHITE][0] = 3
+        engine.apply_action(state, engine.Action(engine.Action.PICK, engine.WHITE, 0))
+        for i in picks:
+            if state.active_white is None:
+                break  # The first reroll made three Green 6s and ended the turn
+            pick = engine.Action(engine.Action.PICK, engine.GREEN, int(i))
+            if values[i] == 6 or pick not in engine.legal_actions(state):
+                wrong += 1
+                break
+            engine.apply_action(state, pick)
+    return wrong
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--games", type=int, default=100_000)
+    parser.add_argument("--players", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--max-rerolls", type=int, default=2)
+    parser.add_argument("--stats", metavar="DIR", help="record per-turn stats")
+    parser.add_argument(
+        "--check", action="store_true", help="compare White 3 with the engine"
+    )
+    args = parser.parse_args()
+
+    if args.check:
+        wrong = 0
+        for green in range(3, engine.NUM_GREEN + 1):
+            count = white_3_parity(green, args.games, args.seed)
+            print(f"{green} Green dice: {count} of {args.games:,} positions differ")
+            wrong += count
+        raise SystemExit(1 if wrong else 0)
+
+    stats = TurnStats(args.stats) if args.stats else None
+    start = time.perf_counter()
+    result = BatchSimulator(
+        args.games, args.players, args.seed, args.max_rerolls, stats=stats
+    ).run()
+    if stats is not None:
+        stats.close()
+    elapsed = time.perf_counter() - start
+
+    finished = result.finished
+    rate = args.games / elapsed * 60
+    print(f"{args.games} games in {elapsed:.2f}s ({rate:,.0f}/min)")
+    print(f"{result.steps} steps, {finished.mean():.1%} finished")
+    print(f"Mean turns: {result.turns[finished].mean():.1f}")
+    for player in range(1, args.players + 1):
+        print(f"Player {player} wins: {(result.winners == player).mean():.1%}")
+
+
+if __name__ == "__main__":
+    main()
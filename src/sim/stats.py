@@ -0,0 +1,192 @@
+"""
+Streaming per-turn statistics in memory-mapped column files.
+
+`TurnStats` collects one fixed-width record per turn, buffers them in chunks
+and appends each chunk to one raw file per column through `np.memmap`, so a
+run of any length needs only a chunk's worth of memory. `summarize` reduces
+the mapped columns chunk by chunk, again without loading them whole.
+
+Columns of a record:
+
+    game          game id within the run
+    turn          turn number within the game, from 0
+    player        player whose turn it was
+    rolls         rolls that turn, counting the first (State.turn_roll_count)
+    white_1..6    White dice of each face activated that turn
+    red_six_1..5  Red 6 penalties that turn, by the player's Blue value
+    completed     whether the turn made three Green 6s
+
+Run `python -m src.sim.batch --games 1000000 --stats turns/` to record, then
+`python -m src.sim.stats turns/` to summarize.
+"""
+
+
+import argparse
+import json
+import os
+
+import numpy as np
+
+
+COLUMNS = {
+    "game": np.uint32,
+    "turn": np.uint32,
+    "player": np.uint8,
+    "rolls": np.uint16,
+    **{f"white_{face}": np.uint8 for face in range(1, 7)},
+    **{f"red_six_{blue}": np.uint16 for blue in range(1, 6)},
+    "completed": np.bool_,
+}
+CHUNK_ROWS = 1 << 20
+META = "meta.json"
+
+
+class TurnStats:
+    """Appends turn records to column files in `path`, one chunk at a time."""
+
+    def __init__(self, path: str, chunk_rows: int = CHUNK_ROWS) -> None:
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.chunk_rows = chunk_rows
+        self.rows = 0
+        self.buffers = {
+            name: np.empty(chunk_rows, dtype) for name, dtype in COLUMNS.items()
+        }
+        self.buffered = 0
+        for name in COLUMNS:
+            open(self._file(name), "wb").close()
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, f"{name}.bin")
+
+    def append(self, **columns: np.ndarray) -> None:
+        """Adds records given as equal-length arrays, one per column."""
+        count = len(columns["game"])
+        done = 0
+        while done < count:
+            take = min(count - done, self.chunk_rows - self.buffered)
+            for name, buffer in self.buffers.items():
+                buffer[self.buffered : self.buffered + take] = columns[name][
+                    done : done + take
+                ]
+            self.buffered += take
+            done += take
+            if self.buffered == self.chunk_rows:
+                self.flush()
+
+    def flush(self) -> None:
+        """Appends the buffered records to the column files."""
+        if not self.buffered:
+            return
+        for name, buffer in self.buffers.items():
+            itemsize = buffer.itemsize
+            with open(self._file(name), "r+b") as f:
+                f.truncate((self.rows + self.buffered) * itemsize)
+                mapped = np.memmap(
+                    f,
+                    buffer.dtype,
+                    "r+",
+                    offset=self.rows * itemsize,
+                    shape=self.buffered,
+                )
+                mapped[:] = buffer[: self.buffered]
+                mapped.flush()
+                del mapped
+        self.rows += self.buffered
+        self.buffered = 0
+        self._write_meta()
+
+    def close(self) -> None:
+        self.flush()
+        self._write_meta()
+
+    def _write_meta(self) -> None:
+        meta = {
+            "rows": self.rows,
+            "columns": {name: np.dtype(dtype).str for name, dtype in COLUMNS.items()},
+        }
+        with open(os.path.join(self.path, META), "w") as f:
+            json.dump(meta, f, indent=2)
+
+
+def open_columns(path: str) -> dict[str, np.memmap]:
+    """Maps every column file of a run read-only."""
+    with open(os.path.join(path, META)) as f:
+        meta = json.load(f)
+    rows = meta["rows"]
+    if not rows:
+        # NumPy can't map an empty file
+        return {name: np.empty(0, dtype) for name, dtype in meta["columns"].items()}
+    return {
+        name: np.memmap(
+            os.path.join(path, f"{name}.bin"), np.dtype(dtype), "r", shape=rows
+        )
+        for name, dtype in meta["columns"].items()
+    }
+
+
+def summarize(path: str, chunk_rows: int = CHUNK_ROWS) -> dict:
+    """Aggregates a run's turn records, reading one chunk at a time."""
+    columns = open_columns(path)
+    rows = len(columns["game"])
+    faces = range(1, 7)
+    roll_counts = np.zeros(0, np.int64)
+    whites = np.zeros(7, np.int64)
+    penalties = np.zeros(7, np.int64)
+    completed = 0
+    games = 0
+    for start in range(0, rows, chunk_rows):
+        end = min(start + chunk_rows, rows)
+        counts = np.bincount(columns["rolls"][start:end])
+        roll_counts = np.pad(roll_counts, (0, max(0, len(counts) - len(roll_counts))))
+        roll_counts[: len(counts)] += counts
+        for face in faces:
+            whites[face] += columns[f"white_{face}"][start:end].sum(dtype=np.int64)
+        for blue in range(1, 6):
+            penalties[blue] += columns[f"red_six_{blue}"][start:end].sum(dtype=np.int64)
+        completed += int(np.count_nonzero(columns["completed"][start:end]))
+        games = max(games, int(columns["game"][start:end].max()) + 1)
+
+    rolls = np.arange(len(roll_counts))
+    return {
+        "turns": rows,
+        "games": games,
+        "mean_rolls_per_turn": float(rolls @ roll_counts / rows) if rows else 0.0,
+        "rolls_per_turn": {
+            int(count): int(turns) for count, turns in enumerate(roll_counts) if turns
+        },
+        "white_activations": {face: int(whites[face]) for face in faces},
+        "white_activations_per_turn": {
+            face: float(whites[face] / rows) if rows else 0.0 for face in faces
+        },
+        "red_six_penalties_by_blue": {
+            blue: int(penalties[blue]) for blue in range(1, 6)
+        },
+        "completions": completed,
+        "completion_rate": completed / rows if rows else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("path", help="directory written by src.sim.batch --stats")
+    args = parser.parse_args()
+    summary = summarize(args.path)
+    print(f"{summary['turns']:,} turns of {summary['games']:,} games")
+    print(f"Rolls per turn: {summary['mean_rolls_per_turn']:.2f}")
+    for count, turns in summary["rolls_per_turn"].items():
+        print(f"  {count}: {turns / summary['turns']:.1%}")
+    print("White activations per turn, by face:")
+    for face, rate in summary["white_activations_per_turn"].items():
+        print(f"  {face}: {rate:.3f}")
+    print("Red 6 penalties, by Blue value:")
+    for blue, count in summary["red_six_penalties_by_blue"].items():
+        print(f"  {blue}: {count:,}")
+    print(
+        f"Green triple-six completions: {summary['completions']:,} "
+        f"({summary['completion_rate']:.1%} of turns)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""
+Parameter sweeps over rule variants, with a content-addressed result cache.
+
+A sweep is the product of lists of player counts, Green and White die counts
+and Red entry rules (`red_entry`: rerolls taken before the second Red die
+comes in; 1 is the standard rule). Each point is simulated with
+`src.sim.batch` on a process pool. A point's result is stored under a hash of
+its parameters and of the simulator's source, so running a sweep again only
+simulates points that are new, or all of them after the rules change.
+
+Every point gets its own seed, derived from the sweep seed and the point's
+parameters, so its result doesn't depend on which other points are in the
+grid or on the worker count.
+
+    python -m src.sim.sweep --players 2 3 4 5 6 --green 3 4 5 --red-entry 0 1 2
+"""
+
+
+import argparse
+import hashlib
+import inspect
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from src import engine
+from src.sim import batch
+
+
+SWEEP_CACHE_PATH = os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")),
+    "mi6",
+    "sweep",
+)
+
+
+def engine_version() -> str:
+    """Hashes the source of the rules the simulator follows."""
+    digest = hashlib.sha256()
+    for module in (engine, batch):
+        digest.update(inspect.getsource(module).encode())
+    return digest.hexdigest()[:16]
+
+
+def grid(
+    players: list[int],
+    green: list[int],
+    white: list[int],
+    red_entry: list[int],
+    games: int,
+    seed: int,
+    max_rerolls: int = 2,
+    max_turns: int = 10_000,
+) -> list[dict]:
+    """Returns one parameter set per combination of the given values."""
+    return [
+        {
+            "players": p,
+            "green": g,
+            "white": w,
+            "red_entry": r,
+            "max_rerolls": max_rerolls,
+            "max_turns": max_turns,
+            "games": games,
+            "seed": seed,
+        }
+        for p, g, w, r in itertools.product(players, green, white, red_entry)
+    ]
+
+
+def point_key(params: dict, version: str) -> str:
+    encoded = json.dumps(params, sort_keys=True).encode()
+    return hashlib.sha256(version.encode() + b"\0" + encoded).hexdigest()
+
+
+def run_point(params: dict) -> dict:
+    """Simulates one parameter set. Runs inside a worker process."""
+    key = json.dumps(params, sort_keys=True).encode()
+    entropy = int.from_bytes(hashlib.sha256(key).digest()[:8], "little")
+    start = time.perf_counter()
+    result = batch.BatchSimulator(
+        params["games"],
+        params["players"],
+        seed=entropy,
+        max_rerolls=params["max_rerolls"],
+        max_turns=params["max_turns"],
+        green=params["green"],
+        white=params["white"],
+        red_entry=params["red_entry"],
+    ).run()
+    finished = result.finished
+    return {
+        "params": params,
+        "finished": float(finished.mean()),
+        "mean_turns": float(result.turns[finished].mean()) if finished.any() else 0.0,
+        "win_rates": [
+            float((result.winners == player).mean())
+            for player in range(1, params["players"] + 1)
+        ],
+        "elapsed": time.perf_counter() - start,
+    }
+
+
+class ResultCache:
+    """One JSON file per point, named by its key."""
+
+    def __init__(self, path: str = SWEEP_CACHE_PATH) -> None:
+        self.path = path
+
+    def _file(self, key: str) -> str:
+        return os.path.join(self.path, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> dict | None:
+        try:
+            with open(self._file(key)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key: str, result: dict) -> None:
+        path = self._file(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + ".tmp", "w") as f:
+            json.dump(result, f, indent=2)
+        os.replace(path + ".tmp", path)
+
+
+def run_sweep(
+    points: list[dict],
+    cache: ResultCache,
+    workers: int | None = None,
+    progress=None,
+) -> tuple[list[dict], int]:
+    """
+    Returns the result of every point, in order, and how many were simulated.
+
+    `progress`, if given, is called with each result as it is computed.
+    """
+    version = engine_version()
+    keys = [point_key(params, version) for params in points]
+    results = [cache.get(key) for key in keys]
+    missing = [i for i, result in enumerate(results) if result is None]
+    if missing:
+        with ProcessPoolExecutor(workers) as pool:
+            futures = {pool.submit(run_point, points[i]): i for i in missing}
+            for future in as_completed(futures):
+                i = futures[future]
+                results[i] = future.result()
+                cache.put(keys[i], results[i])
+                if progress is not None:
+                    progress(results[i])
+    return results, len(missing)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--players", nargs="+", type=int, default=[2, 3, 4, 5, 6])
+    parser.add_argument("--green", nargs="+", type=int, default=[engine.NUM_GREEN])
+    parser.add_argument("--white", nargs="+", type=int, default=[engine.NUM_WHITE])
+    parser.add_argument("--red-entry", nargs="+", type=int, default=[1])
+    parser.add_argument("--max-rerolls", type=int, default=2)
+    parser.add_argument("--max-turns", type=int, default=10_000)
+    parser.add_argument("--games", type=int, default=100_000, help="games per point")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--cache", default=SWEEP_CACHE_PATH)
+    parser.add_argument("--json", help="write every point's result to this file")
+    args = parser.parse_args()
+
+    points = grid(
+        args.players,
+        args.green,
+        args.white,
+        args.red_entry,
+        args.games,
+        args.seed,
+        args.max_rerolls,
+        args.max_turns,
+    )
+    start = time.perf_counter()
+    results, computed = run_sweep(
+        points,
+        ResultCache(args.cache),
+        args.workers,
+        progress=lambda result: print(f"Simulated {result['params']}", flush=True),
+    )
+    elapsed = time.perf_counter() - start
+    print(
+        f"{len(points)} points, {computed} simulated, "
+        f"{len(points) - computed} cached, {elapsed:.1f}s"
+    )
+    print("players green white red_entry  finished  turns  first seat")
+    for result in results:
+        params = result["params"]
+        print(
+            f"{params['players']:7} {params['green']:5} {params['white']:5} "
+            f"{params['red_entry']:9}  {result['finished']:8.1%} "
+            f"{result['mean_turns']:6.1f}  {result['win_rates'][0]:10.1%}"
+        )
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
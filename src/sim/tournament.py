@@ -0,0 +1,237 @@
+"""
+Round-robin bot tournament runner.
+
+For each player count, every multiset of the chosen bots that mixes at least
+two strategies is a matchup. A matchup's games rotate through the seatings so
+no bot keeps the first seat. Games are split into tasks and run on a process
+pool. Each task gets its own RNG stream, spawned from one master seed, so a
+tournament gives the same results whatever the worker count or scheduling.
+Results are folded in as each task finishes.
+
+Run `python -m src.sim.tournament --bots greedy cautious random --players 2 4`.
+"""
+
+
+import argparse
+import json
+import math
+import os
+import random
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import combinations_with_replacement
+
+import numpy as np
+
+from src import bots
+
+
+def matchups(names: list[str], players: int) -> list[tuple[str, ...]]:
+    """Returns every seating multiset that mixes at least two strategies."""
+    return [
+        combo
+        for combo in combinations_with_replacement(sorted(names), players)
+        if len(set(combo)) > 1 or len(names) == 1
+    ]
+
+
+def wilson_interval(wins: int, trials: int, z: float = 1.96) -> tuple[float, float]:
+    """Returns the Wilson score interval for a win rate."""
+    if trials == 0:
+        return 0.0, 1.0
+    p = wins / trials
+    denominator = 1 + z * z / trials
+    center = (p + z * z / (2 * trials)) / denominator
+    margin = z * math.sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials))
+    return (
+        max(0.0, center - margin / denominator),
+        min(1.0, center + margin / denominator),
+    )
+
+
+def run_task(
+    matchup: tuple[str, ...], first_game: int, games: int, seed: int, max_turns: int
+) -> dict:
+    """Plays a slice of a matchup's games. Runs inside a worker process."""
+    rng = random.Random(seed)
+    seated = [bots.BOTS[name]() for name in matchup]
+    players = len(matchup)
+    wins = defaultdict(int)
+    seats = defaultdict(int)
+    unfinished = 0
+    finished_turns = 0
+    start = time.perf_counter()
+    for game in range(first_game, first_game + games):
+        # Rotate the seating so every bot takes every seat
+        shift = game % players
+        order = seated[shift:] + seated[:shift]
+        winner, game_turns = bots.play_game(order, rng, max_turns)
+        for bot in order:
+            seats[bot.name] += 1
+        if winner:
+            wins[order[winner - 1].name] += 1
+            finished_turns += game_turns
+        else:
+            unfinished += 1
+    return {
+        "matchup": matchup,
+        "games": games,
+        "wins": dict(wins),
+        "seats": dict(seats),
+        "unfinished": unfinished,
+        "finished_turns": finished_turns,
+        "elapsed": time.perf_counter() - start,
+        "worker": os.getpid(),
+    }
+
+
+class Standings:
+    """Running totals, updated as tasks finish."""
+
+    def __init__(self) -> None:
+        # (players, bot name) -> [wins, seats]
+        self.records = defaultdict(lambda: [0, 0])
+        self.games = defaultdict(int)
+        self.unfinished = defaultdict(int)
+        self.finished_turns = defaultdict(int)
+        # Worker pid -> [games, busy seconds]
+        self.workers = defaultdict(lambda: [0, 0.0])
+
+    def add(self, result: dict) -> None:
+        players = len(result["matchup"])
+        for name, seats in result["seats"].items():
+            record = self.records[players, name]
+            record[0] += result["wins"].get(name, 0)
+            record[1] += seats
+        self.games[players] += result["games"]
+        self.unfinished[players] += result["unfinished"]
+        self.finished_turns[players] += result["finished_turns"]
+        worker = self.workers[result["worker"]]
+        worker[0] += result["games"]
+        worker[1] += result["elapsed"]
+
+    def report(self) -> dict:
+        """
+        Returns win rates per seat with 95% confidence intervals.
+
+        A bot's win rate is its wins divided by the seats it filled, so an even
+        field scores 1 / players.
+        """
+        standings = {}
+        for (players, name), (wins, seats) in sorted(self.records.items()):
+            low, high = wilson_interval(wins, seats)
+            standings.setdefault(str(players), {})[name] = {
+                "wins": wins,
+                "seats": seats,
+                "win_rate": wins / seats,
+                "ci95": [low, high],
+            }
+        return {
+            "standings": standings,
+            "games": {str(p): n for p, n in sorted(self.games.items())},
+            "unfinished": {str(p): n for p, n in sorted(self.unfinished.items())},
+            # None where every game hit the turn cap
+            "mean_turns_finished": {
+                str(p): (
+                    self.finished_turns[p] / (n - self.unfinished[p])
+                    if n > self.unfinished[p]
+                    else None
+                )
+                for p, n in sorted(self.games.items())
+            },
+            "workers": {
+                str(pid): {"games": games, "games_per_second": games / busy}
+                for pid, (games, busy) in self.workers.items()
+            },
+        }
+
+
+def run_tournament(
+    names: list[str],
+    player_counts: list[int],
+    games: int,
+    seed: int,
+    workers: int | None = None,
+    chunk: int = 200,
+    max_turns: int = 10_000,
+    progress=None,
+) -> dict:
+    """
+    Plays `games` games per matchup and returns the standings report.
+
+    `progress`, if given, is called with the Standings after every task.
+    """
+    for name in names:
+        if name not in bots.BOTS:
+            raise ValueError(f"Unknown bot {name!r}, choose from {list(bots.BOTS)}.")
+    tasks = [
+        (matchup, first, min(chunk, games - first))
+        for players in player_counts
+        for matchup in matchups(names, players)
+        for first in range(0, games, chunk)
+    ]
+    seeds = np.random.SeedSequence(seed).spawn(len(tasks))
+    standings = Standings()
+    start = time.perf_counter()
+    with ProcessPoolExecutor(workers) as pool:
+        futures = [
+            pool.submit(
+                run_task,
+                matchup,
+                first,
+                count,
+                int(task_seed.generate_state(1, np.uint64)[0]),
+                max_turns,
+            )
+            for (matchup, first, count), task_seed in zip(tasks, seeds)
+        ]
+        for future in as_completed(futures):
+            standings.add(future.result())
+            if progress is not None:
+                progress(standings)
+    report = standings.report()
+    report["seed"] = seed
+    report["elapsed"] = time.perf_counter() - start
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--bots", nargs="+", default=sorted(bots.BOTS))
+    parser.add_argument("--players", nargs="+", type=int, default=[2, 3, 4, 5, 6])
+    parser.add_argument("--games", type=int, default=1000, help="games per matchup")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk", type=int, default=200, help="games per task")
+    parser.add_argument("--json", help="write the full report to this file")
+    args = parser.parse_args()
+
+    def progress(standings: Standings) -> None:
+        done = sum(standings.games.values())
+        print(f"\r{done} games played", end="", flush=True)
+
+    report = run_tournament(
+        args.bots,
+        args.players,
+        args.games,
+        args.seed,
+        args.workers,
+        args.chunk,
+        progress=progress,
+    )
+    print()
+    for players, table in report["standings"].items():
+        print(f"{players} players ({report['games'][players]} games):")
+        for name, row in sorted(table.items(), key=lambda x: -x[1]["win_rate"]):
+            low, high = row["ci95"]
+            print(f"  {name:>10} {row['win_rate']:6.1%}  [{low:.1%}, {high:.1%}]")
+    for pid, row in report["workers"].items():
+        print(f"Worker {pid}: {row['games_per_second']:.0f} games/s")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
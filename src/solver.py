@@ -0,0 +1,390 @@
+"""
+Exact solver for a single Make It Six turn.
+
+Computes the probability that the current player, playing perfectly, makes
+three Green 6s before a Red 6 costs them, i.e. before a Red die is rolled or
+changed to 6. Passing scores 0.
+
+Dice of the same colour are interchangeable, so a position is canonicalized
+to sorted (Green, White in play, Red in play) value tuples. Every White 1-5
+action uses up its die, so positions fall into layers by (Green values, White
+dice in play, Red dice in play) and actions only lead to lower layers. The
+only loops are Reroll and White 6, which stay in a layer. Each layer is
+solved as a whole by value iteration, starting from the values of the lower
+layers.
+
+Solved values go into a size-capped transposition table that can be saved to
+disk, so later runs start warm. Run `python -m src.solver --table turn.pkl`
+to solve the opening roll and save the table.
+"""
+
+
+import argparse
+import math
+import os
+import pickle
+import time
+from collections import OrderedDict
+from itertools import combinations_with_replacement
+
+from src import engine
+
+
+# Bump whenever the rules or the key layout change, to ignore stale tables
+SOLVER_VERSION = 1
+
+FACES = range(1, 7)
+TOLERANCE = 1e-13
+
+
+def _multisets(k: int) -> list[tuple[tuple[int, ...], float]]:
+    """Returns every sorted outcome of rolling k dice, with its probability."""
+    outcomes = []
+    for values in combinations_with_replacement(FACES, k):
+        ways = math.factorial(k)
+        for face in FACES:
+            ways //= math.factorial(values.count(face))
+        outcomes.append((values, ways / 6**k))
+    return outcomes
+
+
+ROLLS = {k: _multisets(k) for k in range(engine.NUM_WHITE + 1)}
+# Red values in play that don't cost the player, by number of Red dice
+RED_SETS = {
+    n: list(combinations_with_replacement(range(1, 6), n))
+    for n in range(1, engine.NUM_RED + 1)
+}
+# Probability of each two-Red outcome without a 6 (they sum to 25/36)
+RED_PAIR_ODDS = {reds: (1 if reds[0] == reds[1] else 2) / 36 for reds in RED_SETS[2]}
+
+
+def _key(green, white, red) -> int:
+    """Packs a canonical position into an int, 3 bits per die plus counts."""
+    key = 0
+    for value in green:
+        key = key << 3 | value
+    for value in white:
+        key = key << 3 | value
+    for value in red:
+        key = key << 3 | value
+    return (key << 3 | len(white)) << 2 | len(red)
+
+
+def _reroll_key(green, k: int) -> int:
+    """Key for the value of rerolling with k White dice in play (negative)."""
+    return ~(_key(green, (), ()) << 3 | k)
+
+
+def _replace(values: tuple[int, ...], old: int, new: int) -> list[int]:
+    """Returns values as a list with one `old` changed to `new`."""
+    values = list(values)
+    values[values.index(old)] = new
+    return values
+
+
+def _without(values, value: int) -> tuple[int, ...]:
+    values = list(values)
+    values.remove(value)
+    return tuple(values)
+
+
+class TranspositionTable:
+    """LRU-evicting map from packed positions to win probabilities."""
+
+    def __init__(self, max_entries: int = 2_000_000) -> None:
+        self.max_entries = max_entries
+        self.values = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def get(self, key: int) -> float | None:
+        value = self.values.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.values.move_to_end(key)
+        return value
+
+    def put(self, key: int, value: float) -> None:
+        self.values[key] = value
+        self.values.move_to_end(key)
+        while len(self.values) > self.max_entries:
+            self.values.popitem(last=False)
+
+    def save(self, path: str) -> None:
+        with open(path + ".tmp", "wb") as f:
+            pickle.dump(
+                (SOLVER_VERSION, dict(self.values)),
+                f,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+        os.replace(path + ".tmp", path)
+
+    def load(self, path: str) -> bool:
+        """Loads a saved table. Returns False if it is missing or stale."""
+        try:
+            with open(path, "rb") as f:
+                version, values = pickle.load(f)
+        except FileNotFoundError:
+            return False
+        if version != SOLVER_VERSION:
+            return False
+        for key, value in values.items():
+            self.put(key, value)
+        return True
+
+
+class TurnSolver:
+    def __init__(self, table: TranspositionTable | None = None) -> None:
+        self.table = table if table is not None else TranspositionTable()
+        self.layers_solved = 0
+
+    def probability(self, state: engine.State) -> float:
+        """Returns the current player's chance of three Green 6s this turn."""
+        if state.game_over:
+            return 0.0
+        if state.turn_pre_roll:
+            return self.turn_value()
+        green = tuple(state.dice[engine.GREEN])
+        red = tuple(
+            value
+            for value, playing in zip(state.dice[engine.RED], state.red_in_game)
+            if playing
+        )
+        white = [
+            value
+            for i, (value, playing) in enumerate(
+                zip(state.dice[engine.WHITE], state.white_in_game)
+            )
+            if playing and i != state.active_white
+        ]
+        if state.active_white is None:
+            return self._leaf(green, white, red)
+
+        # Finish the White action in progress
+        target = state.active_target
+        if target is not None:
+            target = (_COLOR_SLOTS[target[0]], state.dice[target[0]][target[1]])
+        match state.active_white_value, state.turn_mid_action:
+            case 2, True:
+                return self._w2_copy(green, white, red, target)
+            case 3, True:
+                dice = _without(green, target[1])
+                return self._w3_second(dice, target[1], white, red)
+            case 5, True:
+                return self._w5_decrement(green, white, red, target)
+            case value, _:
+                return self._white_action(value, green, tuple(white), red)
+
+    def turn_value(self) -> float:
+        """Returns the chance of three Green 6s over a turn, before rolling."""
+        total = 0.0
+        for green, p_green in ROLLS[engine.NUM_GREEN]:
+            if green.count(6) >= 3:
+                total += p_green
+                continue
+            for white, p_white in ROLLS[engine.NUM_WHITE]:
+                for red in range(1, 6):
+                    value = self._value(green, white, (red,))
+                    total += p_green * p_white * value / 6
+        return total
+
+    # Positions
+
+    def _leaf(self, green, white, red) -> float:
+        """Value of a position reached by an action, before canonicalizing."""
+        if list(green).count(6) >= 3:
+            return 1.0
+        if 6 in red:
+            return 0.0
+        return self._value(
+            tuple(sorted(green)), tuple(sorted(white)), tuple(sorted(red))
+        )
+
+    def _value(self, green, white, red) -> float:
+        value = self.table.get(_key(green, white, red))
+        if value is None:
+            value = self._solve_layer(green, len(white), len(red))[white, red]
+        return value
+
+    def _reroll_value(self, green, k: int) -> float:
+        value = self.table.get(_reroll_key(green, k))
+        if value is None:
+            value = self._reroll_from(self._solve_layer(green, k, 2), k)
+        return value
+
+    @staticmethod
+    def _reroll_from(layer: dict, k: int) -> float:
+        return sum(
+            odds * p * layer[white, red]
+            for red, odds in RED_PAIR_ODDS.items()
+            for white, p in ROLLS[k]
+        )
+
+    def _solve_layer(self, green, k: int, reds: int) -> dict:
+        """Solves every position sharing Green values and White/Red counts."""
+        positions = [(white, red) for white, _ in ROLLS[k] for red in RED_SETS[reds]]
+        # Best White 1-5 action from each position, from lower layers only
+        actions = {
+            (white, red): self._best_white(green, white, red)
+            for white, red in positions
+        }
+        reroll = 0.0 if reds == 2 else self._reroll_value(green, k)
+        six = {position: 6 in position[0] for position in positions}
+
+        # Value iteration for the Reroll and White 6 loops within the layer
+        values = dict(actions)
+        while True:
+            expected = {
+                red: sum(p * values[white, red] for white, p in ROLLS[k])
+                for red in RED_SETS[reds]
+            }
+            if reds == 2:
+                reroll = sum(
+                    odds * expected[red] for red, odds in RED_PAIR_ODDS.items()
+                )
+            delta = 0.0
+            for position in positions:
+                value = max(actions[position], reroll)
+                if six[position]:
+                    value = max(value, expected[position[1]])
+                delta = max(delta, value - values[position])
+                values[position] = value
+            if delta < TOLERANCE:
+                break
+
+        if reds == 2:
+            self.table.put(_reroll_key(green, k), self._reroll_from(values, k))
+        for (white, red), value in values.items():
+            self.table.put(_key(green, white, red), value)
+        self.layers_solved += 1
+        return values
+
+    # White die actions
+
+    def _best_white(self, green, white, red) -> float:
+        best = 0.0
+        for value in set(white):
+            if value < 6 and value not in red:
+                rest = _without(white, value)
+                best = max(best, self._white_action(value, green, rest, red))
+        return best
+
+    def _white_action(self, value: int, green, white, red) -> float:
+        """Value of activating a White 1-5, with `white` the other White dice."""
+        dice = (green, white, red)
+        best = 0.0
+        match value:
+            case 1:
+                for slot, old in _targets(dice):
+                    if old < 6:
+                        changed = _changed(dice, slot, old, old + 1)
+                        best = max(best, self._leaf(*changed))
+            case 2:
+                for target in _targets(dice):
+                    best = max(best, self._w2_copy(green, white, red, target))
+            case 3:
+                for old in set(green):
+                    best = max(best, self._w3_first(green, old, white, red))
+            case 4:
+                for slot, old in _targets(dice):
+                    best = max(best, self._leaf(*_changed(dice, slot, old, 7 - old)))
+            case 5:
+                for slot, old in _targets(dice):
+                    if old <= (3 if slot == GREEN_SLOT else 4):
+                        changed = _changed(dice, slot, old, old + 2)
+                        if 6 in changed[RED_SLOT]:
+                            continue
+                        best = max(
+                            best,
+                            self._w5_decrement(*changed, (slot, old + 2)),
+                        )
+        return best
+
+    def _w2_copy(self, green, white, red, target) -> float:
+        """Best White to copy onto the die chosen as White 2's target."""
+        slot, old = target
+        copyable = white if slot != WHITE_SLOT else _without(white, old)
+        best = 0.0
+        for new in set(copyable):
+            changed = _changed((green, white, red), slot, old, new)
+            best = max(best, self._leaf(*changed))
+        return best
+
+    def _w3_first(self, green, old: int, white, red) -> float:
+        """Rerolls one Green showing `old`, then picks the second to reroll."""
+        rest = _without(green, old)
+        total = 0.0
+        for new in FACES:
+            if rest.count(6) + (new == 6) >= 3:
+                total += 1 / 6
+            else:
+                total += self._w3_second(rest, new, white, red) / 6
+        return total
+
+    def _w3_second(self, rest, first: int, white, red) -> float:
+        """Best second Green to reroll; `rest` excludes the first, now `first`."""
+        best = 0.0
+        for old in set(rest):
+            others = list(_without(rest, old)) + [first]
+            total = sum(self._leaf(others + [new], white, red) for new in FACES)
+            best = max(best, total / 6)
+        return best
+
+    def _w5_decrement(self, green, white, red, raised) -> float:
+        """Best die to take 2 from after `raised` (slot, value) got +2."""
+        dice = (green, white, red)
+        best = 0.0
+        for slot, old in _targets(dice):
+            if old < 3:
+                continue
+            if (slot, old) == raised and list(dice[slot]).count(old) == 1:
+                continue  # The raised die itself can't be lowered again
+            best = max(best, self._leaf(*_changed(dice, slot, old, old - 2)))
+        return best
+
+
+GREEN_SLOT, WHITE_SLOT, RED_SLOT = range(3)
+_COLOR_SLOTS = {
+    engine.GREEN: GREEN_SLOT,
+    engine.WHITE: WHITE_SLOT,
+    engine.RED: RED_SLOT,
+}
+
+
+def _targets(dice) -> list[tuple[int, int]]:
+    """Returns one (slot, value) per distinct die a White action can target."""
+    return [(slot, value) for slot in range(3) for value in set(dice[slot])]
+
+
+def _changed(dice, slot: int, old: int, new: int) -> list:
+    changed = list(dice)
+    changed[slot] = _replace(dice[slot], old, new)
+    return changed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--table", help="load and save the transposition table here")
+    parser.add_argument("--max-entries", type=int, default=2_000_000)
+    args = parser.parse_args()
+
+    solver = TurnSolver(TranspositionTable(args.max_entries))
+    if args.table and solver.table.load(args.table):
+        print(f"Loaded {len(solver.table)} positions from {args.table}")
+    start = time.perf_counter()
+    value = solver.turn_value()
+    elapsed = time.perf_counter() - start
+    print(f"Chance of three Green 6s in a turn: {value:.6f}")
+    print(f"Solved {solver.layers_solved} layers in {elapsed:.1f}s")
+    print(f"Table: {len(solver.table)} positions, {solver.table.hits} hits")
+    if args.table:
+        solver.table.save(args.table)
+
+
+if __name__ == "__main__":
+    main()
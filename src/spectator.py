@@ -0,0 +1,410 @@
+"""
+Spectator view: many live tables tiled into one window.
+
+Each table is drawn with the game window's layout (src/layout.py) scaled to
+its tile. Sprites are rendered at the tile's size rather than scaled every
+frame, and cached per tile size: the dice in a `DieAtlas` of that size, the
+buttons, the text and the blank tile. Each frame redraws only the tiles whose
+table changed, all of them in one `Surface.blits` call, and updates just
+those tiles on screen.
+
+Tables are bot games played in this process, or tables on a table server,
+which the view joins to be sent every state, without ever acting on them:
+
+    python -m src.spectator --tables 64 --size 1920 1080
+    python -m src.spectator --connect 127.0.0.1:7766 --join 1 2 3 4
+    python -m src.spectator --tables 64 --benchmark 3000
+
+`--benchmark` draws that many frames headless and as fast as it can, with
+the tables moving as they would at the frame cap, and reports frame times.
+"""
+
+
+import argparse
+import heapq
+import math
+import os
+import random
+import select
+import time
+
+import numpy as np
+import pygame
+
+from src import bots, engine, layout, packing
+from src.config import *
+from src.fonts import load_font
+from src.net import protocol
+from src.objects.die import Die
+from src.objects.die_atlas import DieAtlas
+
+
+GAP_COLOR = (0, 0, 0)  # Between tiles, and around them where the grid is short
+BORDER_COLOR = (0, 32, 25)
+MIN_FONT_SIZE = 6  # Tiles too small for this many pixels of text show none
+
+
+class LocalTables:
+    """Bot games played in this process, each taking `speed` actions a second."""
+
+    def __init__(
+        self,
+        count: int,
+        players: int = 4,
+        speed: float = 2.0,
+        names: tuple[str, ...] = ("greedy", "cautious"),
+        seed: int = 0,
+    ) -> None:
+        self.players = players
+        self.names = names
+        self.rng = random.Random(seed)
+        self.interval = 1 / speed
+        self.tables = [self._new_game(i) for i in range(count)]
+        # Staggered, so the tables don't all move on the same frame
+        self.due = [(i * self.interval / count, i) for i in range(count)]
+        heapq.heapify(self.due)
+        self.started = False
+
+    def _new_game(self, index: int) -> tuple:
+        state = engine.State(self.players)
+        seated = [
+            bots.BOTS[self.names[(index + i) % len(self.names)]]()
+            for i in range(self.players)
+        ]
+        return state, random.Random(self.rng.getrandbits(64)), seated
+
+    def poll(self, now: float) -> dict[int, int]:
+        """Plays the actions due by `now`; returns the changed tables' states."""
+        if not self.started:
+            self.started = True
+            return {i: packing.encode(table[0]) for i, table in enumerate(self.tables)}
+        changed = {}
+        while self.due[0][0] <= now:
+            due, i = self.due[0]
+            state, rng, seated = self.tables[i]
+            if state.game_over:
+                self.tables[i] = self._new_game(i)
+                state = self.tables[i][0]
+            else:
+                action = seated[state.player_turn - 1].choose(state, rng)
+                engine.apply_action(state, action, rng)
+            changed[i] = packing.encode(state)
+            # A table that fell behind, such as while the window was dragged,
+            # skips ahead instead of catching up all at once
+            heapq.heapreplace(self.due, (max(due + self.interval, now), i))
+        return changed
+
+
+class RemoteTables:
+    """Tables on a table server, joined to be sent each one's states."""
+
+    def __init__(self, address: str, table_ids: list[int]) -> None:
+        from src.net.client import connect
+
+        self.sock = connect(address)
+        self.frames = protocol.FrameBuffer()
+        self.index = {table_id: i for i, table_id in enumerate(table_ids)}
+        for table_id in table_ids:
+            self.sock.sendall(protocol.frame(protocol.JOIN, table_id, 0, 0))
+
+    def poll(self, now: float) -> dict[int, int]:
+        """Returns the latest state of every table the server sent one for."""
+        changed = {}
+        while select.select([self.sock], [], [], 0)[0]:
+            data = self.sock.recv(1 << 16)
+            if not data:
+                raise ConnectionError("Server closed the connection.")
+            for body in self.frames.feed(data):
+                message = protocol.parse(body)
+                if message[1] not in self.index:
+                    continue
+                if message[0] == protocol.REJECT:
+                    # Spectators send no actions, so only a JOIN can be refused
+                    raise ConnectionError(f"Server refused to join table {message[1]}.")
+                if message[0] == protocol.STATE:
+                    changed[self.index[message[1]]] = message[3]
+        return changed
+
+    def close(self) -> None:
+        self.sock.close()
+
+
+class TileSprites:
+    """Everything a tile shows, rendered once at one tile size."""
+
+    def __init__(self, size: tuple[int, int]) -> None:
+        self.size = size
+        scale = self.scale = min(size[0] / WINDOW_WIDTH, size[1] / WINDOW_HEIGHT)
+        self.atlas = DieAtlas(max(1, round(DIE_SIZE * scale)))
+        # Stand-ins the atlas reads each colour's draw colours and face from
+        self.stand_ins = {
+            color: Die(color, (0, 0))
+            for color in (engine.RED, engine.GREEN, engine.WHITE, engine.BLUE)
+        }
+        font_size = round(TEXT_SIZE * scale)
+        self.font = (
+            load_font(FONT_NAME, font_size) if font_size >= MIN_FONT_SIZE else None
+        )
+        self.buttons = {}  # Label -> surface
+        self.texts = {}  # Text -> surface
+
+        self.blank = pygame.Surface(size)
+        if pygame.display.get_surface() is not None:
+            self.blank = self.blank.convert()
+        self.blank.fill(BORDER_COLOR)
+        self.blank.fill(BACKGROUND_COLOR, (0, 0, size[0] - 1, size[1] - 1))
+
+        # The game window's layout, scaled to the tile
+        self.dice = {
+            (color, i): self.point(layout.die_position(color, i))
+            for color, count in (
+                (engine.RED, engine.NUM_RED),
+                (engine.GREEN, engine.NUM_GREEN),
+                (engine.WHITE, engine.NUM_WHITE),
+                (engine.BLUE, 6),
+            )
+            for i in range(count)
+        }
+        self.button_positions = {
+            name: self.point(pos) for name, pos in layout.BUTTON_POSITIONS.items()
+        }
+        self.label_position = self.point(layout.HOVER_TEXT_POSITION)
+        self.status_position = self.point(layout.STATUS_TEXT_POSITION)
+
+    def point(self, pos: tuple[float, float]) -> tuple[int, int]:
+        return round(pos[0] * self.scale), round(pos[1] * self.scale)
+
+    def die(self, color: str, value: int, blocked: bool, activated: bool):
+        stand_in = self.stand_ins[color]
+        stand_in.value = value
+        stand_in.blocked = blocked
+        stand_in.activated = activated
+        return self.atlas.get(stand_in)
+
+    def button(self, label: str) -> pygame.Surface:
+        surf = self.buttons.get(label)
+        if surf is None:
+            width = max(1, round(BUTTON_WIDTH * self.scale))
+            height = max(1, round(BUTTON_HEIGHT * self.scale))
+            surf = self.buttons[label] = pygame.Surface((width, height))
+            surf.fill(BACKGROUND_COLOR)
+            radius = round(DIE_PIP_RADIUS * self.scale)
+            pygame.draw.rect(surf, BUTTON_COLOR, (0, 0, width, height), 0, radius)
+            if self.font is not None:
+                text = self.font.render(label, True, BUTTON_TEXT_COLOR)
+                surf.blit(text, text.get_rect(center=(width / 2, height / 2)))
+        return surf
+
+    def text(self, text: str) -> pygame.Surface | None:
+        if self.font is None:
+            return None
+        surf = self.texts.get(text)
+        if surf is None:
+            surf = self.texts[text] = self.font.render(text, True, TEXT_COLOR)
+        return surf
+
+
+class Spectator:
+    """A window showing many tables at once."""
+
+    def __init__(
+        self,
+        source,
+        count: int,
+        size: tuple[int, int] = WINDOW_SIZE,
+        labels: list[str] | None = None,
+    ) -> None:
+        pygame.display.init()
+        pygame.font.init()
+        self.display_surf = pygame.display.set_mode(size, pygame.RESIZABLE)
+        pygame.display.set_caption(f"Make It Six - {count} tables")
+        self.clock = pygame.time.Clock()
+        self.source = source
+        self.count = count
+        self.labels = labels or [f"Table {i + 1}" for i in range(count)]
+        self.codes = [None] * count  # Packed state shown in each tile
+        self.dirty = set()  # Tiles to redraw next frame
+        self.sprite_cache = {}  # Tile size -> TileSprites
+        self._lay_out(size)
+
+    def _lay_out(self, size: tuple[int, int]) -> None:
+        """Picks the grid that gives tiles the largest scale."""
+        width, height = size
+
+        def scale(columns: int) -> float:
+            rows = math.ceil(self.count / columns)
+            return min(width / columns / WINDOW_WIDTH, height / rows / WINDOW_HEIGHT)
+
+        columns = max(range(1, self.count + 1), key=scale)
+        rows = math.ceil(self.count / columns)
+        tile = (max(1, width // columns), max(1, height // rows))
+        self.tiles = [
+            pygame.Rect((i % columns) * tile[0], (i // columns) * tile[1], *tile)
+            for i in range(self.count)
+        ]
+        sprites = self.sprite_cache.get(tile)
+        if sprites is None:
+            sprites = self.sprite_cache[tile] = TileSprites(tile)
+        self.sprites = sprites
+        self.full_redraw = True
+
+    def _tile_blits(self, index: int) -> list[tuple[pygame.Surface, tuple]]:
+        left, top = self.tiles[index].topleft
+        sprites = self.sprites
+        blits = [(sprites.blank, (left, top))]
+        code = self.codes[index]
+        if code is None:
+            return blits
+
+        def place(surf, pos) -> None:
+            if surf is not None:
+                blits.append((surf, (left + pos[0], top + pos[1])))
+
+        state = packing.decode(code)
+        blocked = engine.blocked_mask(state)
+        for (color, i), pos in sprites.dice.items():
+            if color == engine.BLUE:
+                if i < state.players:
+                    value = state.dice[color][i]
+                    place(sprites.die(color, value, False, False), pos)
+            elif not state.turn_pre_roll and engine.in_game(state, color, i):
+                place(
+                    sprites.die(
+                        color,
+                        state.dice[color][i],
+                        bool(blocked >> engine.PICK_SLOTS[color, i] & 1),
+                        engine.is_activated(state, color, i),
+                    ),
+                    pos,
+                )
+        place(sprites.button("Pass"), sprites.button_positions["pass"])
+        roll = "Roll" if state.turn_pre_roll else "Reroll"
+        place(sprites.button(roll), sprites.button_positions["roll"])
+        if state.game_over:
+            status = f"Player {state.winner} wins!"
+        else:
+            status = f"Player {state.player_turn}'s turn"
+        place(sprites.text(self.labels[index]), sprites.label_position)
+        place(sprites.text(status), sprites.status_position)
+        return blits
+
+    def frame(self, changed: dict[int, int]) -> list[pygame.Rect]:
+        """Shows the changed tables; returns the tiles that were redrawn."""
+        for index, code in changed.items():
+            if code != self.codes[index]:
+                self.codes[index] = code
+                self.dirty.add(index)
+        full_redraw = self.full_redraw
+        if full_redraw:
+            self.full_redraw = False
+            self.display_surf.fill(GAP_COLOR)
+            self.dirty = set(range(self.count))
+        elif not self.dirty:
+            return []
+        rects = [self.tiles[index] for index in self.dirty]
+        blits = []
+        for index in self.dirty:
+            blits += self._tile_blits(index)
+        self.dirty = set()
+        self.display_surf.blits(blits, doreturn=False)
+        if full_redraw:
+            pygame.display.flip()
+        else:
+            pygame.display.update(rects)
+        return rects
+
+    def run(self) -> None:
+        running = True
+        while running:
+            self.clock.tick(FRAME_RATE)
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
+                elif event.type == pygame.VIDEORESIZE:
+                    self.display_surf = pygame.display.get_surface()
+                    self._lay_out(event.size)
+                elif event.type == pygame.WINDOWEXPOSED:
+                    self.full_redraw = True
+            self.frame(self.source.poll(time.perf_counter()))
+        pygame.quit()
+
+    def benchmark(self, frames: int) -> dict:
+        """
+        Draws frames as fast as possible, with the tables moving as they would
+        at FRAME_RATE, and returns the time each frame took.
+        """
+        poll = np.zeros(frames)
+        draw = np.zeros(frames)
+        tiles = 0
+        for i in range(frames):
+            start = time.perf_counter()
+            pygame.event.pump()
+            changed = self.source.poll(i / FRAME_RATE)
+            polled = time.perf_counter()
+            tiles += len(self.frame(changed))
+            draw[i] = time.perf_counter() - polled
+            poll[i] = polled - start
+        total = (poll + draw) * 1000
+        result = {
+            "tables": self.count,
+            "frames": frames,
+            "tile_size": self.tiles[0].size,
+            "tiles_per_frame": tiles / frames,
+            "frames_per_second": frames / (total.sum() / 1000),
+            "draw_ms": float(draw.mean() * 1000),
+            "poll_ms": float(poll.mean() * 1000),
+        }
+        for q in (50, 95, 99):
+            result[f"frame_p{q}_ms"] = float(np.percentile(total, q))
+        pygame.quit()
+        return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tables", type=int, default=16, help="bot games to show")
+    parser.add_argument("--players", type=int, default=4)
+    parser.add_argument("--speed", type=float, default=2, help="actions per second")
+    parser.add_argument("--bots", nargs="+", default=["greedy", "cautious"])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--connect", help="watch tables on a table server instead")
+    parser.add_argument("--join", type=int, nargs="+", help="table ids to watch")
+    parser.add_argument("--size", type=int, nargs=2, default=WINDOW_SIZE)
+    parser.add_argument(
+        "--benchmark", type=int, metavar="FRAMES", help="time frames headless"
+    )
+    args = parser.parse_args()
+
+    if args.benchmark:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    if args.connect:
+        if not args.join:
+            parser.error("--connect needs --join with the tables to watch")
+        source = RemoteTables(args.connect, args.join)
+        count = len(args.join)
+        labels = [f"Table {table_id}" for table_id in args.join]
+    else:
+        source = LocalTables(
+            args.tables, args.players, args.speed, tuple(args.bots), args.seed
+        )
+        count = args.tables
+        labels = None
+    spectator = Spectator(source, count, tuple(args.size), labels)
+    if not args.benchmark:
+        spectator.run()
+        return
+    result = spectator.benchmark(args.benchmark)
+    print(
+        f"{result['tables']} tables in {result['tile_size'][0]}x"
+        f"{result['tile_size'][1]} tiles, {result['tiles_per_frame']:.1f} "
+        f"redrawn per frame: {result['frames_per_second']:,.0f} frames/s"
+    )
+    print(
+        f"draw {result['draw_ms']:.3f} ms, tables {result['poll_ms']:.3f} ms per "
+        "frame; frame "
+        + "  ".join(f"p{q} {result[f'frame_p{q}_ms']:.3f} ms" for q in (50, 95, 99))
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+from collections import OrderedDict
+
+import pygame
+import pygame.locals
+
+from src.config import *
+
+
+class TextCache:
+    """
+    Bounded LRU cache of rendered text surfaces.
+
+    Surfaces are keyed by (font, text, color, antialias), so strings that come
+    back all game long, such as die descriptions, button labels and the
+    "Player N's turn" status, are only rendered once while they stay in use.
+    """
+
+    def __init__(self, maxsize: int = TEXT_CACHE_SIZE) -> None:
+        self.maxsize = maxsize
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.surfaces)
+
+    def render(
+        self, font: pygame.font.Font, text: str, color, antialias: bool = True
+    ) -> pygame.Surface:
+        """Returns the cached rendering of text, rendering it on a miss."""
+        key = (font, text, tuple(color), antialias)
+        surf = self.surfaces.get(key)
+        if surf is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surf
+        self.misses += 1
+        surf = self.surfaces[key] = font.render(text, antialias, color)
+        if len(self.surfaces) > self.maxsize:
+            self.surfaces.popitem(last=False)
+        return surf
+
+    def clear(self) -> None:
+        self.surfaces.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+# Shared by every Game and Button
+cache = TextCache()
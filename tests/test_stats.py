@@ -0,0 +1,11 @@
+from src.sim.stats import TurnStats, summarize
+
+
+def test_summarize_empty_run(tmp_path):
+    TurnStats(str(tmp_path)).close()
+    summary = summarize(str(tmp_path))
+    assert summary["turns"] == 0
+    assert summary["games"] == 0
+    assert summary["mean_rolls_per_turn"] == 0.0
+    assert summary["rolls_per_turn"] == {}
+    assert summary["completion_rate"] == 0.0